@@ -0,0 +1,50 @@
+"""
+Per-box cost of validating and converting boxes one Bbox at a time versus in
+a single batched call.
+
+    python benchmark/bench_bbox.py [num_boxes]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # the repo root, so unibox imports without installing it
+
+from unibox import Bbox, Dataset
+
+
+def make_boxes(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0.2, 0.8, size=(n, 2))
+    wh = rng.uniform(0.01, 0.2, size=(n, 2))
+    return np.concatenate([xy, wh], axis=1)
+
+
+def per_box(boxes: np.ndarray):
+    dset = Dataset()
+    for box in boxes:
+        dset.append(Bbox(box, "xywh", False, "0", [1920, 1080]))
+    return [bbox.ltrb(True) for bbox in dset.anno]
+
+
+def batched(boxes: np.ndarray):
+    dset = Dataset()
+    dset.extend(boxes, "xywh", False, ["0"] * len(boxes), [1920, 1080])
+    return dset.boxes.ltrb(True)
+
+
+def bench(n: int, repeat: int = 5):
+    boxes = make_boxes(n)
+    np.testing.assert_allclose(np.array(per_box(boxes)), batched(boxes))
+    for name, func in (("per_box", per_box), ("batched", batched)):
+        number = max(1, 20000 // n) if name == "per_box" else max(1, 200000 // n)
+        best = min(timeit.repeat(lambda: func(boxes), number=number, repeat=repeat))
+        print(f"{name:8s} n={n:<7d} {best / number / n * 1e6:8.3f} us/box")
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [10, 1000, 10000]
+    for n in sizes:
+        bench(n)
@@ -0,0 +1,52 @@
+"""
+Start-up cost of `import unibox` and of a pure label conversion in a fresh
+interpreter, against the same with cv2 imported as well, which is what every
+start-up paid while cv2 was imported at module level.
+
+    python benchmark/bench_import.py [repeat]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ASSET = os.path.join(ROOT, ".asset")
+
+CONVERT = f"""
+from unibox import Dataset
+dset = Dataset({os.path.join(ASSET, "bus.jpg")!r}).load("yolo", lb_path={os.path.join(ASSET, "bus.txt")!r})
+dset.dump("voc")
+"""
+
+CASES = (
+    ("import numpy", "import numpy"),
+    ("import unibox", "import unibox"),
+    ("import unibox + cv2", "import unibox, cv2"),
+    ("yolo -> voc", CONVERT),
+    ("yolo -> voc + cv2", "import cv2\n" + CONVERT),
+)
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<bench>", "exec"))
+print(time.perf_counter() - start, "cv2" in sys.modules)
+"""
+
+
+def run(code: str) -> tuple:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", PROBE, code], env=env, capture_output=True, text=True, check=True)
+    seconds, cv2_loaded = out.stdout.split()
+    return float(seconds), cv2_loaded == "True"
+
+
+def bench(repeat: int):
+    for name, code in CASES:
+        runs = [run(code) for _ in range(repeat)]
+        best = min(seconds for seconds, _ in runs)
+        print(f"{name:22s} {best * 1e3:8.1f} ms  cv2 loaded: {runs[0][1]}")
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
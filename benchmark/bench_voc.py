@@ -0,0 +1,99 @@
+"""
+VOC import/export over a synthetic annotation with many objects, against the
+previous ElementTree + find() importer and string-concatenating exporter.
+
+    python benchmark/bench_voc.py [num_objects]
+"""
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # the repo root, so unibox imports without installing it
+
+from unibox import Bbox, Dataset
+
+
+def make_dataset(n: int, seed: int = 0) -> Dataset:
+    rng = np.random.default_rng(seed)
+    lt = rng.uniform(1, 3000, size=(n, 2))
+    wh = rng.uniform(5, 500, size=(n, 2))
+    dset = Dataset("synthetic.jpg")
+    dset["img_shape"] = [4000, 4000]
+    dset.extend(np.concatenate([lt, lt + wh], axis=1), "ltrb", True, rng.integers(0, 20, n), [4000, 4000])
+    return dset
+
+
+def legacy_import(in_stream) -> Dataset:
+    dset = Dataset()
+    root = ET.parse(in_stream).getroot()
+    size = root.find("size")
+    w = int(size.find("width").text)
+    h = int(size.find("height").text)
+    for obj in root.iter("object"):
+        info = {k: obj.find(k).text for k in ["difficult", "pose", "truncated"]}
+        xmlbox = obj.find("bndbox")
+        bb = [float(xmlbox.find(x).text) for x in ("xmin", "ymin", "xmax", "ymax")]
+        dset.append(Bbox(bb, "ltrb", True, obj.find("name").text, [w, h], info))
+    return dset
+
+
+def legacy_export(dset: Dataset) -> str:
+    img_wh = dset["img_shape"]
+    xml_str = "<annotation>\n" + "<folder>VOC2007</folder>\n"
+    xml_str += f"<filename>{dset.img_path}</filename>\n"
+    xml_str += "<size>\n"
+    xml_str += f"<width>{img_wh[0]}</width>\n"
+    xml_str += f"<height>{img_wh[1]}</height>\n"
+    xml_str += "<depth>3</depth>\n"
+    xml_str += "</size>\n"
+    for bbox in dset.anno:
+        x1, y1, x2, y2 = bbox.ltrb(is_pixel_distance=True, img_shape=img_wh).tolist()
+        info = bbox.info or {}
+        xml_str += "<object>\n"
+        xml_str += f"<name>{bbox.label}</name>\n"
+        xml_str += f"<pose>{info.get('pose', 'Unspecified')}</pose>\n"
+        xml_str += f"<truncated>{info.get('truncated', 0)}</truncated>\n"
+        xml_str += f"<difficult>{info.get('difficult', 0)}</difficult>\n"
+        xml_str += "<bndbox>\n"
+        xml_str += f"<xmin>{int(round(x1))}</xmin>\n"
+        xml_str += f"<ymin>{int(round(y1))}</ymin>\n"
+        xml_str += f"<xmax>{int(round(x2))}</xmax>\n"
+        xml_str += f"<ymax>{int(round(y2))}</ymax>\n"
+        xml_str += "</bndbox>\n"
+        xml_str += "</object>\n"
+    return xml_str + "</annotation>"
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench(n: int):
+    dset = make_dataset(n)
+
+    old_xml, old_t, old_mem = measure(legacy_export, dset)
+    new_xml, new_t, new_mem = measure(dset.dump, "voc")
+    assert old_xml.encode() == new_xml
+    print(f"export n={n}: legacy {old_t * 1e3:8.1f} ms {old_mem / 2**20:6.1f} MiB | join {new_t * 1e3:8.1f} ms {new_mem / 2**20:6.1f} MiB")
+
+    old, old_t, old_mem = measure(legacy_import, BytesIO(new_xml))
+    new, new_t, new_mem = measure(Dataset().load, "voc", BytesIO(new_xml))
+    assert np.array_equal(np.array([b.ltrb() for b in old.anno]).reshape(-1, 4), new.boxes.ltrb())
+    print(f"import n={n}: legacy {old_t * 1e3:8.1f} ms {old_mem / 2**20:6.1f} MiB | iterparse {new_t * 1e3:8.1f} ms {new_mem / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [10000]
+    for n in sizes:
+        bench(n)
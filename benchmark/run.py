@@ -0,0 +1,251 @@
+"""
+Benchmark suite: Bbox construction and conversion, Dataset batch APIs, and
+load/dump/save/round-trip of every registered format over a synthetic
+corpus, plus the memory footprint per box. Results are printed and can be
+written as JSON to compare runs.
+
+    python benchmark/run.py [--images 200] [--boxes 50] [--repeat 5] [--only voc] [--out results.json] [--compare baseline.json]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # the repo root, so unibox imports without installing it
+
+from unibox import Bbox, Dataset, DatasetCollection
+from unibox import transforms as T
+from unibox.formats import registry
+
+IMG_WH = [1920, 1080]
+
+
+def make_dataset(num_boxes: int, seed: int = 0, name: str = "synthetic.jpg") -> Dataset:
+    rng = np.random.default_rng(seed)
+    lt = rng.uniform(0, 0.8, size=(num_boxes, 2)) * IMG_WH
+    wh = rng.uniform(0.01, 0.2, size=(num_boxes, 2)) * IMG_WH
+    dset = Dataset(name)
+    dset["img_shape"] = list(IMG_WH)
+    dset.extend(np.round(np.concatenate([lt, lt + wh], axis=1)), "ltrb", True, rng.integers(0, 20, num_boxes), IMG_WH)
+    return dset
+
+
+def make_corpus(root: str, format: str, num_images: int, num_boxes: int) -> list:
+    """
+    Write `num_images` label files of `num_boxes` boxes each; returns their paths.
+    """
+    suffix = registry.get_format(format).suffix
+    paths = []
+    for i in range(num_images):
+        path = os.path.join(root, f"{i:06d}{suffix}")
+        make_dataset(num_boxes, seed=i, name=f"{i:06d}.jpg").save(path, format)
+        paths.append(path)
+    return paths
+
+
+def timed(func, repeat: int) -> float:
+    """
+    The best wall time of `repeat` calls, with the garbage collector off.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def memory(func) -> tuple:
+    """
+    The bytes still allocated by the result of `func`, and the peak.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+class Suite:
+    def __init__(self, repeat: int, only: str | None) -> None:
+        self.repeat = repeat
+        self.only = only
+        self.results = []
+
+    def run(self, name: str, func, boxes: int, files: int = 1, with_memory: bool = False):
+        if self.only and self.only not in name:
+            return
+        seconds = timed(func, self.repeat)
+        row = {
+            "name": name,
+            "boxes": boxes,
+            "files": files,
+            "seconds": seconds,
+            "us_per_box": seconds / max(boxes, 1) * 1e6,
+            "us_per_file": seconds / max(files, 1) * 1e6,
+        }
+        if with_memory:
+            retained, peak = memory(func)
+            row["bytes_per_box"] = retained / max(boxes, 1)
+            row["peak_bytes_per_box"] = peak / max(boxes, 1)
+        self.results.append(row)
+        mem = f" {row['bytes_per_box']:8.1f} B/box retained {row['peak_bytes_per_box']:8.1f} peak" if with_memory else ""
+        print(f"{name:28s} {row['us_per_box']:10.3f} us/box {row['us_per_file']:12.1f} us/file{mem}", flush=True)
+
+
+def bench_bbox(suite: Suite, num_boxes: int):
+    boxes = make_dataset(num_boxes).boxes.boxes
+    rows = [box for box in boxes]
+
+    def construct():
+        return [Bbox(box, "ltrb", True, "0", IMG_WH) for box in rows]
+
+    bboxes = construct()
+    suite.run("bbox.construct", construct, num_boxes, with_memory=True)
+    suite.run("bbox.from_array", lambda: Bbox.from_array(boxes, "ltrb", True, None, IMG_WH), num_boxes, with_memory=True)
+    suite.run("bbox.convert", lambda: [bbox.xywh(False) for bbox in bboxes], num_boxes)
+    suite.run("bbox.convert_batch", lambda: Bbox.convert(boxes, "ltrb", "xywh"), num_boxes)
+    suite.run("bbox.check_boxes", lambda: Bbox.check_boxes(boxes), num_boxes)
+
+
+def bench_dataset(suite: Suite, num_boxes: int):
+    dset = make_dataset(num_boxes)
+    boxes, labels = dset.boxes.boxes, dset.boxes.labels
+
+    def append():
+        out = Dataset()
+        for bbox in dset.anno:
+            out.append(bbox)
+        return out
+
+    def extend():
+        out = Dataset()
+        out.extend(boxes, "ltrb", True, labels, IMG_WH)
+        return out
+
+    suite.run("dataset.append", append, num_boxes)
+    suite.run("dataset.extend", extend, num_boxes, with_memory=True)
+    suite.run("dataset.anno", lambda: dset.anno, num_boxes)
+    suite.run("dataset.ltrb", lambda: dset.boxes.ltrb(False, IMG_WH), num_boxes)
+
+    chain = [T.Crop([100, 0, 1820, 1080]), T.HFlip(), T.Letterbox(640)]
+
+    def rebuild():
+        # the per-box path: one Bbox per transformed box
+        matrix, out_wh = T.fuse(chain, IMG_WH)
+        return [
+            Bbox(box, "ltrb", True, bbox.label, out_wh)
+            for bbox in dset.anno
+            for box in [Bbox.clip(T.apply_matrix(bbox.ltrb(True), matrix)[0], out_wh)]
+            if box[2] > box[0] and box[3] > box[1]
+        ]
+
+    def transform():
+        out = Dataset()
+        out["img_shape"] = list(IMG_WH)
+        out.extend(boxes, "ltrb", True, labels, IMG_WH)
+        return out.transform(*chain)
+
+    suite.run("dataset.transform_per_box", rebuild, num_boxes)
+    suite.run("dataset.transform", transform, num_boxes)
+
+
+def bench_format(suite: Suite, key: str, root: str, num_images: int, num_boxes: int):
+    dset = make_dataset(num_boxes)
+    data = dset.dump(key)
+    outfile = os.path.join(root, "out" + registry.get_format(key).suffix)
+    suite.run(f"{key}.dump", lambda: dset.dump(key), num_boxes)
+    suite.run(f"{key}.save", lambda: dset.save(outfile, key), num_boxes)
+    suite.run(f"{key}.load", lambda: Dataset("synthetic.jpg").load(key, BytesIO(data)), num_boxes, with_memory=True)
+    suite.run(f"{key}.round_trip", lambda: Dataset("synthetic.jpg").load(key, BytesIO(data)).dump(key), num_boxes)
+
+    corpus = os.path.join(root, key)
+    os.makedirs(corpus)
+    paths = make_corpus(corpus, key, num_images, num_boxes)
+    total = num_images * num_boxes
+    suite.run(f"{key}.load_corpus", lambda: [len(d) for d in DatasetCollection(paths, key)], total, num_images)
+
+
+def metadata(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "args": vars(args),
+    }
+
+
+def compare(path: str, results: list, tolerance: float) -> list:
+    """
+    Print the speedup of every benchmark against a previous run and return
+    the names of those slower by more than `tolerance`.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        baseline = {row["name"]: row for row in json.load(file)["results"]}
+    regressions = []
+    for row in results:
+        old = baseline.get(row["name"])
+        if old is None:
+            continue
+        ratio = old["us_per_box"] / row["us_per_box"]
+        flag = ""
+        if ratio < 1 / (1 + tolerance):
+            regressions.append(row["name"])
+            flag = "  REGRESSION"
+        print(f"{row['name']:28s} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=200, help="label files per corpus")
+    parser.add_argument("--boxes", type=int, default=50, help="boxes per image")
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many runs")
+    parser.add_argument("--formats", nargs="*", default=None, help="formats to benchmark, all registered if omitted")
+    parser.add_argument("--only", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--out", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="a previous JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    suite = Suite(args.repeat, args.only)
+    bench_bbox(suite, args.boxes * 20)
+    bench_dataset(suite, args.boxes * 20)
+    with tempfile.TemporaryDirectory() as root:
+        for key in args.formats or list(registry._formats):
+            bench_format(suite, key, root, args.images, args.boxes)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump({"meta": metadata(args), "results": suite.results}, file, indent=2)
+    if args.compare:
+        if compare(args.compare, suite.results, args.tolerance):
+            sys.exit(1)
+    return suite.results
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,32 @@ class TestBbox(unittest.TestCase):
         expected = [10, 20, 30, 40]
         self.assertEqual(Bbox.convert(np.array(box), "ltwh", "ltrb").tolist(), expected)
 
+    def test_convert_batched(self):
+        boxes = np.array([[10, 20, 30, 40], [0, 0, 10, 10]])
+        expected = [[20, 30, 20, 20], [5, 5, 10, 10]]
+        self.assertEqual(Bbox.convert(boxes, "ltrb", "xywh").tolist(), expected)
+        self.assertEqual(Bbox.convert(np.array(expected), "xywh", "ltrb").tolist(), boxes.tolist())
+        self.assertEqual(Bbox.convert(np.array(expected), "xywh", "ltwh").tolist(), [[10, 20, 20, 20], [0, 0, 10, 10]])
+
+    def test_check_boxes(self):
+        boxes = Bbox.check_boxes([[0.5, 0.5, 0.2, 0.4], [0.1, 0.1, 0.2, 0.2]], "xywh", False)
+        np.testing.assert_allclose(boxes, [[0.4, 0.3, 0.6, 0.7], [0.0, 0.0, 0.2, 0.2]])
+
+        with self.assertRaises(ValueError):
+            Bbox.check_boxes([[10, 20, 30, 40], [-1, 20, 30, 40]])
+        with self.assertRaises(ValueError):
+            Bbox.check_boxes([[0.1, 0.2, 1.3, 0.4]], "ltrb", False)
+        with self.assertRaises(ValueError):
+            Bbox.check_boxes([[30, 20, 10, 40]])
+        with self.assertRaises(ValueError):
+            Bbox.check_boxes([[10, 20, 30]])
+
+    def test_norm2pixel_batched(self):
+        boxes = np.array([[0.1, 0.2, 0.3, 0.4], [0.5, 0.5, 1.0, 1.0]])
+        expected = [[10, 40, 30, 80], [50, 100, 100, 200]]
+        np.testing.assert_allclose(Bbox.norm2pixel(boxes, [100, 200]), expected)
+        np.testing.assert_allclose(Bbox.pixel2norm(np.array(expected), [100, 200]), boxes)
+
     def test_get_safe_box(self):
         # Test getting safe box with different formats and is_pixel_distance
         box = [0.1, 0.2, 0.3, 0.4]
@@ -83,6 +109,22 @@ class TestBbox(unittest.TestCase):
         with self.assertRaises(ValueError):
             Bbox([10, 20, 30, 40], "invalid", True)
 
+    def test_from_array(self):
+        boxes = Bbox.from_array([[0.5, 0.5, 0.2, 0.4], [0.1, 0.1, 0.1, 0.1]], "xywh", False, [3, "car"], [100, 200], {1: {"a": 1}})
+        expected = Bbox([0.5, 0.5, 0.2, 0.4], "xywh", False, "3", [100, 200])
+        self.assertEqual(boxes[0].ltrb(True).tolist(), expected.ltrb(True).tolist())
+        self.assertEqual([b.label for b in boxes], ["3", "car"])
+        self.assertEqual([b.info for b in boxes], [None, {"a": 1}])
+        with self.assertRaises(ValueError):
+            Bbox.from_array([[0.1, 0.1, 0.2, 1.5]], "ltrb", False)
+
+    def test_from_ltrb_unchecked(self):
+        bbox = Bbox.from_ltrb_unchecked(np.array([10.0, 20, 30, 40]), label="car")
+        self.assertEqual(bbox.xywh().tolist(), [20, 30, 20, 20])
+        self.assertEqual(bbox.label, "car")
+        with self.assertRaises(AttributeError):
+            bbox.score = 1.0  # no __dict__
+
 
 
 if __name__ == '__main__':
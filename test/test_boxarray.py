@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from unibox import Bbox, BoxArray
+
+
+class TestBoxArray(unittest.TestCase):
+
+    def setUp(self):
+        self.array = BoxArray()
+        self.array.append(Bbox([10, 20, 30, 40], "ltrb", True, "car", [100, 100]))
+        self.array.append(Bbox([0.5, 0.5, 0.2, 0.2], "xywh", False, "bus", info={"extra": [0.9]}))
+
+    def test_columns(self):
+        self.assertEqual(len(self.array), 2)
+        self.assertEqual(self.array.boxes.shape, (2, 4))
+        self.assertEqual(self.array.labels, ["car", "bus"])
+        self.assertEqual(self.array.is_pixel.tolist(), [True, False])
+        self.assertEqual(self.array.img_shapes.tolist(), [[100, 100], [-1, -1]])
+
+    def test_view(self):
+        view = self.array[1]
+        self.assertIsInstance(view, Bbox)
+        self.assertEqual(view.label, "bus")
+        self.assertEqual(view.info, {"extra": [0.9]})
+        self.assertIsNone(view.img_wh())
+        np.testing.assert_allclose(view.ltrb(False), [0.4, 0.4, 0.6, 0.6])
+        view.setlabel = "truck"
+        self.assertEqual(self.array.labels, ["car", "truck"])
+
+    def test_pop(self):
+        bbox = self.array.pop(0)
+        self.assertEqual(bbox.label, "car")
+        self.assertEqual(len(self.array), 1)
+        self.assertEqual(self.array[0].info, {"extra": [0.9]})
+        with self.assertRaises(IndexError):
+            self.array.pop(1)
+
+    def test_extend(self):
+        self.array.extend(np.array([[1, 2, 3, 4], [5, 6, 7, 8]]), ["bus", "person"], True, [50, 50])
+        self.assertEqual(len(self.array), 4)
+        self.assertEqual(self.array.labels[2:], ["bus", "person"])
+        self.assertEqual(self.array.names, ["car", "bus", "person"])
+
+    def test_ltrb(self):
+        np.testing.assert_allclose(
+            self.array.ltrb(True, img_shape=[200, 100]),
+            [[10, 20, 30, 40], [80, 40, 120, 60]],
+        )
+        with self.assertRaises(ValueError):
+            self.array.ltrb(True)
+
+    def test_intern_order_and_hash(self):
+        array = BoxArray()
+        array.extend(np.array([[1, 2, 3, 4]] * 3), ["zebra", "ant", "zebra"], True, [50, 50])
+        self.assertEqual(array.names, ["zebra", "ant"])
+        self.assertEqual(array.class_ids.tolist(), [0, 1, 0])
+        self.assertEqual(len({array[0], array[1], array[2]}), 2)
+        self.assertEqual(hash(array[0]), hash(array[2]))
+
+    def test_mapping(self):
+        self.array.extend(np.array([[1, 2, 3, 4], [5, 6, 7, 8]]), ["person", "car"], True, [50, 50])
+        self.array.pop(2)
+        mapping = {"car": "0", "bus": "1"}  # "person" is no longer used
+        self.assertEqual(self.array.mapped_names(mapping), ["0", "1", None])
+        self.assertEqual(self.array.mapped_labels(mapping).tolist(), ["0", "1", "0"])
+
+        self.array.remap({"bus": "car"})
+        self.assertEqual(self.array.names, ["car"])
+        self.assertEqual(self.array.class_ids.tolist(), [0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from unibox import Dataset
+from unibox.formats.coco import Coco, CocoReader, _JsonStream
+
+ASSET = os.path.join(os.path.dirname(__file__), "..", ".asset")
+
+DOC = {
+    "info": {"description": "a {tricky} \"doc\" ]"},
+    "images": [
+        {"id": 7, "file_name": "a.jpg", "width": 640, "height": 480},
+        {"id": 3, "file_name": "b.jpg", "width": 100, "height": 50},
+        {"id": 9, "file_name": "empty.jpg", "width": 10, "height": 10},
+    ],
+    "annotations": [
+        {"id": 1, "image_id": 3, "category_id": 2, "bbox": [10, 5, 20, 10.5], "iscrowd": 0, "segmentation": [[1, 2, 3, 4]]},
+        {"id": 2, "image_id": 7, "category_id": 1, "bbox": [100, 100, 50, 60], "iscrowd": 1},
+        {"id": 3, "image_id": 3, "category_id": 1, "bbox": [1, 2, 3, 4]},
+    ],
+    "categories": [{"id": 2, "name": "bus"}, {"id": 1, "name": "pérson"}],
+}
+
+
+class TestCoco(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "instances.json")
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(DOC, file, indent=1, ensure_ascii=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_stream(self):
+        seen = []
+        text = json.dumps({"n": 12345, "xs": [1.5, {"a": "]"}, [2]], "s": "x"})
+        for chunk in (1, 3, 1 << 20):
+            seen.clear()
+            meta = _JsonStream(io.StringIO(text), chunk).items({"xs": seen.append})
+            self.assertEqual(meta, {"n": 12345, "s": "x"})
+            self.assertEqual(seen, [1.5, {"a": "]"}, [2]])
+
+    def test_reader(self):
+        reader = Coco.open(self.path, img_dir="images")
+        self.assertIs(reader, Coco.open(self.path, img_dir="images"))
+        self.assertEqual(len(reader), 3)
+        self.assertEqual(reader.meta["info"], DOC["info"])
+        dset = reader[reader.index(3)]
+        self.assertEqual(dset.img_path, os.path.join("images", "b.jpg"))
+        self.assertEqual(dset["img_shape"], [100, 50])
+        self.assertEqual(dset.boxes.labels, ["bus", "pérson"])
+        np.testing.assert_allclose(dset.boxes.boxes, [[10, 5, 30, 15.5], [1, 2, 4, 6]])
+        self.assertEqual(reader[0].anno[0].info, {"iscrowd": 1})
+        self.assertEqual(len(reader[2]), 0)
+        self.assertEqual(reader.index(os.path.join("images", "a.jpg")), 0)
+
+    def test_load(self):
+        dset = Dataset().load("coco", lb_path=self.path, image_id=7)
+        self.assertEqual(dset.img_path, "a.jpg")
+        self.assertEqual(dset.boxes.ltrb(False).tolist(), [[100 / 640, 100 / 480, 150 / 640, 160 / 480]])
+        with open(self.path, "rb") as file:
+            dset = Dataset("b.jpg").load("coco", file.read())
+        self.assertEqual(len(dset), 2)
+
+    def test_round_trip(self):
+        yolo = Dataset(os.path.join(ASSET, "bus.jpg")).load("yolo", lb_path=os.path.join(ASSET, "bus.txt"))
+        path = os.path.join(self.tmpdir.name, "out.json")
+        count = Coco.write(path, [yolo, *CocoReader(self.path)], mapping={"0": "pérson", "1": "bus", "bus": "bus", "pérson": "pérson"})
+        self.assertEqual(count, 4)
+
+        reader = CocoReader(path)
+        self.assertEqual(reader.names, ["pérson", "bus"])
+        self.assertEqual(reader.image_ids.tolist(), [1, 7, 3, 9])
+        np.testing.assert_allclose(reader[0].boxes.ltrb(True), yolo.boxes.ltrb(True, yolo["img_shape"]), atol=0.01)
+        self.assertEqual(reader[2].boxes.boxes.tolist(), CocoReader(self.path)[1].boxes.boxes.tolist())
+        self.assertEqual(reader[1].anno[0].info, {"iscrowd": 1})
+
+        single = json.loads(yolo.dump("coco", mapping={"0": "person", "1": "bus"}))
+        self.assertEqual(len(single["annotations"]), 4)
+        self.assertEqual(single["images"][0]["width"], 810)
+
+    def test_index(self):
+        doc = dict(DOC, images=DOC["images"] + [dict(DOC["images"][1], file_name="c.jpg")])
+        reader = CocoReader(io.BytesIO(json.dumps(doc).encode("utf-8")))
+        self.assertEqual([reader.index(key) for key in (7, 3, np.int64(9))], [0, 1, 2])
+        with self.assertRaises(KeyError):
+            reader.index(4)
+        with self.assertRaises(KeyError):
+            reader.index(100)
+
+    def test_invalid_box(self):
+        doc = dict(DOC, annotations=DOC["annotations"] + [{"id": 4, "image_id": 3, "category_id": 1, "bbox": [5, 5, -2, 4]}])
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(doc, file)
+        reader = CocoReader(self.path)
+        self.assertEqual(reader.invalid.tolist(), [3])
+        self.assertEqual(len(reader[0]), 1)
+        with self.assertRaises(ValueError):
+            reader[1]
+        self.assertEqual(len(Dataset().load("coco", lb_path=self.path, image_id=9)), 0)
+        with self.assertRaises(ValueError):
+            Dataset().load("coco", lb_path=self.path, image_id=3)
+        dset = Dataset().load("coco", lb_path=self.path, image_id=3, check=False)
+        self.assertEqual(dset.boxes.boxes.tolist()[2], [5, 5, 3, 9])
+
+    def test_unknown_category(self):
+        doc = dict(DOC, categories=DOC["categories"][:1])
+        with self.assertRaises(ValueError):
+            CocoReader(io.BytesIO(json.dumps(doc).encode("utf-8")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unibox import DatasetCollection
+
+ASSET = os.path.join(os.path.dirname(__file__), "..", ".asset")
+
+
+class TestDatasetCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.labels = os.path.join(self.tmpdir.name, "labels")
+        self.images = os.path.join(self.tmpdir.name, "images")
+        os.makedirs(self.labels)
+        os.makedirs(self.images)
+        for i in range(5):
+            shutil.copy(os.path.join(ASSET, "bus.txt"), os.path.join(self.labels, f"{i}.txt"))
+            shutil.copy(os.path.join(ASSET, "bus.jpg"), os.path.join(self.images, f"{i}.jpg"))
+        with open(os.path.join(self.labels, "5.txt"), "w") as file:
+            file.write("0 0.5 0.5 0.1 0.1\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sources(self):
+        by_dir = list(DatasetCollection(self.labels, "yolo", img_dir=self.images))
+        self.assertEqual(len(by_dir), 6)
+        self.assertTrue(by_dir[0].img_path.endswith("0.jpg"))
+        self.assertIsNone(by_dir[5].img_path)
+
+        by_glob = list(DatasetCollection(os.path.join(self.labels, "[0-2].txt"), "yolo", img_dir=self.images))
+        self.assertEqual([os.path.basename(d.img_path) for d in by_glob], ["0.jpg", "1.jpg", "2.jpg"])
+
+        by_list = list(DatasetCollection([os.path.join(self.labels, "5.txt")], "yolo"))
+        self.assertEqual(len(by_list[0]), 1)
+
+    def test_pipeline(self):
+        dsets = DatasetCollection(self.labels, "yolo").filter(lambda d: len(d) > 1)
+        dsets = dsets.map(lambda d: d.remove_label(0) or d)
+        self.assertEqual([len(d) for d in dsets], [3] * 5)
+        self.assertEqual([len(d) for d in dsets.prefetch(2)], [3] * 5)
+        self.assertEqual([len(chunk) for chunk in dsets.chunks(2)], [2, 2, 1])
+
+    def test_on_error(self):
+        with open(os.path.join(self.labels, "6.txt"), "w") as file:
+            file.write("0 0.5 0.5 1.5 0.1\n")
+        with self.assertRaises(ValueError):
+            list(DatasetCollection(self.labels, "yolo"))
+        self.assertEqual(len(list(DatasetCollection(self.labels, "yolo", on_error="skip"))), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
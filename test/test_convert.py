@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unibox import Dataset, convert_tree
+from unibox.convert import find_pairs
+from unibox.manifest import Manifest
+
+ASSET = os.path.join(os.path.dirname(__file__), "..", ".asset")
+
+
+class TestConvertTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmpdir.name, "src")
+        self.dst = os.path.join(self.tmpdir.name, "dst")
+        for sub in ("a", "b"):
+            os.makedirs(os.path.join(self.src, sub))
+            shutil.copy(os.path.join(ASSET, "bus.txt"), os.path.join(self.src, sub, "bus.txt"))
+            shutil.copy(os.path.join(ASSET, "bus.jpg"), os.path.join(self.src, sub, "bus.jpg"))
+        with open(os.path.join(self.src, "a", "broken.txt"), "w") as file:
+            file.write("0 0.5 0.5 1.5 0.5\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_find_pairs(self):
+        pairs = dict(find_pairs(self.src, "yolo"))
+        self.assertEqual(len(pairs), 3)
+        self.assertTrue(pairs[os.path.join(self.src, "a", "bus.txt")].endswith("bus.jpg"))
+        self.assertIsNone(pairs[os.path.join(self.src, "a", "broken.txt")])
+
+    def test_convert_tree(self):
+        mapping = {"0": "person", "1": "bus"}
+        for jobs in (1, 2):
+            errors = convert_tree(self.src, "yolo", self.dst, "voc", mapping=mapping, jobs=jobs, chunksize=1)
+            self.assertEqual([os.path.basename(path) for path, _ in errors], ["broken.txt"])
+            for sub in ("a", "b"):
+                dset = Dataset().load("voc", lb_path=os.path.join(self.dst, sub, "bus.xml"))
+                self.assertEqual(len(dset), 4)
+                self.assertEqual(dset.anno[0].label, "person")
+
+    def test_manifest(self):
+        manifest = os.path.join(self.tmpdir.name, "manifest.json")
+        outputs = [os.path.join(self.dst, sub, "bus.xml") for sub in ("a", "b")]
+        convert_tree(self.src, "yolo", self.dst, "voc", jobs=1, manifest=manifest)
+        self.assertEqual(len(Manifest(manifest, None).entries), 0)  # other settings
+        for path in outputs:
+            os.utime(path, ns=(0, 0))
+
+        # one source edited, the other only touched
+        with open(os.path.join(self.src, "a", "bus.txt"), "a") as file:
+            file.write("0 0.5 0.5 0.1 0.1\n")
+        os.utime(os.path.join(self.src, "b", "bus.txt"))
+        errors = convert_tree(self.src, "yolo", self.dst, "voc", jobs=2, manifest=manifest)
+        self.assertEqual(len(errors), 1)
+        self.assertNotEqual(os.stat(outputs[0]).st_mtime_ns, 0)
+        self.assertEqual(os.stat(outputs[1]).st_mtime_ns, 0)
+        self.assertEqual(len(Dataset().load("voc", lb_path=outputs[0])), 5)
+
+        # so does a replaced image
+        with open(os.path.join(self.src, "b", "bus.jpg"), "ab") as file:
+            file.write(b"\0")
+        convert_tree(self.src, "yolo", self.dst, "voc", jobs=1, manifest=manifest)
+        self.assertNotEqual(os.stat(outputs[1]).st_mtime_ns, 0)
+        os.utime(outputs[1], ns=(0, 0))
+
+        # a changed mapping invalidates everything
+        convert_tree(self.src, "yolo", self.dst, "voc", mapping={"0": "person", "1": "bus"}, jobs=1, manifest=manifest)
+        self.assertNotEqual(os.stat(outputs[1]).st_mtime_ns, 0)
+
+    def test_save_manifest(self):
+        lb_path = os.path.join(self.src, "a", "bus.txt")
+        outfile = os.path.join(self.tmpdir.name, "bus.xml")
+        with Manifest(os.path.join(self.tmpdir.name, "manifest.json")) as manifest:
+            self.assertFalse(manifest.is_current(lb_path, outfile))
+            Dataset(os.path.join(ASSET, "bus.jpg")).load("yolo", lb_path=lb_path).save(outfile, "voc", manifest=manifest)
+            self.assertTrue(manifest.is_current(lb_path, outfile))
+        self.assertTrue(Manifest(manifest.path).is_current(lb_path, outfile))
+
+        with Manifest(os.path.join(self.tmpdir.name, "manifest.json")) as manifest:
+            self.assertTrue(manifest.is_current(lb_path, outfile, os.path.join(ASSET, "bus.jpg")))
+            self.assertFalse(manifest.is_current(lb_path, outfile, os.path.join(self.src, "a", "bus.jpg")))
+
+            # the label file changes between load and save
+            dset = Dataset(os.path.join(ASSET, "bus.jpg")).load("yolo", lb_path=lb_path)
+            with open(lb_path, "a") as file:
+                file.write("0 0.5 0.5 0.1 0.1\n")
+            dset.save(outfile, "voc", manifest=manifest)
+            self.assertFalse(manifest.is_current(lb_path, outfile))
+
+            img_path = os.path.join(self.src, "a", "bus.jpg")
+            Dataset(img_path).load("yolo", lb_path=lb_path).save(outfile, "voc", manifest=manifest)
+            self.assertTrue(manifest.is_current(lb_path, outfile, img_path))
+            os.utime(img_path, ns=(0, 0))
+            self.assertFalse(manifest.is_current(lb_path, outfile))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import json
 import unittest
+from io import BytesIO
 from pathlib import Path
+
+import numpy as np
+
 from unibox import Bbox,Dataset
+from unibox.formats import registry
 
 
 class TestDataset(unittest.TestCase):
@@ -19,6 +25,67 @@ class TestDataset(unittest.TestCase):
         self.assertEqual(len(self.dataset), 1)
         self.assertEqual(self.dataset.anno[0], bbox)
 
+    def test_extend(self):
+        self.dataset.extend([[0.5, 0.5, 0.2, 0.2], [0.1, 0.1, 0.2, 0.2]], "xywh", False, ["1", "2"])
+        self.assertEqual(len(self.dataset), 2)
+        self.assertEqual([bbox.label for bbox in self.dataset.anno], ["1", "2"])
+        with self.assertRaises(ValueError):
+            self.dataset.extend([[0.5, 0.5, 1.2, 0.2]], "xywh", False)
+
+    def test_load_yolo(self):
+        text = "0 0.5 0.5 0.2 0.2 0.9\n\n1 0.1 0.1 0.1 0.1\n3 0.3 0.3 0.1 0.1 0.5 7\n"
+        self.dataset.load("yolo", in_stream=text.encode())
+        self.assertEqual([bbox.label for bbox in self.dataset.anno], ["0", "1", "3"])
+        self.assertEqual(self.dataset.anno[0].info, {"extra": [0.9]})
+        self.assertEqual(self.dataset.anno[2].info, {"extra": [0.5, 7.0]})
+        self.assertEqual(self.dataset.anno[1].info, {})
+        self.assertEqual(self.dataset.anno[1].ltrb(False).tolist(), [0.05, 0.05, 0.15000000000000002, 0.15000000000000002])
+
+        with self.assertRaises(ValueError):
+            Dataset().load("yolo", in_stream=b"0 0.5 0.5 1.2 0.2")
+        with self.assertRaises(ValueError):
+            Dataset().load("yolo", in_stream=b"0 0.5 0.5 x 0.2")
+
+    def test_voc_round_trip(self):
+        self.dataset.img_path = "image.jpg"
+        self.dataset.extend([[10, 20, 30, 40], [5.4, 5.6, 50, 60]], labels=["car", "bus"], img_shape=[100, 100])
+        xml = self.dataset.dump("voc")
+        data = Dataset("image.jpg").load("voc", in_stream=xml)
+        self.assertEqual(data.boxes.ltrb().tolist(), [[10, 20, 30, 40], [5, 6, 50, 60]])
+        self.assertEqual(data.boxes.labels, ["car", "bus"])
+        self.assertEqual(data.anno[0].info, {"pose": "Unspecified", "truncated": "0", "difficult": "0"})
+        self.assertEqual(data.dump("voc"), xml)
+
+        dset = Dataset("image.jpg")
+        dset.extend([[10, 20, 30, 40]], labels=["a&b"], img_shape=[100, 100], infos={0: {"pose": "<Left & up>"}})
+        data = Dataset("image.jpg").load("voc", in_stream=dset.dump("voc"))
+        self.assertEqual((data.boxes.labels, data.anno[0].info["pose"]), (["a&b"], "<Left & up>"))
+
+        xml = xml.replace(b"<name>car</name>\n", b"").replace(b"<name>bus</name>", b"<name></name>")
+        self.assertEqual(Dataset("image.jpg").load("voc", in_stream=xml).boxes.labels, ["0", "0"])
+
+    def test_labelme_round_trip(self):
+        doc = {
+            "shapes": [
+                {"label": "car", "points": [[30, 40], [10, 20]], "shape_type": "rectangle"},
+                {"label": "road", "points": [[0, 0], [5, 5], [0, 5]], "shape_type": "polygon"},
+                {"label": "bus", "points": [[5, 6], [50, 6], [50, 60], [5, 60]], "shape_type": "rectangle"},
+            ],
+            "imagePath": "image.jpg",
+            "imageHeight": 80,
+            "imageWidth": 100,
+        }
+        self.dataset.load("labelme", in_stream=json.dumps(doc).encode())
+        self.assertEqual(self.dataset.img_path, "image.jpg")
+        self.assertEqual(self.dataset.boxes.labels, ["car", "bus"])
+        self.assertEqual(self.dataset.boxes.ltrb().tolist(), [[10, 20, 30, 40], [5, 6, 50, 60]])
+
+        compact = json.loads(self.dataset.dump("labelme", mapping={"car": "1", "bus": "2"}, compact=True))
+        self.assertEqual([shape["label"] for shape in compact["shapes"]], ["1", "2"])
+        self.assertEqual(compact["shapes"][1]["points"], [[5, 6], [50, 60]])
+        self.assertNotIn(b"\n", self.dataset.dump("labelme", compact=True))
+        self.assertEqual(json.loads(self.dataset.dump("labelme"))["imageWidth"], 100)
+
     def test_img_path_property(self):
         path = "/path/to/image.jpg"
         self.dataset.img_path = path
@@ -103,5 +170,57 @@ class TestDataset(unittest.TestCase):
         self.assertTrue(path.exists())
         path.unlink()
 
+    def test_tile(self):
+        dset = Dataset("big.jpg")
+        dset["img_shape"] = [300, 200]
+        dset.extend([[10, 10, 60, 60], [140, 90, 160, 110]], labels=["car", "bus"], img_shape=[300, 200], infos={1: {"pose": "Left"}})
+        tiles = dset.tile([150, 100], overlap=0, min_visible_ratio=0.25)
+        self.assertEqual([t["window"] for t in tiles], [[0, 0, 150, 100], [150, 0, 300, 100], [0, 100, 150, 200], [150, 100, 300, 200]])
+        self.assertEqual([len(t) for t in tiles], [2, 1, 1, 1])
+        self.assertEqual(tiles[0].boxes.labels, ["car", "bus"])
+        self.assertEqual(tiles[0].anno[1].ltrb(True).tolist(), [140, 90, 150, 100])
+        self.assertEqual(tiles[0].anno[1].info, {"pose": "Left"})
+        np.testing.assert_allclose(tiles[0].anno[0].xywh(False), [35 / 150, 0.35, 50 / 150, 0.5])
+        self.assertEqual(len(dset.tile([150, 100], skip_empty=True)), 1)
+
+    def test_load_auto(self):
+        dset = Dataset("image.jpg")
+        dset.extend([[10, 20, 30, 40]], labels=["car"], img_shape=[100, 100])
+        for format in ("yolo", "voc", "labelme", "coco", "shard"):
+            data = dset.dump(format, mapping={"car": "0"} if format == "yolo" else None)
+            self.assertEqual(registry.detect(b"\xef\xbb\xbf" + data if format == "voc" else data), format)
+            loaded = Dataset("image.jpg").load("auto", BytesIO(data))
+            self.assertEqual(loaded.boxes.ltrb(True, [100, 100]).round(6).tolist(), [[10, 20, 30, 40]])
+        self.assertEqual(registry.detect(b""), "yolo")
+        self.assertEqual(registry.detect(b"0 0.5 0.5 0.1 0.1\n1 0.2"), "yolo")
+        with self.assertRaises(ValueError):
+            registry.detect(b"hello world")
+
+    def test_detect_long_heads(self):
+        # a COCO 2017 file: "images" only starts after the info and licenses blocks
+        licenses = [
+            {"url": f"http://creativecommons.org/licenses/by-nc-sa/2.0/{i}", "id": i, "name": "Attribution-NonCommercial-ShareAlike License"}
+            for i in range(1, 9)
+        ]
+        info = {
+            "description": "COCO 2017 Dataset",
+            "url": "http://cocodataset.org",
+            "version": "1.0",
+            "year": 2017,
+            "contributor": "COCO Consortium",
+            "date_created": "2017/09/01",
+        }
+        data = json.dumps({"info": info, "licenses": licenses, "images": [], "annotations": [], "categories": []}).encode()
+        self.assertGreater(data.index(b'"images"'), 1024)
+        self.assertEqual(registry.detect(data), "coco")
+
+        # YOLO predictions whose last line is cut inside an exponent, or with short lines
+        line = b"0 0.412 0.5 0.1 0.2 1.5e-05\n"
+        data = line * 40
+        for cut in range(990, 1024):  # every position within a line
+            self.assertEqual(registry.detect(data[:cut]), "yolo")
+        self.assertEqual(registry.detect(b"\n0 0.5\n0 0.5 0.5 0.1 0.1\n"), "yolo")
+        self.assertEqual(len(Dataset().load("yolo", BytesIO(b"\n0 0.5\n0 0.5 0.5 0.1 0.1\n"))), 1)
+
 if __name__ == "__main__":
     unittest.main()
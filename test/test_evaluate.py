@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from unibox import Dataset, DatasetCollection
+from unibox.evaluate import Evaluator, evaluate
+
+
+def make(boxes, labels, scores=None, is_pixel_distance=True):
+    dset = Dataset()
+    infos = None if scores is None else {i: {"extra": [s]} for i, s in enumerate(scores)}
+    dset.extend(boxes, "ltrb", is_pixel_distance, labels, [100, 100], infos)
+    return dset
+
+
+class TestEvaluate(unittest.TestCase):
+
+    def setUp(self):
+        self.gt = [
+            make([[0, 0, 10, 10], [20, 20, 40, 40]], ["car", "person"]),
+            make([[50, 50, 90, 90]], ["car"]),
+        ]
+
+    def test_perfect(self):
+        preds = [make(d.boxes.boxes, d.boxes.labels, [0.9] * len(d)) for d in self.gt]
+        result = evaluate(self.gt, preds)
+        self.assertAlmostEqual(result["map"], 1.0)
+        self.assertEqual(result["ap"], {"car": 1.0, "person": 1.0})
+
+    def test_false_positive_and_miss(self):
+        preds = [
+            # a confident false positive ranked above the true positive
+            make([[0, 0, 10, 10], [60, 0, 70, 10]], ["0", "0"], [0.5, 0.9]),
+            make([], []),
+        ]
+        evaluator = Evaluator(mapping={"0": "car"})
+        evaluator.add_all(self.gt, preds)
+        result = evaluator.compute()
+        # car: recall 0.5 reached at precision 0.5; person never predicted
+        self.assertAlmostEqual(result["ap"]["car"], 51 * 0.5 / 101)
+        self.assertEqual(result["ap"]["person"], 0.0)
+        recall, precision = evaluator.pr_curve("car")
+        self.assertEqual(recall.tolist(), [0.0, 0.5])
+        self.assertEqual(precision.tolist(), [0.0, 0.5])
+
+    def test_iou_thresholds(self):
+        preds = [make([[0, 0, 10, 8]], ["car"], [1.0]), make([], [])]
+        result = evaluate(self.gt[:1], preds[:1], iou_thresholds=[0.5, 0.75, 0.9])
+        self.assertAlmostEqual(result["map50"], 1.0 / 2)  # person has no prediction
+        self.assertAlmostEqual(result["ap"]["car"], 2 / 3)
+
+    def test_mixed_units(self):
+        preds = [make([[0, 0, 0.1, 0.1], [0.2, 0.2, 0.4, 0.4]], ["car", "person"], is_pixel_distance=False)]
+        self.assertAlmostEqual(evaluate(self.gt[:1], preds)["map"], 1.0)
+
+    def test_parallel(self):
+        rng = np.random.default_rng(0)
+        gts, preds = [], []
+        for _ in range(40):
+            lt = rng.uniform(0, 80, (6, 2))
+            boxes = np.concatenate([lt, lt + rng.uniform(5, 20, (6, 2))], axis=1)
+            labels = rng.integers(0, 3, 6).tolist()
+            gts.append(make(np.clip(boxes, 0, 100), labels))
+            noisy = np.clip(boxes + rng.normal(0, 2, boxes.shape), 0, 100)
+            preds.append(make(noisy, labels, rng.random(6).tolist()))
+        serial = evaluate(gts, preds)
+        parallel = evaluate(gts, preds, jobs=2, chunksize=8)
+        self.assertAlmostEqual(serial["map"], parallel["map"])
+        self.assertTrue(0 < serial["map"] < 1)
+
+        # collections are loaded by the workers
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, dsets in (("gt", gts), ("pred", preds)):
+                os.makedirs(os.path.join(tmpdir, name))
+                for i, dset in enumerate(dsets):
+                    dset.img_path = f"{i:02d}.jpg"
+                    dset.save(os.path.join(tmpdir, name, f"{i:02d}.xml"), "voc")
+            collections = [DatasetCollection(os.path.join(tmpdir, name), "voc") for name in ("gt", "pred")]
+            serial = Evaluator()
+            serial.add_all(*collections)
+            parallel = Evaluator()
+            parallel.add_all(*collections, jobs=2, chunksize=8)
+        self.assertEqual(parallel.num_images, 40)
+        self.assertEqual(parallel.names, serial.names)
+        self.assertEqual(parallel._gt_counts.tolist(), serial._gt_counts.tolist())
+        np.testing.assert_array_equal(parallel.compute()["precision"], serial.compute()["precision"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from unibox import imagesize
+from unibox.imagesize import ShapeCache, get_image_size, imread_shape
+
+
+class TestImageSize(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.img = np.zeros((37, 53, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_formats(self):
+        for ext in (".jpg", ".png", ".bmp", ".webp", ".tif"):
+            path = os.path.join(self.tmpdir.name, "img" + ext)
+            cv2.imwrite(path, self.img)
+            self.assertEqual(get_image_size(path), [53, 37], ext)
+
+    def test_asset(self):
+        path = os.path.join(os.path.dirname(__file__), "..", ".asset", "bus.jpg")
+        if not os.path.exists(path):
+            self.skipTest("asset not found")
+        self.assertEqual(get_image_size(path), imread_shape(path))
+
+    def test_not_an_image(self):
+        path = os.path.join(self.tmpdir.name, "img.jpg")
+        with open(path, "wb") as file:
+            file.write(b"not an image")
+        with self.assertRaises(ValueError):
+            get_image_size(path)
+
+    def test_no_cv2_import(self):
+        asset = os.path.join(os.path.dirname(__file__), "..", ".asset")
+        code = (
+            "import sys\n"
+            "from unibox import Dataset\n"
+            f"dset = Dataset({os.path.join(asset, 'bus.jpg')!r}).load('yolo', lb_path={os.path.join(asset, 'bus.txt')!r})\n"
+            "dset.dump('voc')\n"
+            "print('cv2' in sys.modules)\n"
+        )
+        root = os.path.join(os.path.dirname(__file__), "..")
+        out = subprocess.run([sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=root), capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), "False", out.stderr)
+
+
+class TestShapeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.img_path = os.path.join(self.tmpdir.name, "img.png")
+        cv2.imwrite(self.img_path, np.zeros((37, 53, 3), dtype=np.uint8))
+        self.db_path = os.path.join(self.tmpdir.name, "cache", "shapes.sqlite")
+
+    def tearDown(self):
+        imagesize.set_shape_cache(None)
+        self.tmpdir.cleanup()
+
+    def test_persistent(self):
+        cache = ShapeCache(self.db_path)
+        self.assertIsNone(cache.get(self.img_path))
+        self.assertEqual(cache.lookup(self.img_path), [53, 37])
+        cache.close()
+
+        cache = ShapeCache(self.db_path)
+        self.assertEqual(cache.get(self.img_path), [53, 37])
+        cache.close()
+
+    def test_invalidation(self):
+        cache = imagesize.set_shape_cache(self.db_path)
+        self.assertEqual(get_image_size(self.img_path), [53, 37])
+        cv2.imwrite(self.img_path, np.zeros((20, 10, 3), dtype=np.uint8))
+        os.utime(self.img_path, ns=(0, 0))
+        self.assertIsNone(cache.get(self.img_path))
+        self.assertEqual(get_image_size(self.img_path), [10, 20])
+
+    def test_workers_flush(self):
+        from unibox import DatasetCollection
+        from unibox.validation import validate
+
+        runs = {
+            "collection": lambda root: list(DatasetCollection(root, "yolo", norm2pixel=True)),
+            "validation": lambda root: validate(root, "yolo", jobs=2, chunksize=1),
+        }
+        for name, run in runs.items():
+            root = os.path.join(self.tmpdir.name, name)
+            os.makedirs(root)
+            paths = []
+            for i in range(2):
+                paths.append(os.path.join(root, f"{i}.png"))
+                cv2.imwrite(paths[-1], np.zeros((37, 53 + i, 3), dtype=np.uint8))
+                with open(os.path.join(root, f"{i}.txt"), "w") as file:
+                    file.write("0 0.5 0.5 0.2 0.2\n")
+            imagesize.set_shape_cache(self.db_path)
+            run(root)
+            # another connection only sees what was committed
+            cache = ShapeCache(self.db_path)
+            self.assertEqual([cache.get(path) for path in paths], [[53, 37], [54, 37]], name)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+import unittest
+
+from unibox.index import ClassIndex
+
+
+class TestClassIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.labels = os.path.join(self.tmpdir.name, "labels")
+        os.makedirs(self.labels)
+        self.write("a", "0 0.5 0.5 0.1 0.1\n1 0.5 0.5 0.1 0.1\n1 0.2 0.2 0.1 0.1\n")
+        self.write("b", "2 0.5 0.5 0.1 0.1\n")
+        self.write("c", "1 0.5 0.5 0.1 0.1\n")
+        self.write("d", "0 0.5 0.5 1.5 0.1\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.labels, name + ".txt"), "w") as file:
+            file.write(text)
+
+    def names(self, index, ids):
+        return [os.path.basename(p) for p in index.paths_of(ids)]
+
+    def test_queries(self):
+        index = ClassIndex.build(self.labels, "yolo")
+        self.assertEqual(len(index), 3)
+        self.assertEqual([os.path.basename(p) for p, _ in index.errors], ["d.txt"])
+        self.assertEqual(self.names(index, index.images_with("1")), ["a.txt", "c.txt"])
+        self.assertEqual(self.names(index, index.images_with(1, min_count=2)), ["a.txt"])
+        self.assertEqual(self.names(index, index.images_with_more_than(1)), ["a.txt"])
+        self.assertEqual(len(index.images_with("7")), 0)
+        self.assertEqual(index.class_counts(), {"0": 1, "1": 3, "2": 1})
+        self.assertEqual(len(index.sample(2, label="1", seed=0)), 2)
+
+    def test_save_update(self):
+        index = ClassIndex.build(self.labels, "yolo", jobs=2)
+        path = os.path.join(self.tmpdir.name, "index.bin")  # np.savez would name it index.bin.npz
+        index.save(path)
+
+        index = ClassIndex.load(path)
+        self.assertEqual(self.names(index, index.images_with("1")), ["a.txt", "c.txt"])
+        time.sleep(0.01)
+        self.write("b", "1 0.5 0.5 0.1 0.1\n")
+        os.remove(os.path.join(self.labels, "c.txt"))
+        self.assertEqual(index.update(), 2)  # b.txt and the still broken d.txt
+        self.assertEqual(self.names(index, index.images_with("1")), ["a.txt", "b.txt"])
+        self.assertEqual(len(index.images_with("2")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from unibox import Dataset
+from unibox.ops import box_giou, box_iou, duplicates, nms, overlapping_pairs, tile_boxes
+
+
+class TestOps(unittest.TestCase):
+
+    def setUp(self):
+        self.boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 20], [20, 20, 30, 30], [1, 1, 10, 10]], dtype=float)
+
+    def test_iou(self):
+        iou = box_iou(self.boxes, self.boxes[:2], block_size=3)
+        np.testing.assert_allclose(iou, [[1, 0.5], [0.5, 1], [0, 0], [0.81, 0.405]])
+
+    def test_giou(self):
+        giou = box_giou(self.boxes[:3], self.boxes[2:3])
+        np.testing.assert_allclose(giou[:, 0], [-(900 - 200) / 900, -(900 - 300) / 900, 1])
+
+    def test_nms(self):
+        scores = np.array([0.5, 0.9, 0.8, 0.7])
+        self.assertEqual(nms(self.boxes, scores, 0.45).tolist(), [1, 2, 3])
+        self.assertEqual(nms(self.boxes, scores, 0.45, classes=np.array([0, 1, 0, 0])).tolist(), [1, 2, 3])
+        self.assertEqual(nms(self.boxes, scores, 0.3, classes=np.array([0, 1, 0, 1])).tolist(), [1, 2, 0])
+
+    def test_blocked(self):
+        rng = np.random.default_rng(0)
+        lt = rng.uniform(0, 100, (500, 2))
+        boxes = np.concatenate([lt, lt + rng.uniform(1, 30, (500, 2))], axis=1)
+        mask = duplicates(boxes, 0.3, block_size=7)
+        self.assertTrue(np.array_equal(mask, duplicates(boxes, 0.3, block_size=1000)))
+        kept = boxes[~mask]
+        iou = box_iou(kept, kept)
+        np.fill_diagonal(iou, 0)
+        self.assertLessEqual(iou.max(), 0.3)
+
+    def test_dense(self):
+        # many boxes piled on each other, with classes, against a plain greedy NMS
+        rng = np.random.default_rng(1)
+        lt = rng.uniform(0, 20, (300, 2))
+        boxes = np.concatenate([lt, lt + rng.uniform(5, 40, (300, 2))], axis=1)
+        scores, classes = rng.random(300), rng.integers(0, 3, 300)
+        iou = box_iou(boxes, boxes)
+        expected = []
+        for i in np.argsort(-scores, kind="stable").tolist():
+            if all(iou[i, k] <= 0.5 or classes[i] != classes[k] for k in expected):
+                expected.append(i)
+        for block_size in (5, 64, 512):
+            self.assertEqual(nms(boxes, scores, 0.5, classes, block_size).tolist(), expected)
+        i, j = np.triu_indices(300, 1)
+        hit = iou[i, j] > 0.5
+        self.assertEqual(overlapping_pairs(boxes, 0.5, block_size=7).tolist(), np.stack([i[hit], j[hit]], 1).tolist())
+
+    def test_deduplicate(self):
+        dset = Dataset()
+        dset.extend(self.boxes + 1, labels=["a", "a", "a", "b"], infos={3: {"pose": "Left"}})
+        dset.deduplicate(0.45)
+        self.assertEqual(dset.boxes.boxes.tolist(), (self.boxes[[0, 2, 3]] + 1).tolist())
+        self.assertEqual(dset.anno[2].info, {"pose": "Left"})
+        dset.deduplicate(0.45, class_aware=False)
+        self.assertEqual(len(dset), 2)
+
+    def test_tile_boxes(self):
+        boxes = np.array([[10, 10, 30, 30], [90, 10, 130, 20], [150, 150, 199, 199]], dtype=float)
+        windows, tile_ids, box_ids, clipped = tile_boxes(boxes, [200, 200], 100, overlap=0.2, min_visible_ratio=0.4)
+        self.assertEqual(windows[:, 0].tolist(), [0, 80, 100] * 3)
+        self.assertEqual(windows[:, 1].tolist(), [0] * 3 + [80] * 3 + [100] * 3)
+        # box 1 straddles the first two columns; 10 of its 40 pixels are in the first
+        self.assertEqual(list(zip(tile_ids.tolist(), box_ids.tolist())), [(0, 0), (1, 1), (2, 1), (5, 2), (7, 2), (8, 2)])
+        self.assertEqual(clipped[1].tolist(), [10, 10, 50, 20])
+        self.assertEqual(clipped[3].tolist(), [50, 70, 99, 100])
+        self.assertEqual(clipped[5].tolist(), [50, 50, 99, 99])
+
+
+if __name__ == "__main__":
+    unittest.main()
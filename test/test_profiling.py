@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unibox import Dataset, convert_tree, profiling
+
+ASSET = os.path.join(os.path.dirname(__file__), "..", ".asset")
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_disabled(self):
+        profiling.stats.reset()
+        Dataset(os.path.join(ASSET, "bus.jpg")).load("yolo", lb_path=os.path.join(ASSET, "bus.txt")).dump("voc")
+        self.assertEqual(profiling.stats.as_dict(), {})
+
+    def test_stages(self):
+        seen = []
+        outfile = os.path.join(self.tmpdir.name, "bus.json")
+        with profiling.profile(lambda *args: seen.append(args[0])) as stats:
+            dset = Dataset(os.path.join(ASSET, "bus.jpg")).load("yolo", lb_path=os.path.join(ASSET, "bus.txt"))
+            dset.save(outfile, "labelme")
+        self.assertFalse(profiling.is_enabled())
+
+        stages = stats.as_dict()
+        self.assertEqual(stages["read"]["bytes"], os.path.getsize(os.path.join(ASSET, "bus.txt")))
+        self.assertEqual(stages["import.yolo"]["boxes"], 4)
+        self.assertEqual(stages["validate"]["boxes"], 4)
+        self.assertEqual(stages["export.labelme"]["boxes"], 4)
+        self.assertEqual(stages["write"]["bytes"], os.path.getsize(outfile))
+        self.assertIn("image_size", stages)
+        self.assertEqual(set(seen), set(stages))
+        self.assertIn("import.yolo", stats.report())
+
+    def test_convert_tree_workers(self):
+        src = os.path.join(self.tmpdir.name, "src")
+        for sub in ("a", "b"):
+            os.makedirs(os.path.join(src, sub))
+            shutil.copy(os.path.join(ASSET, "bus.txt"), os.path.join(src, sub, "bus.txt"))
+            shutil.copy(os.path.join(ASSET, "bus.jpg"), os.path.join(src, sub, "bus.jpg"))
+        with profiling.profile() as stats:
+            convert_tree(src, "yolo", os.path.join(self.tmpdir.name, "dst"), "voc", jobs=2, chunksize=1)
+        self.assertEqual(stats.as_dict()["import.yolo"]["calls"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
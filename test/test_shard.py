@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from unibox import Bbox, Dataset
+from unibox.formats.shard import Shard
+
+ASSET = os.path.join(os.path.dirname(__file__), "..", ".asset")
+
+
+class TestShard(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "corpus.ubs")
+        self.yolo = Dataset(os.path.join(ASSET, "bus.jpg")).load("yolo", lb_path=os.path.join(ASSET, "bus.txt"))
+        self.voc = Dataset("image.jpg")
+        self.voc.extend([[10, 20, 30, 40]], labels=["car"], img_shape=[100, 100], infos={0: {"pose": "Left"}})
+        Shard.write(self.path, [self.yolo, self.voc], dtype=np.float64)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reader(self):
+        reader = Shard.open(self.path)
+        self.assertEqual(len(reader), 2)
+        self.assertEqual(reader.names, ["0", "1", "car"])
+        dset = reader[1]
+        self.assertEqual(dset.img_path, "image.jpg")
+        self.assertEqual(dset["img_shape"], [100, 100])
+        self.assertEqual(dset.anno[0].info, {"pose": "Left"})
+        self.assertTrue(np.shares_memory(dset.boxes.boxes, reader[1].boxes.boxes))
+
+    def test_load(self):
+        dset = Dataset().load("shard", lb_path=self.path, img_path=self.yolo.img_path)
+        self.assertEqual(dset.dump("yolo"), self.yolo.dump("yolo"))
+        dset.set_label(0, Bbox([1, 2, 3, 4], "ltrb", True))
+        self.assertEqual(Shard.open(self.path)[0].anno[0].ltrb(False).tolist(), self.yolo.anno[0].ltrb(False).tolist())
+
+    def test_dump(self):
+        data = Dataset().load("shard", in_stream=self.voc.dump("shard"))
+        self.assertEqual(data.boxes.boxes.dtype, np.float32)
+        self.assertEqual(data.dump("voc"), self.voc.dump("voc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
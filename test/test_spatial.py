@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from unibox import Bbox, Dataset
+from unibox.spatial import GridIndex
+
+
+def brute(boxes, window):
+    hit = (boxes[:, 0] <= window[2]) & (boxes[:, 2] >= window[0]) & (boxes[:, 1] <= window[3]) & (boxes[:, 3] >= window[1])
+    return np.flatnonzero(hit)
+
+
+class TestGridIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        lt = rng.uniform(0, 1000, (2000, 2))
+        self.boxes = np.concatenate([lt, lt + rng.uniform(1, 40, (2000, 2))], axis=1)
+        self.boxes[:5, 2:] += 600  # a few large boxes
+
+    def test_query(self):
+        index = GridIndex(self.boxes, max_cells=16)
+        self.assertTrue(len(index._large) >= 5)
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            lt = rng.uniform(-100, 1100, 2)
+            window = np.concatenate([lt, lt + rng.uniform(0, 200, 2)])
+            self.assertEqual(index.query(window).tolist(), brute(self.boxes, window).tolist())
+        self.assertEqual(index.query_point(*self.boxes[10, 2:]).tolist(), brute(self.boxes, np.tile(self.boxes[10, 2:], 2)).tolist())
+        self.assertEqual(len(GridIndex(np.zeros((0, 4))).query([0, 0, 1, 1])), 0)
+
+    def test_degenerate(self):
+        # zero-size boxes on a line, and all on one point
+        x = np.arange(100, dtype=np.float64) * 3
+        line = np.stack([x, np.full(100, 5.0), x, np.full(100, 5.0)], axis=1)
+        for boxes in (line, line[:, [1, 0, 3, 2]], np.tile([7.0, 7.0, 7.0, 7.0], (10, 1))):
+            index = GridIndex(boxes)
+            self.assertLessEqual(index._dims.prod(), 4 * len(boxes) + 1)
+            for window in ([0, 0, 50, 50], [7, 7, 7, 7], [-5, -5, -1, -1], [100, 0, 400, 10]):
+                self.assertEqual(index.query(window).tolist(), brute(boxes, np.array(window)).tolist())
+
+
+class TestDatasetQuery(unittest.TestCase):
+
+    def test_query(self):
+        dset = Dataset()
+        dset["img_shape"] = [200, 100]
+        dset.extend([[10, 10, 20, 20], [50, 50, 60, 60]], img_shape=[200, 100])
+        self.assertEqual(dset.query([0, 0, 30, 30]).tolist(), [0])
+        self.assertEqual(dset.query([0.25, 0.5], is_pixel_distance=False).tolist(), [1])
+
+        # the index follows changes to the boxes
+        dset.append(Bbox([15, 15, 40, 40], "ltrb", True))
+        self.assertEqual(dset.query([0, 0, 30, 30]).tolist(), [0, 2])
+        dset.set_label(0, Bbox([100, 50, 120, 60], "ltrb", True))
+        self.assertEqual(dset.query([0, 0, 30, 30]).tolist(), [2])
+        dset.remove_label(1)
+        self.assertEqual(dset.query([0, 0, 30, 30]).tolist(), [1])
+        dset.clear()
+        self.assertEqual(dset.query([0, 0, 30, 30]).tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
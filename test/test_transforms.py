@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from unibox import Dataset
+from unibox import transforms as T
+
+
+class TestTransforms(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        lt = rng.uniform(0, 150, (100, 2))
+        self.boxes = np.concatenate([lt, lt + rng.uniform(1, 50, (100, 2))], axis=1)
+
+    def test_matrices(self):
+        box = np.array([[10, 20, 30, 60]], dtype=float)
+        cases = [
+            (T.Resize([100, 50]), [[5, 10, 15, 30]], [100, 50]),
+            (T.Letterbox(100), [[5, 35, 15, 55]], [100, 100]),
+            (T.HFlip(), [[170, 20, 190, 60]], [200, 100]),
+            (T.VFlip(), [[10, 40, 30, 80]], [200, 100]),
+            (T.Crop([5, 10, 105, 60]), [[5, 10, 25, 50]], [100, 50]),
+            (T.Rot90(), [[20, 170, 60, 190]], [100, 200]),
+            (T.Rot90(-1), [[40, 10, 80, 30]], [100, 200]),
+        ]
+        for transform, expected, size in cases:
+            matrix, out_wh = T.fuse([transform], [200, 100])
+            self.assertEqual(out_wh, size, transform)
+            np.testing.assert_allclose(T.apply_matrix(box, matrix), expected, err_msg=repr(transform))
+
+    def test_fused_matches_sequential(self):
+        chain = [T.Crop([20, 10, 180, 150]), T.Rot90(), T.HFlip(), T.Letterbox([320, 240]), T.Resize(64)]
+        fused, keep, out_wh = T.transform_boxes(self.boxes, [200, 200], chain)
+
+        boxes, alive, size = self.boxes, np.ones(len(self.boxes), bool), [200, 200]
+        for transform in chain:
+            step, kept, size = T.transform_boxes(boxes, size, [transform])
+            alive[np.flatnonzero(alive)[~kept]] = False
+            boxes = step
+        self.assertEqual(out_wh, size)
+        self.assertEqual(keep.tolist(), alive.tolist())
+        np.testing.assert_allclose(fused, boxes)
+
+    def test_dataset_transform(self):
+        dset = Dataset("a.jpg")
+        dset["img_shape"] = [200, 100]
+        dset.extend([[10, 20, 30, 60], [150, 10, 190, 50]], labels=["a", "b"], img_shape=[200, 100], infos={1: {"pose": "Left"}})
+        dset.extend([[0.05, 0.5, 0.1, 0.9]], is_pixel_distance=False, labels=["c"])
+        version = dset.boxes._version
+        dset.transform(T.Crop([0, 0, 100, 100]), T.HFlip(), T.Resize(50))
+        self.assertEqual(dset["img_shape"], [50, 50])
+        self.assertEqual(dset.boxes.labels, ["a", "c"])
+        np.testing.assert_allclose(dset.boxes.boxes, [[35, 10, 45, 30], [0.8, 0.5, 0.9, 0.9]])
+        self.assertEqual(dset.boxes.img_shapes.tolist(), [[50, 50], [-1, -1]])
+        self.assertNotEqual(dset.boxes._version, version)
+
+        dset.transform(T.Resize([50, 50]), min_size=7)
+        self.assertEqual(dset.boxes.labels, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from unibox import Dataset
+from unibox.validation import RULES, check_file, validate
+
+ASSET = os.path.join(os.path.dirname(__file__), "..", ".asset")
+
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmpdir.name, "src")
+        os.makedirs(os.path.join(self.src, "a"))
+        shutil.copy(os.path.join(ASSET, "bus.txt"), os.path.join(self.src, "a", "bus.txt"))
+        shutil.copy(os.path.join(ASSET, "bus.jpg"), os.path.join(self.src, "a", "bus.jpg"))
+        with open(os.path.join(self.src, "a", "broken.txt"), "w") as file:
+            file.write("0 0.5 0.5 1.5 0.5\n0 0.5 0.5 -0.2 0.1\n0 0.2 0.2 0.1 0.1\n")
+        with open(os.path.join(self.src, "garbage.txt"), "w") as file:
+            file.write("0 a b c d\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_validate(self):
+        for jobs in (1, 2):
+            report = validate(self.src, "yolo", jobs=jobs, chunksize=1)
+            self.assertEqual((report.files, report.boxes), (3, 7))
+            self.assertFalse(report.ok)
+            rows = [(os.path.basename(path), index, rule) for path, _, index, rule, _ in report.issues]
+            self.assertEqual(
+                rows,
+                [
+                    ("garbage.txt", -1, "missing_image"),
+                    ("garbage.txt", -1, "parse_error"),
+                    ("broken.txt", -1, "missing_image"),
+                    ("broken.txt", 0, "normalized_range"),
+                    ("broken.txt", 1, "inverted"),
+                ],
+            )
+        counts = report.counts()
+        self.assertEqual(list(counts), list(RULES))
+        self.assertEqual(sum(counts.values()), 5)
+        self.assertEqual(counts["missing_image"], 2)
+        self.assertIn("missing_image", report.summary())
+
+        report = validate(self.src, "yolo", jobs=1, require_images=False)
+        self.assertEqual(len(report.issues), 3)
+
+        path = os.path.join(self.tmpdir.name, "report.json")
+        report.to_json(path)
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data["files_with_issues"], 2)
+        self.assertEqual([issue["rule"] for issue in data["issues"]], ["parse_error", "normalized_range", "inverted"])
+
+        path = os.path.join(self.tmpdir.name, "report.csv")
+        report.to_csv(path)
+        with open(path, encoding="utf-8", newline="") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], list(report.FIELDS))
+        self.assertEqual(len(rows), 4)
+
+    def test_check_file(self):
+        dset = Dataset(os.path.join(ASSET, "bus.jpg"))
+        dset["img_shape"] = [800, 600]
+        dset.extend([[10, 10, 50, 50], [700, 500, 900, 590], [100, 100, 100, 200]], labels=["bus", "car", "sign"], img_shape=[800, 600])
+        path = os.path.join(self.tmpdir.name, "bus.xml")
+        dset.save(path, "voc")
+
+        issues, num_boxes = check_file(path, "voc", os.path.join(ASSET, "bus.jpg"))
+        self.assertEqual(num_boxes, 3)
+        self.assertEqual(
+            [(index, rule) for _, _, index, rule, _ in issues],
+            [(-1, "shape_mismatch"), (1, "out_of_image"), (2, "degenerate")],
+        )
+        self.assertEqual(issues[0][4], "label [800, 600], image [810, 1080]")
+
+    def test_unreadable_image(self):
+        img_path = os.path.join(self.src, "a", "broken.jpg")
+        with open(img_path, "wb") as file:
+            file.write(b"not an image")
+        issues, _ = check_file(os.path.join(self.src, "a", "broken.txt"), "yolo", img_path)
+        self.assertEqual(issues[0][1:4], (img_path, -1, "unreadable_image"))
+        self.assertNotIn("missing_image", [issue[3] for issue in issues])
+
+    def test_multi_image(self):
+        img_dir = os.path.join(self.src, "a")
+        doc = {
+            "images": [
+                {"id": 1, "file_name": "bus.jpg", "width": 810, "height": 1080},
+                {"id": 2, "file_name": "other.jpg", "width": 100, "height": 100},
+            ],
+            "annotations": [
+                {"id": 1, "image_id": 1, "category_id": 1, "bbox": [10, 10, 50, 50]},
+                {"id": 2, "image_id": 2, "category_id": 1, "bbox": [10, 10, 20, 20]},
+                {"id": 3, "image_id": 2, "category_id": 1, "bbox": [50, 50, 80, 20]},
+                {"id": 4, "image_id": 2, "category_id": 1, "bbox": [5, 5, -2, 4]},
+            ],
+            "categories": [{"id": 1, "name": "bus"}],
+        }
+        path = os.path.join(self.tmpdir.name, "instances.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(doc, file)
+        expected = [
+            (os.path.join(img_dir, "other.jpg"), -1, "missing_image"),
+            (os.path.join(img_dir, "other.jpg"), 1, "out_of_image"),
+            (os.path.join(img_dir, "other.jpg"), 2, "inverted"),
+        ]
+
+        issues, num_boxes = check_file(path, "coco", img_dir=img_dir)
+        self.assertEqual(num_boxes, 4)
+        self.assertEqual([issue[1:4] for issue in issues], expected)
+
+        report = validate([path], "coco", img_dir=img_dir, jobs=1)
+        self.assertEqual([issue[1:4] for issue in report.issues], expected)
+
+        shard = os.path.join(self.tmpdir.name, "corpus.ubs")
+        Dataset().load("coco", lb_path=path, image_id=1).save(shard, "shard")
+        issues, num_boxes = check_file(shard, "auto", img_dir=img_dir)
+        self.assertEqual((issues, num_boxes), ([], 1))
+
+        issues, _ = check_file(path, "coco", img_dir=img_dir, image_id=1)
+        self.assertEqual(issues, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,2 +1,19 @@
 from .bbox import Bbox
-from .dataset import Dataset
\ No newline at end of file
+from .boxarray import BoxArray
+from .dataset import Dataset
+
+# the batch helpers pull in multiprocessing, loaded on first use
+_LAZY = {
+    "convert_tree": ".convert",
+    "DatasetCollection": ".collection",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Dict, List, Sequence
+
 import numpy as np
 
 
@@ -21,13 +23,19 @@ class Bbox:
         pixel2norm: Converts the bounding box coordinates from pixel format to normalized format.
         info: Returns the additional information about the bounding box.
 
+    Class Methods:
+        from_ltrb_unchecked: Builds a Bbox from already validated "ltrb" coordinates, skipping all checks.
+        from_array: Validates an (N, 4) array once and returns one Bbox per row.
+
     Static Methods:
         convert: Converts the bounding box coordinates from one format to another.
+        check_boxes: Validates an (N, 4) array of boxes at once and returns it in "ltrb" format.
         ltrb2xywh: Converts the bounding box coordinates from "ltrb" format to "xywh" format.
         xywh2ltrb: Converts the bounding box coordinates from "xywh" format to "ltrb" format.
         ltrb2ltwh: Converts the bounding box coordinates from "ltrb" format to "ltwh" format.
         ltwh2ltrb: Converts the bounding box coordinates from "ltwh" format to "ltrb" format.
         get_safe_box: Converts the bounding box coordinates from one format to another with clipping.
+        clip: Clips one or many boxes to the image boundaries.
 
 
     Usage:
@@ -36,6 +44,8 @@ class Bbox:
 
     """
 
+    __slots__ = ("_bbox", "_img_shape", "_is_pixel_distance", "_label", "_info")
+
     _formats: list = ["ltrb", "xywh", "ltwh"]
 
     def __init__(
@@ -81,6 +91,69 @@ class Bbox:
             
         self._info = info
 
+    @classmethod
+    def from_ltrb_unchecked(
+        cls,
+        box: np.ndarray,
+        is_pixel_distance: bool = True,
+        label: str = "0",
+        img_shape: np.ndarray | None = None,
+        info: dict | None = None,
+    ) -> "Bbox":
+        """
+        Build a Bbox from trusted "ltrb" coordinates, e.g. read back from a
+        shard or a row of an array passed through check_boxes. Nothing is
+        validated or copied; `img_shape` should be an int32 array or None.
+        """
+        bbox = object.__new__(cls)
+        bbox._bbox = box
+        bbox._is_pixel_distance = is_pixel_distance
+        bbox._label = label
+        bbox._img_shape = img_shape
+        bbox._info = info
+        return bbox
+
+    @classmethod
+    def from_array(
+        cls,
+        boxes: list | np.ndarray,
+        format: str = "ltrb",
+        is_pixel_distance: bool = True,
+        labels: Sequence[str | int] | None = None,
+        img_shape: list | np.ndarray | None = None,
+        infos: Dict[int, dict] | None = None,
+    ) -> List["Bbox"]:
+        """
+        Validate an (N, 4) array of boxes once and return one Bbox per row.
+
+        Args:
+            boxes (list | np.ndarray): The bounding box coordinates, one box per row.
+            format (str, optional): The format of the coordinates. Defaults to "ltrb".
+            is_pixel_distance (bool, optional): Whether the coordinates are in pixel distance. Defaults to True.
+            labels (Sequence[str | int] | None, optional): One label per box, "0" for all if None. Defaults to None.
+            img_shape (list | np.ndarray | None, optional): The [w,h] shared by all boxes. Defaults to None.
+            infos (Dict[int, dict] | None, optional): Additional information, keyed by row. Defaults to None.
+
+        Returns:
+            List[Bbox]: The boxes, each holding a row of one "ltrb" array.
+        """
+        boxes = cls.check_boxes(boxes, format, is_pixel_distance)
+        if labels is None:
+            labels = ["0"] * len(boxes)
+        elif len(labels) != len(boxes):
+            raise ValueError("labels must have one entry per box")
+        if img_shape is not None:
+            img_shape = np.array(img_shape, dtype=np.int32).flatten()
+            if len(img_shape) != 2:
+                raise ValueError("img_shape must have 2 elements")
+            img_shape.flags.writeable = False  # shared by all boxes
+        infos = infos or {}
+        make = cls.from_ltrb_unchecked
+        return [
+            make(box, is_pixel_distance, str(label), img_shape, infos.get(i))
+            for i, (box, label) in enumerate(zip(boxes, labels))
+        ]
+
     def _check_input_corrcetness(
         self,
         bbox: list | np.ndarray,
@@ -161,11 +234,21 @@ class Bbox:
     def setlabel(self, x: str) -> str:
         self._label = x
 
+    @staticmethod
+    def _scale(img_shape: list | np.ndarray) -> np.ndarray:
+        # [w,h] or (N, 2) -> [w,h,w,h] or (N, 4)
+        img_shape = np.asarray(img_shape)
+        return np.concatenate([img_shape, img_shape], axis=-1)
+
     @staticmethod
     def norm2pixel(bbox: list | np.ndarray, img_shape: list | np.ndarray) -> np.ndarray:
-        if isinstance(bbox, list):
-            bbox = np.array(bbox)
-        bbox = bbox.flatten()
+        """
+        Convert normalized coordinates to pixel distance. Accepts a single box
+        or an (N, 4) array, with one shared [w,h] or an (N, 2) array of shapes.
+        """
+        bbox = np.asarray(bbox)
+        if bbox.ndim != 2:
+            bbox = bbox.flatten()
         if np.any(bbox > 1.0) and np.any(bbox < 0.0):
             raise ValueError(
                 f"Bounding box must have values between 0 and 1,but {bbox}"
@@ -175,29 +258,25 @@ class Bbox:
                 "img_shape is not provided, cannot convert normalized to pixel"
             )
 
-        if isinstance(bbox, list):
-            bbox = np.array(bbox)
-        bbox = bbox.flatten()
-
-        return bbox * [img_shape[0], img_shape[1], img_shape[0], img_shape[1]]
+        return bbox * Bbox._scale(img_shape)
 
     @staticmethod
     def pixel2norm(bbox: list | np.ndarray, img_shape: list | np.ndarray) -> np.ndarray:
-        if isinstance(bbox, list):
-            bbox = np.array(bbox)
-        bbox = bbox.flatten()
-        if np.all(bbox < 1.0) or np.any(bbox < 0.0):
+        """
+        Convert pixel coordinates to normalized distance. Accepts a single box
+        or an (N, 4) array, with one shared [w,h] or an (N, 2) array of shapes.
+        """
+        bbox = np.asarray(bbox)
+        if bbox.ndim != 2:
+            bbox = bbox.flatten()
+        if np.any((bbox < 1.0).all(axis=-1)) or np.any(bbox < 0.0):
             raise ValueError(f"Bounding box is not corrent pixel format: {bbox}")
         if img_shape is None:
             raise ValueError(
                 "img_shape is not provided, cannot convert normalized to pixel"
             )
 
-        if isinstance(bbox, list):
-            bbox = np.array(bbox)
-        bbox = bbox.flatten()
-
-        return bbox / [img_shape[0], img_shape[1], img_shape[0], img_shape[1]]
+        return bbox / Bbox._scale(img_shape)
 
     @property
     def info(self) -> dict:
@@ -205,6 +284,10 @@ class Bbox:
 
     @staticmethod
     def convert(box: np.ndarray, srcf: str, dstf: str):
+        """
+        Convert box coordinates between formats. `box` may be a single box or
+        an (N, 4) array, in which case all boxes are converted in one call.
+        """
         if srcf not in Bbox._formats:
             raise ValueError(
                 f"Invalid bounding box format: {srcf}, format must be one of {Bbox._formats}"
@@ -215,10 +298,8 @@ class Bbox:
             )
 
         if srcf != dstf:
-            fun_str = f"Bbox.{srcf}2{dstf}"
-            try:
-                func: np.ndarray = eval(fun_str)
-            except:
+            func = Bbox._converters.get((srcf, dstf))
+            if func is None:
                 raise NotImplementedError(
                     f"Conversion from {srcf} to {dstf} is not implemented"
                 )
@@ -227,6 +308,64 @@ class Bbox:
 
         return box
 
+    @staticmethod
+    def check_boxes(
+        boxes: list | np.ndarray,
+        format: str = "ltrb",
+        is_pixel_distance: bool = True,
+        check_values: bool = True,
+    ) -> np.ndarray:
+        """
+        Validate an (N, 4) array of boxes in one pass and return it in "ltrb"
+        format. Applies the same rules as the Bbox constructor, to every row.
+
+        Args:
+            boxes (list | np.ndarray): The bounding box coordinates, one box per row.
+            format (str, optional): The format of the coordinates. Defaults to "ltrb".
+            is_pixel_distance (bool, optional): Whether the coordinates are in pixel distance. Defaults to True.
+            check_values (bool, optional): Check the coordinates too, not only the shape and format. Defaults to True.
+
+        Returns:
+            np.ndarray: (N, 4) float array in "ltrb" format.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64)
+        if boxes.ndim != 2 or boxes.shape[1] != 4:
+            if boxes.size % 4 != 0 or boxes.ndim > 2:
+                raise ValueError("Bounding box must have 4 elements")
+            boxes = boxes.reshape(-1, 4)
+
+        if format not in Bbox._formats:
+            raise ValueError(
+                f"Invalid bounding box format: {format}, format must be one of {Bbox._formats}"
+            )
+        if not check_values:
+            return Bbox.convert(boxes, format, "ltrb")
+
+        bad = (boxes < 0).any(axis=1)
+        if bad.any():
+            raise ValueError(
+                f"Bounding box must have non-negative values, but {boxes[bad][0]}"
+            )
+
+        if not is_pixel_distance:
+            bad = (boxes > 1.0).any(axis=1)
+            if bad.any():
+                raise ValueError(
+                    f"is_pixel_distance is {is_pixel_distance}, Bounding box must have values between 0 and 1,but {boxes[bad][0]}"
+                )
+        else:
+            bad = (boxes < 1.0).all(axis=1)
+            if bad.any():
+                raise ValueError(
+                    f"is_pixel_distance is {is_pixel_distance}, Bounding box is not corrent pixel format:{boxes[bad][0]}"
+                )
+
+        boxes = Bbox.convert(boxes, format, "ltrb")
+        bad = (boxes[:, 0] > boxes[:, 2]) | (boxes[:, 1] > boxes[:, 3])
+        if bad.any():
+            raise ValueError(f"Invalid bounding box format,with {boxes[bad][0]}")
+        return boxes
+
     @staticmethod
     def ltrb2xywh(x: np.ndarray) -> np.ndarray:
         y = np.copy(x)
@@ -273,20 +412,36 @@ class Bbox:
         box:Bbox = Bbox(box, src_format, is_pixel_distance, img_shape=img_shape)
         box = box.ltrb(is_dst_pixel_distance)
         box = Bbox.convert(box, "ltrb", dst_format)
+        return Bbox.clip(box, img_shape, is_dst_pixel_distance)
 
-        if not is_dst_pixel_distance:
-            box = np.clip(box, 0, 1)
-        else:
-            if img_shape is not None:
-                box[0] = np.clip(box[0], 0, img_shape[0])
-                box[2] = np.clip(box[2], 0, img_shape[0])
-                box[1] = np.clip(box[1], 0, img_shape[1])
-                box[3] = np.clip(box[3], 0, img_shape[1])
-            else:
-                raise ValueError(
-                    "img_shape is not provided, cannot clip box to image boundaries"
-                )
-        return box
+    @staticmethod
+    def clip(
+        boxes: np.ndarray,
+        img_shape: list | np.ndarray | None,
+        is_pixel_distance: bool = True,
+    ) -> np.ndarray:
+        """
+        Clip a box or an (N, 4) array of boxes to the image: [0, 1] if
+        normalized, [0, w] and [0, h] for the x and y columns in pixels.
+        `img_shape` is one [w,h] or an (N, 2) array.
+        """
+        if not is_pixel_distance:
+            return np.clip(boxes, 0, 1)
+        if img_shape is None:
+            raise ValueError(
+                "img_shape is not provided, cannot clip box to image boundaries"
+            )
+        return np.clip(boxes, 0, Bbox._scale(img_shape))
 
     def __repr__(self) -> str:
         return f"xywh=[{self._bbox[0]:.2f},{self._bbox[1]:.2f},{self._bbox[2]:.2f},{self._bbox[3]:.2f}], [w,h]={self._img_shape}, info={self._info}\n"
+
+
+Bbox._converters = {
+    ("ltrb", "xywh"): Bbox.ltrb2xywh,
+    ("xywh", "ltrb"): Bbox.xywh2ltrb,
+    ("ltrb", "ltwh"): Bbox.ltrb2ltwh,
+    ("ltwh", "ltrb"): Bbox.ltwh2ltrb,
+    ("xywh", "ltwh"): lambda x: Bbox.ltrb2ltwh(Bbox.xywh2ltrb(x)),
+    ("ltwh", "xywh"): lambda x: Bbox.ltrb2xywh(Bbox.ltwh2ltrb(x)),
+}
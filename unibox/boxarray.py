@@ -0,0 +1,408 @@
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from unibox.bbox import Bbox
+
+
+class BoxArray:
+    """
+    BoxArray stores all bounding boxes of one image column by column.
+
+    Instead of one Bbox object per box, the coordinates of every box live in a
+    single contiguous (N, 4) float array in "ltrb" format, next to an integer
+    class-id column, a pixel/normalized flag column and an (N, 2) img_shape
+    column. Class names are interned once per array and extra information is
+    only stored for the boxes that carry some.
+
+    Indexing a BoxArray returns a BoxView, a lightweight Bbox that reads
+    through to the columns, so code written against Bbox keeps working.
+
+    Attributes:
+        boxes (np.ndarray): (N, 4) "ltrb" coordinates.
+        class_ids (np.ndarray): (N,) int32 indices into `names`.
+        is_pixel (np.ndarray): (N,) bool, whether a box is in pixel distance.
+        img_shapes (np.ndarray): (N, 2) int32 [w,h], -1 where unknown.
+        names (list): The interned class names.
+
+    Usage:
+        boxes = BoxArray()
+        boxes.append(Bbox([10, 20, 30, 40], "ltrb", True, label="car"))
+        boxes[0].label
+    """
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._size = 0
+        self._boxes = np.empty((capacity, 4), dtype=np.float64)
+        self._cls = np.empty(capacity, dtype=np.int32)
+        self._pixel = np.empty(capacity, dtype=bool)
+        self._shape = np.empty((capacity, 2), dtype=np.int32)
+        self._info: dict = {}
+        self._names: list = []
+        self._ids: dict = {}
+        self._version = 0
+
+    @classmethod
+    def from_columns(
+        cls,
+        boxes: np.ndarray,
+        class_ids: np.ndarray,
+        names: list,
+        is_pixel: np.ndarray,
+        img_shapes: np.ndarray,
+        info: dict | None = None,
+    ) -> "BoxArray":
+        """
+        Wrap existing columns without copying them, e.g. slices of a memory
+        map. Read-only columns are copied on the first modification.
+        """
+        array = cls.__new__(cls)
+        array._size = len(boxes)
+        array._boxes = boxes
+        array._cls = class_ids
+        array._pixel = is_pixel
+        array._shape = img_shapes
+        array._info = {} if info is None else info
+        array._names = list(names)
+        array._ids = {name: i for i, name in enumerate(array._names)}
+        array._version = 0
+        return array
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _own(self):
+        # called before every modification
+        self._version += 1
+        for name in ("_boxes", "_cls", "_pixel", "_shape"):
+            col = getattr(self, name)
+            if not col.flags.writeable:
+                setattr(self, name, np.array(col))
+
+    def _reserve(self, n: int):
+        self._own()
+        capacity = len(self._boxes)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 8)
+        size = self._size
+        for name in ("_boxes", "_cls", "_pixel", "_shape"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:size] = old[:size]
+            setattr(self, name, new)
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("index out of range")
+        return index
+
+    def class_id(self, label: str | int | None) -> int:
+        """
+        Return the interned id of a class name, adding it if necessary.
+        """
+        if label is None:
+            label = "0"
+        elif isinstance(label, int):
+            label = str(label)
+        elif not isinstance(label, str):
+            raise ValueError("Label must be a string")
+        idx = self._ids.get(label)
+        if idx is None:
+            idx = self._ids[label] = len(self._names)
+            self._names.append(label)
+        return idx
+
+    def _write(self, index: int, bbox: Bbox):
+        self._own()
+        self._boxes[index] = bbox.ltrb(bbox._is_pixel_distance)
+        self._cls[index] = self.class_id(bbox.label)
+        self._pixel[index] = bbox._is_pixel_distance
+        img_wh = bbox.img_wh()
+        self._shape[index] = (-1, -1) if img_wh is None else img_wh
+        if bbox.info is not None:
+            self._info[index] = bbox.info
+        else:
+            self._info.pop(index, None)
+
+    def append(self, bbox: Bbox):
+        self._reserve(self._size + 1)
+        self._size += 1
+        self._write(self._size - 1, bbox)
+
+    def extend(
+        self,
+        boxes: np.ndarray,
+        labels: Sequence[str | int] | np.ndarray,
+        is_pixel_distance: bool | np.ndarray = True,
+        img_shape: list | np.ndarray | None = None,
+        infos: dict | None = None,
+    ):
+        """
+        Append already validated boxes in bulk.
+
+        Args:
+            boxes (np.ndarray): (N, 4) "ltrb" coordinates.
+            labels (Sequence[str | int] | np.ndarray): One class name per box.
+            is_pixel_distance (bool | np.ndarray, optional): Whether the boxes are in pixel distance. Defaults to True.
+            img_shape (list | np.ndarray | None, optional): [w,h] shared by the boxes, or (N, 2). Defaults to None.
+            infos (dict | None, optional): Extra information, keyed by row position within `boxes`. Defaults to None.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        n = len(boxes)
+        if len(labels) != n:
+            raise ValueError("boxes and labels must have the same length")
+        start = self._size
+        self._reserve(start + n)
+        end = start + n
+        self._boxes[start:end] = boxes
+        names, first, inverse = np.unique(np.asarray(labels, dtype=str), return_index=True, return_inverse=True)
+        # intern new names in the order they first appear, not sorted
+        lut = np.empty(len(names), dtype=np.int32)
+        for i in np.argsort(first, kind="stable").tolist():
+            lut[i] = self.class_id(str(names[i]))
+        self._cls[start:end] = lut[inverse.reshape(-1)]
+        self._pixel[start:end] = is_pixel_distance
+        self._shape[start:end] = -1 if img_shape is None else img_shape
+        if infos:
+            for i, info in infos.items():
+                self._info[start + i] = info
+        self._size = end
+
+    def __getitem__(self, index: int) -> "BoxView":
+        return BoxView(self, self._index(index))
+
+    def __setitem__(self, index: int, bbox: Bbox):
+        self._write(self._index(index), bbox)
+
+    def __iter__(self) -> Iterator["BoxView"]:
+        for i in range(self._size):
+            yield BoxView(self, i)
+
+    def pop(self, index: int = -1) -> Bbox:
+        index = self._index(index)
+        self._own()
+        view = self[index]
+        bbox = Bbox.from_ltrb_unchecked(
+            view._bbox.copy(),
+            view._is_pixel_distance,
+            view._label,
+            None if view._img_shape is None else view._img_shape.copy(),
+            self._info.get(index),
+        )
+
+        size = self._size
+        for name in ("_boxes", "_cls", "_pixel", "_shape"):
+            col = getattr(self, name)
+            col[index : size - 1] = col[index + 1 : size]
+        self._info = {
+            (i - 1 if i > index else i): info
+            for i, info in self._info.items()
+            if i != index
+        }
+        self._size -= 1
+        return bbox
+
+    def keep(self, index: np.ndarray):
+        """
+        Keep only the given boxes, in place.
+
+        Args:
+            index (np.ndarray): A boolean mask over the boxes, or the indices of the boxes to keep.
+        """
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        self._own()
+        for name in ("_boxes", "_cls", "_pixel", "_shape"):
+            col = getattr(self, name)
+            col[: len(index)] = col[index]
+        self._info = {
+            new: self._info[old]
+            for new, old in enumerate(index.tolist())
+            if old in self._info
+        }
+        self._size = len(index)
+
+    def assign(self, boxes: np.ndarray, img_shape: list | np.ndarray | None = None):
+        """
+        Overwrite the "ltrb" coordinates of every box in place, e.g. after a
+        geometric transform, and set the img_shape of the boxes that have one.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(boxes) != self._size:
+            raise ValueError("expected one box per stored box")
+        self._own()
+        self._boxes[: self._size] = boxes
+        if img_shape is not None:
+            shapes = self._shape[: self._size]
+            shapes[shapes[:, 0] >= 0] = img_shape
+
+    def clear(self):
+        self._version += 1
+        self._size = 0
+        self._info = {}
+        self._names = []
+        self._ids = {}
+
+    @property
+    def boxes(self) -> np.ndarray:
+        return self._boxes[: self._size]
+
+    @property
+    def class_ids(self) -> np.ndarray:
+        return self._cls[: self._size]
+
+    @property
+    def is_pixel(self) -> np.ndarray:
+        return self._pixel[: self._size]
+
+    @property
+    def img_shapes(self) -> np.ndarray:
+        return self._shape[: self._size]
+
+    @property
+    def names(self) -> list:
+        return self._names
+
+    @property
+    def labels(self) -> list:
+        names = self._names
+        return [names[i] for i in self.class_ids.tolist()]
+
+    def mapped_names(self, mapping: dict | None = None) -> list:
+        """
+        Return the interned class names passed through `mapping`: one lookup
+        per class rather than per box. Classes no box uses any more, e.g.
+        after pop or keep, are None. A missing name raises KeyError.
+        """
+        used = np.zeros(len(self._names), dtype=bool)
+        used[self.class_ids] = True
+        if mapping is None:
+            return [name if u else None for name, u in zip(self._names, used.tolist())]
+        return [mapping[name] if u else None for name, u in zip(self._names, used.tolist())]
+
+    def mapped_labels(self, mapping: dict | None = None) -> np.ndarray:
+        """
+        Return the label of every box passed through `mapping`, gathered from
+        the class ids with a lookup table.
+
+        Returns:
+            np.ndarray: (N,) object array of the mapped labels.
+        """
+        lut = np.empty(len(self._names), dtype=object)
+        lut[:] = self.mapped_names(mapping)
+        return lut[self.class_ids]
+
+    def remap(self, mapping: dict):
+        """
+        Rename the classes in place through `mapping`, e.g. to merge classes.
+        Names missing from `mapping` are kept, classes no box uses are dropped.
+        """
+        names = self.mapped_names({name: str(mapping.get(name, name)) for name in self._names})
+        self._own()
+        self._names, self._ids = [], {}
+        lut = np.array([0 if name is None else self.class_id(name) for name in names], dtype=np.int32)
+        self._cls[: self._size] = lut[self.class_ids]
+
+    def info(self, index: int) -> dict | None:
+        return self._info.get(self._index(index))
+
+    def ltrb(self, is_pixel_distance: bool = True, img_shape=None) -> np.ndarray:
+        """
+        Return the "ltrb" coordinates of every box, converted to pixel or
+        normalized distance in a single pass.
+
+        Args:
+            is_pixel_distance (bool, optional): The distance the result should be in. Defaults to True.
+            img_shape (list | np.ndarray | None, optional): [w,h] used for boxes without their own img_shape. Defaults to None.
+
+        Returns:
+            np.ndarray: (N, 4) array, a copy of the stored coordinates.
+        """
+        out = self.boxes.copy()
+        todo = self.is_pixel != is_pixel_distance
+        if not todo.any():
+            return out
+        shape = self.img_shapes[todo].astype(np.float64)
+        unknown = shape[:, 0] < 0
+        if unknown.any():
+            if img_shape is None:
+                raise ValueError(
+                    "img_shape is not provided, cannot convert box between normalized and pixel"
+                )
+            shape[unknown] = np.asarray(img_shape, dtype=np.float64).reshape(-1)[:2]
+        scale = np.tile(shape, 2)
+        out[todo] = out[todo] * scale if is_pixel_distance else out[todo] / scale
+        return out
+
+    def xywh(self, is_pixel_distance: bool = True, img_shape=None) -> np.ndarray:
+        return Bbox.ltrb2xywh(self.ltrb(is_pixel_distance, img_shape))
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class BoxView(Bbox):
+    """
+    A Bbox backed by one row of a BoxArray.
+
+    Views read and write through to the array, so they are cheap to create
+    but, like NumPy views, refer to a position: after removing a box from the
+    array, views of the following boxes point at their new neighbours.
+    Views compare and hash by value, so equal views land in one set entry.
+    """
+
+    __slots__ = ("_owner", "_index")
+
+    def __init__(self, owner: BoxArray, index: int) -> None:
+        self._owner = owner
+        self._index = index
+
+    @property
+    def _bbox(self) -> np.ndarray:
+        return self._owner._boxes[self._index]
+
+    @property
+    def _is_pixel_distance(self) -> bool:
+        return bool(self._owner._pixel[self._index])
+
+    @property
+    def _img_shape(self) -> np.ndarray | None:
+        shape = self._owner._shape[self._index]
+        return None if shape[0] < 0 else shape
+
+    @property
+    def _label(self) -> str:
+        return self._owner._names[self._owner._cls[self._index]]
+
+    @_label.setter
+    def _label(self, x: str):
+        self._owner._own()
+        self._owner._cls[self._index] = self._owner.class_id(x)
+
+    @property
+    def _info(self) -> dict | None:
+        return self._owner._info.get(self._index)
+
+    def __hash__(self) -> int:
+        # by value, to match __eq__: the hash changes when the box does, so
+        # do not modify a view while it is in a set or used as a dict key
+        return hash((self._label, self._is_pixel_distance, tuple(self._bbox.tolist())))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Bbox):
+            return NotImplemented
+        if self._img_shape is None or other._img_shape is None:
+            same_shape = self._img_shape is None and other._img_shape is None
+        else:
+            same_shape = np.array_equal(self._img_shape, other._img_shape)
+        return (
+            same_shape
+            and self._is_pixel_distance == other._is_pixel_distance
+            and self._label == other._label
+            and np.array_equal(self._bbox, other._bbox)
+            and (self._info or {}) == (other._info or {})
+        )
@@ -0,0 +1,146 @@
+import glob
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from unibox.convert import find_pairs, index_images
+from unibox.dataset import Dataset
+from unibox.imagesize import flush_shape_cache
+
+
+_SKIP = object()
+
+
+class DatasetCollection:
+    """
+    DatasetCollection is a lazy sequence of Datasets, one per label file.
+
+    Label files are only opened while iterating, so a pipeline of map/filter
+    steps runs over corpora larger than memory one Dataset at a time.
+    Collections are immutable: map, filter and prefetch return new ones.
+
+    Args:
+        source (str | Path | Iterable): A directory (walked recursively), a glob pattern, or an iterable of label paths or (label path, image path) pairs.
+        format (str): The format of the label files.
+        img_dir (str | Path | None, optional): Where to look for the image of each label file: by relative stem for a directory source, by file name otherwise. Defaults to the source directory.
+        on_error (str, optional): "raise" to stop at a file that fails to load, "skip" to leave it out. Defaults to "raise".
+        **load_kwargs: Additional keyword arguments passed to Dataset.load.
+
+    Usage:
+        dsets = DatasetCollection("labels", "yolo", img_dir="images")
+        crowded = dsets.filter(lambda d: len(d) > 50).prefetch(16)
+        for chunk in crowded.chunks(256):
+            ...
+    """
+
+    def __init__(
+        self,
+        source: str | Path | Iterable,
+        format: str,
+        img_dir: str | Path | None = None,
+        on_error: str = "raise",
+        **load_kwargs,
+    ) -> None:
+        if on_error not in ("raise", "skip"):
+            raise ValueError("on_error must be 'raise' or 'skip'")
+        self._source = source
+        self.format = format
+        self._img_dir = img_dir
+        self._on_error = on_error
+        self._load_kwargs = load_kwargs
+        self._steps: Tuple = ()
+        self._prefetch = 0
+        self._workers = 1
+
+    def _derive(self, **changes) -> "DatasetCollection":
+        new = object.__new__(DatasetCollection)
+        new.__dict__.update(self.__dict__, **changes)
+        return new
+
+    def pairs(self) -> Iterator[Tuple[str, str | None]]:
+        """
+        Yield (label path, image path or None) for every label file.
+        """
+        source = self._source
+        if isinstance(source, (str, Path)) and os.path.isdir(source):
+            yield from find_pairs(source, self.format, self._img_dir)
+            return
+        if isinstance(source, (str, Path)):
+            source = sorted(glob.glob(str(source), recursive=True))
+        images = index_images(self._img_dir, relative=False) if self._img_dir is not None else None
+        for item in source:
+            if isinstance(item, (tuple, list)):
+                yield str(item[0]), item[1]
+                continue
+            img_path = None
+            if images is not None:
+                img_path = images.get(os.path.splitext(os.path.basename(item))[0])
+            yield str(item), img_path
+
+    def _process(self, pair: Tuple[str, str | None]):
+        lb_path, img_path = pair
+        try:
+            dset = Dataset(img_path).load(self.format, lb_path=lb_path, **self._load_kwargs)
+            for kind, func in self._steps:
+                if kind == "map":
+                    dset = func(dset)
+                elif not func(dset):
+                    return _SKIP
+            return dset
+        except Exception:
+            if self._on_error == "skip":
+                return _SKIP
+            raise
+
+    def __iter__(self) -> Iterator[Dataset]:
+        pairs = self.pairs()
+        if not self._prefetch:
+            results = map(self._process, pairs)
+        else:
+            results = self._prefetched(pairs)
+        try:
+            for dset in results:
+                if dset is not _SKIP:
+                    yield dset
+        finally:
+            # keep the shapes probed while loading, even if the caller stops early
+            flush_shape_cache()
+
+    def _prefetched(self, pairs: Iterator) -> Iterator:
+        # at most `prefetch` files are loaded ahead of the consumer
+        with ThreadPoolExecutor(self._workers) as pool:
+            pending = deque()
+            for pair in pairs:
+                pending.append(pool.submit(self._process, pair))
+                if len(pending) >= self._prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def map(self, func: Callable[[Dataset], Dataset]) -> "DatasetCollection":
+        return self._derive(_steps=self._steps + (("map", func),))
+
+    def filter(self, func: Callable[[Dataset], bool]) -> "DatasetCollection":
+        return self._derive(_steps=self._steps + (("filter", func),))
+
+    def prefetch(self, size: int, workers: int | None = None) -> "DatasetCollection":
+        """
+        Load up to `size` Datasets ahead of the consumer on `workers`
+        background threads (defaults to `size`, at most 8). Order is kept.
+        """
+        workers = workers or min(size, 8) or 1
+        return self._derive(_prefetch=size, _workers=workers)
+
+    def chunks(self, size: int) -> Iterator[List[Dataset]]:
+        """
+        Yield lists of up to `size` Datasets.
+        """
+        iterator = iter(self)
+        while chunk := list(islice(iterator, size)):
+            yield chunk
+
+    def __repr__(self) -> str:
+        return f"DatasetCollection({self._source!r}, {self.format!r})"
@@ -0,0 +1,195 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from unibox import profiling
+from unibox.dataset import Dataset
+from unibox.formats import registry
+from unibox.imagesize import flush_shape_cache
+from unibox.manifest import Manifest, file_signature, image_stamp, settings_key
+
+
+IMG_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff", ".gif")
+
+
+def _walk(root: str, suffixes: Tuple[str, ...]) -> Iterator[str]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if name.lower().endswith(suffixes):
+                yield os.path.join(dirpath, name)
+
+
+def index_images(img_dir: str | Path, relative: bool = True) -> Dict[str, str]:
+    """
+    Map the stem of every image below `img_dir` to its path. The stem is the
+    path relative to `img_dir` without suffix, or just the file name without
+    suffix if `relative` is False.
+    """
+    img_dir = str(img_dir)
+    images = {}
+    for path in _walk(img_dir, IMG_SUFFIXES):
+        stem = os.path.relpath(path, img_dir) if relative else os.path.basename(path)
+        images.setdefault(os.path.splitext(stem)[0], path)
+    return images
+
+
+def find_pairs(src_dir: str | Path, src_format: str, img_dir: str | Path | None = None) -> List[Tuple[str, str | None]]:
+    """
+    Walk a dataset tree and pair every label file with its image.
+
+    A label file is paired with the image that has the same path relative to
+    `img_dir` (defaults to `src_dir`) apart from the suffix.
+
+    Args:
+        src_dir (str | Path): The directory containing the label files.
+        src_format (str): The format of the label files.
+        img_dir (str | Path | None, optional): The directory containing the images. Defaults to None.
+
+    Returns:
+        List[Tuple[str, str | None]]: (label path, image path or None) pairs.
+    """
+    src_dir = str(src_dir)
+    suffix = registry.get_format(src_format).suffix
+    images = index_images(img_dir if img_dir is not None else src_dir)
+    pairs = []
+    for lb_path in _walk(src_dir, (suffix,)):
+        stem = os.path.splitext(os.path.relpath(lb_path, src_dir))[0]
+        pairs.append((lb_path, images.get(stem)))
+    return pairs
+
+
+def convert_file(
+    lb_path: str | Path,
+    src_format: str,
+    outfile: str | Path,
+    dst_format: str,
+    img_path: str | Path | None = None,
+    mapping: Dict | None = None,
+    load_kwargs: Dict | None = None,
+    save_kwargs: Dict | None = None,
+    manifest: Manifest | None = None,
+) -> bool:
+    """
+    Convert a single label file from one format to another.
+
+    If a manifest is given, the conversion is skipped when `outfile` was
+    already converted from the unchanged `lb_path` and `img_path`, and
+    recorded otherwise.
+    Returns whether the file was converted.
+    """
+    if manifest is not None and manifest.is_current(lb_path, outfile, img_path):
+        return False
+    dset = Dataset(img_path).load(src_format, lb_path=lb_path, **(load_kwargs or {}))
+    if mapping is not None:
+        save_kwargs = dict(save_kwargs or {}, mapping=mapping)
+    os.makedirs(os.path.dirname(os.path.abspath(outfile)), exist_ok=True)
+    dset.save(outfile, dst_format, manifest=manifest, **(save_kwargs or {}))
+    return True
+
+
+def _convert_chunk(tasks: list, src_format: str, dst_format: str, mapping, load_kwargs, save_kwargs, profile=False) -> tuple:
+    if profile:
+        # a worker process records on its own and hands the totals back
+        profiling.stats.reset()
+        profiling.enable()
+    errors, done = [], []
+    for lb_path, img_path, outfile in tasks:
+        try:
+            # taken before reading so that a concurrent edit is seen next run
+            signature, image = file_signature(lb_path), image_stamp(img_path)
+            convert_file(lb_path, src_format, outfile, dst_format, img_path, mapping, load_kwargs, save_kwargs)
+            done.append((lb_path, outfile, signature, image))
+        except Exception as err:
+            errors.append((lb_path, f"{type(err).__name__}: {err}"))
+    flush_shape_cache()
+    if profile:
+        profiling.disable()
+        return errors, done, profiling.stats.as_dict()
+    return errors, done, None
+
+
+def convert_tree(
+    src_dir: str | Path,
+    src_format: str,
+    dst_dir: str | Path,
+    dst_format: str,
+    mapping: Dict | None = None,
+    jobs: int | None = None,
+    img_dir: str | Path | None = None,
+    chunksize: int = 64,
+    load_kwargs: Dict | None = None,
+    save_kwargs: Dict | None = None,
+    manifest: str | Path | None = None,
+) -> List[Tuple[str, str]]:
+    """
+    Convert every label file below `src_dir` and write the results to the same
+    relative paths below `dst_dir`.
+
+    Files are converted in chunks of `chunksize` by a pool of `jobs` worker
+    processes; a failing file does not stop the run but is reported in the
+    returned list.
+
+    Args:
+        src_dir (str | Path): The directory containing the label files.
+        src_format (str): The format of the label files.
+        dst_dir (str | Path): The output directory.
+        dst_format (str): The format to convert to.
+        mapping (Dict | None, optional): The label mapping passed to the exporter. Defaults to None.
+        jobs (int | None, optional): The number of worker processes, all cores if None, in-process if 1. Defaults to None.
+        img_dir (str | Path | None, optional): The directory containing the images. Defaults to src_dir.
+        chunksize (int, optional): The number of files handed to a worker at once. Defaults to 64.
+        load_kwargs (Dict | None, optional): Keyword arguments for Dataset.load. Defaults to None.
+        save_kwargs (Dict | None, optional): Keyword arguments for Dataset.save. Defaults to None.
+        manifest (str | Path | None, optional): A manifest file; if given, only label files that changed since the run that wrote it, or whose image did, are converted. Defaults to None.
+
+    Returns:
+        List[Tuple[str, str]]: (label path, error message) for every file that failed.
+    """
+    src_dir, dst_dir = str(src_dir), str(dst_dir)
+    suffix = registry.get_format(dst_format).suffix
+    tasks = []
+    for lb_path, img_path in find_pairs(src_dir, src_format, img_dir):
+        rel = os.path.splitext(os.path.relpath(lb_path, src_dir))[0]
+        tasks.append((lb_path, img_path, os.path.join(dst_dir, rel + suffix)))
+
+    if manifest is not None:
+        manifest = Manifest(manifest, settings_key(src_format, dst_format, mapping, load_kwargs, save_kwargs))
+        manifest.prune(outfile for _, _, outfile in tasks)
+        tasks = [task for task in tasks if not manifest.is_current(task[0], task[2], task[1])]
+
+    errors = []
+
+    def collect(result):
+        errors.extend(result[0])
+        if result[2] is not None:
+            profiling.stats.merge(result[2])
+        if manifest is not None:
+            for lb_path, outfile, signature, image in result[1]:
+                manifest.record(lb_path, outfile, signature, image)
+
+    chunks = [tasks[i : i + chunksize] for i in range(0, len(tasks), chunksize)]
+    args = (src_format, dst_format, mapping, load_kwargs, save_kwargs)
+    jobs = jobs or os.cpu_count() or 1
+    try:
+        if jobs == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                collect(_convert_chunk(chunk, *args))
+            return errors
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # keep a bounded number of chunks in flight instead of submitting all
+            pending = set()
+            for chunk in chunks:
+                if len(pending) >= 2 * jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                pending.add(pool.submit(_convert_chunk, chunk, *args, profiling.is_enabled()))
+            for future in pending:
+                collect(future.result())
+        return errors
+    finally:
+        # keep the progress of an interrupted run
+        if manifest is not None:
+            manifest.save()
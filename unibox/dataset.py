@@ -1,29 +1,69 @@
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Sequence
 from pathlib import Path
 import os
 
-from unibox import Bbox
+import numpy as np
+
+from unibox import Bbox, ops, profiling, transforms as T
+from unibox.boxarray import BoxArray
 from unibox.formats import registry
-from unibox.utils import normalize_input
+from unibox.manifest import Manifest, file_signature, image_stamp
+from unibox.spatial import GridIndex
+from unibox.utils import get_img_shape, normalize_input
 
 
 class Dataset:
     def __init__(self, img_path: str | Path = None, flag: str = None) -> None:
         self._img_path: str = str(img_path) if img_path is not None else None
         self._data: dict = {
-            "data": List[Bbox],
+            "data": BoxArray,
             "info": {
                 "label_path": str | Path | None,
             },
         }
 
         self.flag = flag
+        # whether extend() checks the boxes, see load(check=...)
+        self._check = True
+        # the label file and image as they were when loaded, see save(manifest=...)
+        self._stamps = None
+        self._spatial = None
         self.clear()
         # optional: img_shape = [w,h]
 
     def append(self, label: Bbox):
         self._data["data"].append(label)
 
+    def extend(
+        self,
+        boxes: list | np.ndarray,
+        format: str = "ltrb",
+        is_pixel_distance: bool = True,
+        labels: Sequence[str | int] | None = None,
+        img_shape: list | np.ndarray | None = None,
+        infos: Dict[int, dict] | None = None,
+        check: bool | None = None,
+    ):
+        """
+        Validate and append many boxes at once.
+
+        Args:
+            boxes (list | np.ndarray): (N, 4) box coordinates.
+            format (str, optional): The format of the coordinates. Defaults to "ltrb".
+            is_pixel_distance (bool, optional): Whether the coordinates are in pixel distance. Defaults to True.
+            labels (Sequence[str | int] | None, optional): One label per box, "0" for all if None. Defaults to None.
+            img_shape (list | np.ndarray | None, optional): The [w,h] of the image. Defaults to None.
+            infos (Dict[int, dict] | None, optional): Additional information, keyed by row. Defaults to None.
+            check (bool | None, optional): Reject invalid coordinates; only the shape and format are checked if False. Defaults to the `check` of the running load, else True.
+        """
+        started = profiling.start()
+        check = self._check if check is None else check
+        boxes = Bbox.check_boxes(boxes, format, is_pixel_distance, check_values=check)
+        profiling.stop(started, "validate", boxes=len(boxes))
+        if labels is None:
+            labels = ["0"] * len(boxes)
+        self._data["data"].extend(boxes, labels, is_pixel_distance, img_shape, infos)
+
     @property
     def img_path(self) -> str:
         return self._img_path
@@ -36,7 +76,17 @@ class Dataset:
 
     @property
     def anno(self) -> List[Bbox]:
-        return self._data["data"].copy()
+        return list(self._data["data"])
+
+    @property
+    def boxes(self) -> BoxArray:
+        return self._data["data"]
+
+    @boxes.setter
+    def boxes(self, boxes: BoxArray):
+        if not isinstance(boxes, BoxArray):
+            raise ValueError("boxes must be a BoxArray.")
+        self._data["data"] = boxes
 
     def remove_label(self, index: int):
         self._data["data"].pop(index)
@@ -46,10 +96,152 @@ class Dataset:
             raise IndexError("index out of range")
         self._data["data"][index] = label
 
+    def remap_labels(self, mapping: Dict[str, str | int]):
+        """
+        Rename labels in place, e.g. to merge classes or to switch to YOLO
+        class ids. Only the class vocabulary is looked up in `mapping`; the
+        boxes are relabelled with one lookup-table gather. Labels missing
+        from `mapping` are kept.
+        """
+        self._data["data"].remap(mapping)
+        return self
+
+    def deduplicate(self, iou_threshold: float = 0.9, class_aware: bool = True):
+        """
+        Remove near-duplicate boxes: every box overlapping an earlier box by
+        more than `iou_threshold` is dropped, the earlier one is kept.
+
+        Args:
+            iou_threshold (float, optional): The IoU above which two boxes are duplicates. Defaults to 0.9.
+            class_aware (bool, optional): Only boxes with the same label can be duplicates. Defaults to True.
+        """
+        boxes = self._data["data"]
+        if boxes.is_pixel.all() or not boxes.is_pixel.any():
+            # IoU does not change with the image scale
+            coords = boxes.boxes
+        else:
+            coords = boxes.ltrb(True, self["img_shape"])
+        classes = boxes.class_ids if class_aware else None
+        boxes.keep(~ops.duplicates(coords, iou_threshold, classes))
+        return self
+
+    def tile(
+        self,
+        tile_wh: int | list,
+        overlap: int | float = 0,
+        min_visible_ratio: float = 0.5,
+        skip_empty: bool = False,
+    ) -> List["Dataset"]:
+        """
+        Cut the image into overlapping tiles and return one Dataset per tile,
+        with the boxes clipped to the tile and normalized to its size.
+
+        All boxes are matched against all tiles in one vectorized pass, see
+        ops.tile_boxes. Every tile Dataset keeps the img_path of the image,
+        has its own img_shape, and stores its pixel window in the image as
+        dset["window"], [l, t, r, b].
+
+        Args:
+            tile_wh (int | list): The [w,h] of a tile, or one int for square tiles.
+            overlap (int | float, optional): The overlap of neighbouring tiles in pixels, or as a fraction of the tile if below 1. Defaults to 0.
+            min_visible_ratio (float, optional): The part of a box that must fall in a tile for it to be kept there. Defaults to 0.5.
+            skip_empty (bool, optional): Leave out the tiles without boxes. Defaults to False.
+
+        Returns:
+            List[Dataset]: The tiles, row by row.
+        """
+        boxes = self._data["data"]
+        img_wh = get_img_shape(self)
+        windows, tile_ids, box_ids, clipped = ops.tile_boxes(
+            boxes.ltrb(True, img_wh), img_wh, tile_wh, overlap, min_visible_ratio
+        )
+        labels = np.array(boxes.names, dtype=object)[boxes.class_ids[box_ids]] if len(box_ids) else []
+        bounds = np.searchsorted(tile_ids, np.arange(len(windows) + 1)).tolist()
+        info = boxes._info
+
+        tiles = []
+        for t, window in enumerate(windows.tolist()):
+            a, b = bounds[t], bounds[t + 1]
+            if skip_empty and a == b:
+                continue
+            tile_shape = [window[2] - window[0], window[3] - window[1]]
+            dset = Dataset(self._img_path, self.flag)
+            dset["img_shape"] = tile_shape
+            dset["window"] = window
+            infos = {i: dict(info[row]) for i, row in enumerate(box_ids[a:b].tolist()) if row in info}
+            dset.boxes.extend(clipped[a:b] / Bbox._scale(tile_shape), labels[a:b], False, tile_shape, infos)
+            tiles.append(dset)
+        return tiles
+
+    def transform(self, *transforms: T.Transform, min_size: float = 0):
+        """
+        Apply geometric transforms (see unibox.transforms) to every box, in
+        place, and update img_shape to the size of the transformed image.
+
+        The transforms are fused into one matrix and all boxes are moved in
+        a single pass. They are then clipped to the new image, and those
+        left with a width or height of at most `min_size` pixels are
+        removed. Normalized boxes stay normalized.
+
+        Args:
+            *transforms (T.Transform): The transforms, applied in order.
+            min_size (float, optional): The size in pixels a box must exceed to be kept. Defaults to 0.
+
+        Usage:
+            dset.transform(T.HFlip(), T.Letterbox(640))
+        """
+        boxes = self._data["data"]
+        img_wh = get_img_shape(self)
+        moved, keep, out_wh = T.transform_boxes(boxes.ltrb(True, img_wh), img_wh, transforms, min_size)
+        boxes.keep(keep)
+        normalized = ~boxes.is_pixel
+        moved[normalized] /= Bbox._scale(out_wh)
+        boxes.assign(moved, out_wh)
+        self["img_shape"] = out_wh
+        return self
+
+    def spatial_index(self) -> GridIndex:
+        """
+        Return a GridIndex over the boxes, built on first use and rebuilt
+        after the boxes change. Its coordinates are in pixels if any box is,
+        normalized otherwise.
+        """
+        boxes = self._data["data"]
+        cached = self._spatial
+        if cached is None or cached[0] is not boxes or cached[1] != boxes._version:
+            pixel = bool(boxes.is_pixel.any())
+            if boxes.is_pixel.all() or not pixel:
+                coords = boxes.boxes
+            else:
+                coords = boxes.ltrb(True, self["img_shape"])
+            cached = self._spatial = (boxes, boxes._version, pixel, GridIndex(coords))
+        return cached[3]
+
+    def query(self, window: list | np.ndarray, is_pixel_distance: bool = True) -> np.ndarray:
+        """
+        Return the indices of the boxes intersecting a window, or containing
+        a point, through the spatial index.
+
+        Args:
+            window (list | np.ndarray): An "ltrb" window, or an [x, y] point.
+            is_pixel_distance (bool, optional): Whether the window is in pixel distance. Defaults to True.
+
+        Returns:
+            np.ndarray: The sorted indices of the matching boxes.
+        """
+        window = np.asarray(window, dtype=np.float64).reshape(-1)
+        if len(window) == 2:
+            window = np.concatenate([window, window])
+        index = self.spatial_index()
+        if len(index) and is_pixel_distance != self._spatial[2]:
+            scale = Bbox._scale(get_img_shape(self))
+            window = window * scale if self._spatial[2] else window / scale
+        return index.query(window)
+
     def clear(
         self,
     ):
-        self._data = dict(data=[], info={"img_path": None, "label_path": None})
+        self._data = dict(data=BoxArray(), info={"img_path": None, "label_path": None})
 
     def __getitem__(self, key: str):
         return self._data["info"].get(key, None)
@@ -66,38 +258,73 @@ class Dataset:
     def __len__(self):
         return len(self._data["data"])
 
-    def load(self, format: str, in_stream=None, lb_path=None, **kwargs):
+    def load(self, format: str, in_stream=None, lb_path=None, check: bool = True, **kwargs):
         """
         Load the dataset from a file or input stream.
 
         Args:
-            format (str): The format of the dataset.
+            format (str): The format of the dataset, or "auto" to detect it from the first bytes, see Registry.detect.
             in_stream (file-like object, optional): The input stream containing the dataset.
             lb_path (str, optional): The path to the file containing the dataset.
+            check (bool, optional): Reject invalid boxes; if False they are loaded as they are, e.g. to report them. Defaults to True.
             **kwargs: Additional keyword arguments to be passed to the format-specific import function..
 
         Raises:
             ValueError: If neither lb_path nor in_stream is provided.
             ImportError: If the specified format cannot be imported.
         """
+        self._check = check
+        try:
+            return self._load(format, in_stream, lb_path, **kwargs)
+        finally:
+            self._check = True
+
+    def _load(self, format: str, in_stream, lb_path, **kwargs):
         if lb_path is None and in_stream is None:
             raise ValueError("Either lb_path or in_stream must be provided.")
+        if in_stream is None and not os.path.isfile(lb_path):
+            raise FileNotFoundError(f"File {lb_path} not found.")
+        # taken before reading, so that an edit made meanwhile is noticed
+        stamps = None
+        if in_stream is None:
+            stat = os.stat(lb_path)
+            stamps = ([stat.st_size, stat.st_mtime_ns], image_stamp(self._img_path))
+
+        if format == "auto":
+            if in_stream is None:
+                format = registry.detect(Path(lb_path))
+            else:
+                if not isinstance(in_stream, (str, bytes)) and not in_stream.seekable():
+                    in_stream = in_stream.read()
+                format = registry.detect(in_stream)
+        fmt = registry.get_format(format)
+        if in_stream is None and hasattr(fmt, "import_file"):
+            # formats that read the file themselves, e.g. through a memory map
+            started = profiling.start()
+            fmt.import_file(self, lb_path, **kwargs)
+            profiling.stop(started, f"import.{format}", boxes=len(self))
+            self["label_path"] = lb_path
+            self._stamps = stamps
+            return self
+
         if in_stream is None:
-            if not os.path.isfile(lb_path):
-                raise FileNotFoundError(f"File {lb_path} not found.")
+            started = profiling.start()
             with open(lb_path, "rb") as file:
                 in_stream = file.read()
-
-        if lb_path is not None:
-            self["label_path"] = lb_path
+            profiling.stop(started, "read", nbytes=len(in_stream))
 
         stream = normalize_input(in_stream)
 
-        fmt = registry.get_format(format)
         if not hasattr(fmt, "import_set"):
             raise ImportError(f"Format {format} cannot be imported.")
 
+        started = profiling.start()
         fmt.import_set(self, stream, **kwargs)
+        profiling.stop(started, f"import.{format}", boxes=len(self))
+        # set after importing, importers start with clear()
+        if lb_path is not None:
+            self["label_path"] = lb_path
+        self._stamps = stamps
         return self
 
     def dump(self, format: str, **kwargs):
@@ -115,25 +342,38 @@ class Dataset:
         if not hasattr(fmt, "export_set"):
             raise ImportError(f"Format {format} cannot be exported.")
 
+        started = profiling.start()
         result = fmt.export_set(self, **kwargs)
         if isinstance(result, str):
             result = result.encode("utf-8")
+        profiling.stop(started, f"export.{format}", nbytes=len(result), boxes=len(self))
 
         return result
 
-    def save(self, outfile: str | Path, format: str, **kwargs):
+    def save(self, outfile: str | Path, format: str, manifest: Manifest | None = None, **kwargs):
         """
         Save the dataset to a file.
 
         Args:
             outfile (str | Path): The path to the output file.
             format (str): The format in which to save the dataset.
+            manifest (Manifest | None, optional): If given, record that `outfile` was converted from the label file and image the dataset was loaded from, as they were when loaded; if the label file changed since, forget `outfile` instead. Defaults to None.
             **kwargs: Additional keyword arguments to be passed to the dump method.
         """
+        result = self.dump(format, **kwargs)
+        started = profiling.start()
         with open(outfile, "wb") as out_stream:
             stream = normalize_input(out_stream)
-            result = self.dump(format, **kwargs)
             stream.write(result)
+        profiling.stop(started, "write", nbytes=len(result))
+        if manifest is not None and self["label_path"] is not None:
+            label_stat, image = self._stamps or (None, image_stamp(self._img_path))
+            signature = file_signature(self["label_path"])
+            if label_stat is not None and list(signature[:2]) != label_stat:
+                # converted from an older version of the file
+                manifest.discard(outfile)
+            else:
+                manifest.record(self["label_path"], outfile, signature, image)
 
     def __repr__(self) -> str:
         return f"{self._data}"
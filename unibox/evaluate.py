@@ -0,0 +1,281 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from unibox.collection import DatasetCollection
+from unibox.dataset import Dataset
+from unibox.ops import box_iou
+from unibox.utils import get_img_shape
+
+
+COCO_IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+RECALL_POINTS = np.linspace(0, 1, 101)
+
+
+def _match(gt_boxes, gt_cls, boxes, cls, scores, thresholds) -> np.ndarray:
+    """
+    COCO-style matching of the predictions of one image: by decreasing score,
+    every prediction takes the unmatched ground truth box of its class with
+    the highest IoU, if at least the threshold. Returns the (P, T) tp flags.
+    """
+    tp = np.zeros((len(boxes), len(thresholds)), dtype=bool)
+    if not len(boxes) or not len(gt_boxes):
+        return tp
+    order = np.argsort(-scores, kind="stable")
+    iou = box_iou(boxes[order], gt_boxes)
+    iou[cls[order][:, None] != gt_cls[None, :]] = -1
+    candidates = np.flatnonzero(iou.max(axis=1) >= thresholds.min())
+
+    free = np.ones((len(thresholds), len(gt_boxes)), dtype=bool)
+    rows = np.arange(len(thresholds))
+    for k in candidates.tolist():
+        row = iou[k]
+        masked = np.where(free & (row >= thresholds[:, None]), row, -1)
+        best = masked.argmax(axis=1)
+        hit = masked[rows, best] >= 0
+        tp[order[k]] = hit
+        free[rows[hit], best[hit]] = False
+    return tp
+
+
+def _evaluate_chunk(ground_truth: Iterable[Dataset], predictions: Iterable[Dataset], iou_thresholds: np.ndarray, mapping: Dict | None) -> "Evaluator":
+    # runs in a worker: load (for collections), prepare and match one chunk of images
+    evaluator = Evaluator(iou_thresholds, mapping)
+    evaluator.add_all(ground_truth, predictions)
+    return evaluator
+
+
+def _scores(boxes) -> np.ndarray:
+    # the confidence is info["score"], or the first extra YOLO column
+    scores = np.ones(len(boxes), dtype=np.float64)
+    for row, info in boxes._info.items():
+        if "score" in info:
+            scores[row] = float(info["score"])
+        elif info.get("extra"):
+            scores[row] = float(info["extra"][0])
+    return scores
+
+
+class Evaluator:
+    """
+    Evaluator accumulates COCO-style detection metrics over a corpus.
+
+    Predictions are matched to the ground truth image by image, then all
+    matches of a class are sorted by score once and precision/recall are
+    accumulated with cumulative sums. AP is the 101-point interpolated area
+    under the precision/recall curve, averaged over the IoU thresholds.
+
+    The score of a prediction is info["score"] if present, else the first
+    extra column of a YOLO line (info["extra"][0]), else 1.
+
+    Args:
+        iou_thresholds (Iterable[float] | None, optional): Defaults to 0.5:0.95:0.05.
+        mapping (Dict | None, optional): Maps prediction labels to ground truth labels, e.g. YOLO class ids to names. Defaults to None.
+
+    Usage:
+        evaluator = Evaluator(mapping={"0": "person", "1": "car"})
+        evaluator.add_all(DatasetCollection("gt", "voc"), DatasetCollection("pred", "yolo", img_dir="images"), jobs=8)
+        result = evaluator.compute()
+        print(result["map"], result["ap"]["car"])
+    """
+
+    def __init__(self, iou_thresholds: Iterable[float] | None = None, mapping: Dict | None = None) -> None:
+        if iou_thresholds is None:
+            iou_thresholds = COCO_IOU_THRESHOLDS
+        self.iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64).reshape(-1)
+        self.mapping = mapping
+        self.names: list = []
+        self._ids: dict = {}
+        self._gt_counts = np.zeros(0, np.int64)
+        self._cls: list = []
+        self._scores: list = []
+        self._tp: list = []
+        self.num_images = 0
+
+    def _class_id(self, name: str) -> int:
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return idx
+
+    def _prepare(self, gt: Dataset, pred: Dataset) -> tuple:
+        """
+        Turn a pair of Datasets into the arrays matched by _match.
+        """
+        a, b = gt.boxes, pred.boxes
+        gt_boxes, boxes = a.boxes, b.boxes
+        units = np.concatenate([a.is_pixel, b.is_pixel])
+        if units.any() and not units.all():
+            # mixed units, e.g. VOC ground truth and YOLO predictions
+            try:
+                img_wh = get_img_shape(gt)
+            except ValueError:
+                img_wh = get_img_shape(pred)
+            gt_boxes, boxes = a.ltrb(True, img_wh), b.ltrb(True, img_wh)
+
+        gt_lut = np.array([self._class_id(name) for name in a.names], dtype=np.int32)
+        names = b.names if self.mapping is None else [str(self.mapping.get(name, name)) for name in b.names]
+        lut = np.array([self._class_id(name) for name in names], dtype=np.int32)
+        gt_cls = gt_lut[a.class_ids] if len(a) else np.zeros(0, np.int32)
+        cls = lut[b.class_ids] if len(b) else np.zeros(0, np.int32)
+
+        counts = np.bincount(gt_cls, minlength=len(self.names))
+        if len(self._gt_counts) < len(counts):
+            self._gt_counts = np.pad(self._gt_counts, (0, len(counts) - len(self._gt_counts)))
+        self._gt_counts[: len(counts)] += counts
+        self.num_images += 1
+        return gt_boxes, gt_cls, boxes, cls, _scores(b)
+
+    def _collect(self, items: list, tps: list):
+        for (_, _, _, cls, scores), tp in zip(items, tps):
+            self._cls.append(cls)
+            self._scores.append(scores)
+            self._tp.append(tp)
+
+    def add(self, gt: Dataset, pred: Dataset):
+        """
+        Add the ground truth and the predictions of one image.
+        """
+        item = self._prepare(gt, pred)
+        self._collect([item], [_match(*item, self.iou_thresholds)])
+
+    def add_all(self, ground_truth: Iterable[Dataset], predictions: Iterable[Dataset], jobs: int = 1, chunksize: int = 256):
+        """
+        Add paired iterables of Datasets, e.g. two DatasetCollections listing
+        the same images in the same order.
+
+        With `jobs` other than 1 the images are evaluated on worker processes
+        (all cores if None), `chunksize` images at a time, and the partial
+        results are merged in order, so the metrics are those of a serial run.
+        Two DatasetCollections are handed over as chunks of their label and
+        image paths, and every worker loads its own files; their map and
+        filter functions must then be picklable.
+        """
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1:
+            for gt, pred in zip(ground_truth, predictions, strict=True):
+                self.add(gt, pred)
+            return
+
+        if isinstance(ground_truth, DatasetCollection) and isinstance(predictions, DatasetCollection):
+            pairs = zip(ground_truth.pairs(), predictions.pairs(), strict=True)
+
+            def split(chunk):
+                gt_paths, pred_paths = zip(*chunk)
+                # the image paths are resolved already, a worker need not index img_dir again
+                return (
+                    ground_truth._derive(_source=list(gt_paths), _img_dir=None),
+                    predictions._derive(_source=list(pred_paths), _img_dir=None),
+                )
+
+        else:
+            pairs = zip(ground_truth, predictions, strict=True)
+
+            def split(chunk):
+                return tuple(map(list, zip(*chunk)))
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = []
+            while chunk := list(islice(pairs, chunksize)):
+                pending.append(pool.submit(_evaluate_chunk, *split(chunk), self.iou_thresholds, self.mapping))
+                if len(pending) >= 2 * jobs:
+                    self._merge(pending.pop(0).result())
+            for future in pending:
+                self._merge(future.result())
+
+    def _merge(self, other: "Evaluator"):
+        # add the images of another Evaluator, e.g. a worker's, after those added so far
+        lut = np.array([self._class_id(name) for name in other.names], dtype=np.int32)
+        if len(self._gt_counts) < len(self.names):
+            self._gt_counts = np.pad(self._gt_counts, (0, len(self.names) - len(self._gt_counts)))
+        self._gt_counts[lut[: len(other._gt_counts)]] += other._gt_counts
+        self._cls.extend(lut[cls] for cls in other._cls)
+        self._scores.extend(other._scores)
+        self._tp.extend(other._tp)
+        self.num_images += other.num_images
+
+    def _sorted(self) -> Tuple[np.ndarray, np.ndarray]:
+        # all predictions grouped by class, by decreasing score within a class
+        if not self._cls:
+            return np.zeros(len(self.names) + 1, np.int64), np.zeros((0, len(self.iou_thresholds)), bool)
+        cls = np.concatenate(self._cls)
+        tp = np.concatenate(self._tp)
+        order = np.lexsort((-np.concatenate(self._scores), cls))
+        cls, tp = cls[order], tp[order]
+        bounds = np.searchsorted(cls, np.arange(len(self.names) + 1))
+        return bounds, tp
+
+    @staticmethod
+    def _curve(tp: np.ndarray, num_gt: int) -> Tuple[np.ndarray, np.ndarray]:
+        tps = np.cumsum(tp, axis=0)
+        fps = np.cumsum(~tp, axis=0)
+        return tps / max(num_gt, 1), tps / np.maximum(tps + fps, 1)
+
+    def pr_curve(self, label: str, iou_threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the (recall, precision) curve of a class at the IoU threshold
+        closest to `iou_threshold`, one point per prediction by decreasing score.
+        """
+        c = self.names.index(str(label))
+        t = int(np.abs(self.iou_thresholds - iou_threshold).argmin())
+        bounds, tp = self._sorted()
+        recall, precision = self._curve(tp[bounds[c] : bounds[c + 1], t], int(self._gt_counts[c]))
+        return recall, precision
+
+    def compute(self) -> dict:
+        """
+        Compute the metrics over everything added so far.
+
+        Returns:
+            dict: "map" (mean over classes and IoU thresholds), "map50" and
+            "map75" (if those thresholds are evaluated), "ap" (label to AP),
+            "names", and "precision", the (C, T, 101) interpolated precision
+            at the recall points 0:1:0.01, NaN for classes without ground truth.
+        """
+        num_cls, num_thr = len(self.names), len(self.iou_thresholds)
+        bounds, tp = self._sorted()
+        precision = np.full((num_cls, num_thr, len(RECALL_POINTS)), np.nan)
+        for c in np.flatnonzero(self._gt_counts[:num_cls]).tolist():
+            recall, prec = self._curve(tp[bounds[c] : bounds[c + 1]], int(self._gt_counts[c]))
+            # precision envelope: the best precision at any higher recall
+            prec = np.concatenate([np.maximum.accumulate(prec[::-1], axis=0)[::-1], np.zeros((1, num_thr))])
+            for t in range(num_thr):
+                # recall points beyond the reached recall get the zero row
+                precision[c, t] = prec[np.searchsorted(recall[:, t], RECALL_POINTS, "left"), t]
+
+        ap = precision.mean(axis=2)  # (C, T)
+        valid = ~np.isnan(ap[:, 0]) if num_thr else np.zeros(num_cls, bool)
+        result = {
+            "map": float(ap[valid].mean()) if valid.any() else 0.0,
+            "ap": {name: float(ap[c].mean()) for c, name in enumerate(self.names) if valid[c]},
+            "names": list(self.names),
+            "precision": precision,
+        }
+        for key, thr in (("map50", 0.5), ("map75", 0.75)):
+            hit = np.flatnonzero(np.isclose(self.iou_thresholds, thr))
+            if len(hit):
+                result[key] = float(ap[valid, hit[0]].mean()) if valid.any() else 0.0
+        return result
+
+
+def evaluate(
+    ground_truth: Iterable[Dataset],
+    predictions: Iterable[Dataset],
+    mapping: Dict | None = None,
+    iou_thresholds: Iterable[float] | None = None,
+    jobs: int = 1,
+    chunksize: int = 256,
+) -> dict:
+    """
+    Score predictions against the ground truth, see Evaluator.
+
+    Usage:
+        result = evaluate(DatasetCollection("gt", "voc"), DatasetCollection("pred", "yolo"), mapping=names, jobs=8)
+    """
+    evaluator = Evaluator(iou_thresholds, mapping)
+    evaluator.add_all(ground_truth, predictions, jobs, chunksize)
+    return evaluator.compute()
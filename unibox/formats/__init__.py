@@ -1,5 +1,6 @@
 
 from importlib import import_module
+from os import PathLike
 
 
 def load_format_class(dotted_path):
@@ -23,6 +24,8 @@ class Registry:
         self.register('labelme', "unibox.formats.labelme.Labelme")
         self.register('yolo', "unibox.formats.yolo.Yolo")
         self.register('voc', "unibox.formats.voc.VOC")
+        self.register('shard', "unibox.formats.shard.Shard")
+        self.register('coco', "unibox.formats.coco.Coco")
 
  
 
@@ -32,6 +35,36 @@ class Registry:
                 self._formats[key] = load_format_class(frm)
             yield self._formats[key]
 
+    def detect(self, stream, size=1024):
+        """
+        Return the key of the first registered format whose `detect` accepts
+        the first `size` bytes of `stream`: bytes, str, a path or a binary
+        file object, which is rewound if it can be.
+        """
+        if isinstance(stream, str):
+            stream = stream.encode("utf-8")
+        if isinstance(stream, (bytes, bytearray, memoryview)):
+            head = bytes(stream[:size])
+        elif isinstance(stream, PathLike):
+            with open(stream, "rb") as file:
+                head = file.read(size)
+        else:
+            seekable = stream.seekable()
+            pos = stream.tell() if seekable else None
+            head = stream.read(size)
+            if seekable:
+                stream.seek(pos)
+            if isinstance(head, str):
+                head = head.encode("utf-8")
+        if head.startswith(b"\xef\xbb\xbf"):
+            head = head[3:]
+
+        for key in list(self._formats):
+            fmt = self.get_format(key)
+            if hasattr(fmt, "detect") and fmt.detect(head):
+                return key
+        raise ValueError("Cannot detect the format of the input.")
+
     def get_format(self, key):
         if key not in self._formats:
             raise ImportError(f"has no format '{key}' or it is not registered.")
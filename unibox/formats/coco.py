@@ -0,0 +1,461 @@
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator
+
+import numpy as np
+
+from unibox import Bbox, Dataset
+from unibox.boxarray import BoxArray
+from unibox.utils import get_img_shape
+
+
+_CHUNK = 1 << 20
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = ",:]}" + _WHITESPACE
+
+
+class _JsonStream:
+    """
+    Pull values out of a JSON text one at a time, holding only the current
+    value and a read buffer in memory.
+    """
+
+    def __init__(self, file, chunk: int = _CHUNK) -> None:
+        self._file = file
+        self._chunk = chunk
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        data = self._file.read(self._chunk)
+        if not data:
+            self._eof = True
+            return False
+        # drop what was consumed so the buffer stays about one chunk
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {chars!r}, got {char!r}.")
+        self._pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # a number cut by the end of the buffer, e.g. "1" of "1.5", is not done yet
+                if self._eof or (end < len(self._buf) and self._buf[end] in _DELIMITERS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def items(self, on_array: Dict[str, Callable]) -> dict:
+        """
+        Walk the top-level object. The arrays under the keys of `on_array` are
+        streamed element by element to their callback; every other value is
+        decoded and returned.
+        """
+        doc = {}
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return doc
+        while True:
+            key = self.value()
+            self.expect(":")
+            if key in on_array and self.peek() == "[":
+                self._pos += 1
+                callback = on_array[key]
+                if self.peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        callback(self.value())
+                        if self.expect(",]") == "]":
+                            break
+            else:
+                doc[key] = self.value()
+            if self.expect(",}") == "}":
+                return doc
+
+
+def _positions(ids: np.ndarray, keys: np.ndarray, what: str, order: np.ndarray | None = None) -> np.ndarray:
+    # the position in `ids` of every key, the first one for repeated ids
+    if order is None:
+        order = np.argsort(ids, kind="stable")
+    pos = np.searchsorted(ids, keys, sorter=order)
+    found = pos < len(ids)
+    found[found] = ids[order[pos[found]]] == keys[found]
+    if not found.all():
+        raise ValueError(f"Annotation with an unknown {what} {keys[~found][0]}.")
+    return order[pos] if len(keys) else np.zeros(0, np.int64)
+
+
+class CocoReader:
+    """
+    CocoReader indexes a COCO detection file in one streaming pass and gives
+    random access to its images as Datasets.
+
+    The JSON is parsed incrementally: every image, annotation and category
+    is decoded, reduced to a few numbers, and dropped, so memory grows with
+    the number of boxes (about 50 bytes each) rather than with the size of
+    the file. Annotations are then grouped by image in (N, 4) "ltrb" columns,
+    with an image -> annotation offset index.
+
+    A box that Bbox.check_boxes would reject does not stop the indexing:
+    the positions of such annotations in the "annotations" list are kept in
+    `invalid`, and only the images holding them fail to load.
+
+    Args:
+        source (str | Path | BinaryIO): The COCO file, or a binary or text stream.
+        img_dir (str | Path | None, optional): Joined to the file_name of every image. Defaults to None.
+        info_keys (Iterable[str], optional): Annotation fields kept in the box info. Defaults to ("iscrowd",).
+
+    Usage:
+        reader = Coco.open("instances_train.json", img_dir="train2017")
+        for dset in reader:
+            ...
+    """
+
+    def __init__(self, source: str | Path | BinaryIO, img_dir: str | Path | None = None, info_keys: Iterable[str] = ("iscrowd",)) -> None:
+        self.img_dir = None if img_dir is None else str(img_dir)
+        self._info_keys = tuple(info_keys)
+        if isinstance(source, (str, Path)):
+            with open(source, "r", encoding="utf-8") as file:
+                self._parse(file)
+        else:
+            if isinstance(source.read(0), bytes):
+                source = io.TextIOWrapper(source, encoding="utf-8")
+            self._parse(source)
+
+    def _parse(self, file):
+        img_ids, widths, heights, file_names = array("q"), array("q"), array("q"), []
+        ann_img, ann_cat, ann_box = array("q"), array("q"), array("d")
+        cat_ids, cat_names = [], []
+        infos = {}
+
+        def on_image(image: dict):
+            img_ids.append(image["id"])
+            widths.append(int(image.get("width", -1)))
+            heights.append(int(image.get("height", -1)))
+            file_names.append(image.get("file_name", ""))
+
+        def on_annotation(ann: dict):
+            if "bbox" not in ann:
+                return
+            kept = {key: ann[key] for key in self._info_keys if key in ann and ann[key]}
+            if kept:
+                infos[len(ann_img)] = kept
+            ann_img.append(ann["image_id"])
+            ann_cat.append(ann["category_id"])
+            ann_box.extend(ann["bbox"])
+
+        def on_category(category: dict):
+            cat_ids.append(category["id"])
+            cat_names.append(str(category["name"]))
+
+        self.meta = _JsonStream(file).items(
+            {"images": on_image, "annotations": on_annotation, "categories": on_category}
+        )
+
+        self.image_ids = np.array(img_ids, dtype=np.int64)
+        self._id_order = np.argsort(self.image_ids, kind="stable")
+        self.file_names = file_names
+        self._shapes = np.stack([np.array(widths), np.array(heights)], axis=1).astype(np.int32).reshape(-1, 2)
+
+        # class ids follow the order of the categories list
+        self.names = cat_names
+        classes = _positions(np.array(cat_ids, dtype=np.int64), np.array(ann_cat, dtype=np.int64), "category_id")
+        # group the annotations by image
+        owner = _positions(self.image_ids, np.array(ann_img, dtype=np.int64), "image_id", self._id_order)
+        order = np.argsort(owner, kind="stable")
+
+        ltwh = np.array(ann_box, dtype=np.float64).reshape(-1, 4)
+        # the rules of Bbox.check_boxes for pixel "ltwh" boxes, row by row
+        invalid = (ltwh < 0).any(axis=1) | (ltwh < 1).all(axis=1)
+        self.invalid = np.flatnonzero(invalid)
+        self._invalid = invalid[order]
+        self._boxes = Bbox.check_boxes(ltwh, "ltwh", True, check_values=False)[order]
+        self._classes = classes[order].astype(np.int32)
+        self._index = np.concatenate([[0], np.cumsum(np.bincount(owner, minlength=len(self.image_ids)))]).astype(np.int64)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        self._infos = {int(rank[row]): info for row, info in infos.items()}
+        self._positions = None
+
+    def __len__(self) -> int:
+        return len(self.image_ids)
+
+    def index(self, key: int | str | Path) -> int:
+        """
+        The position of an image given its COCO id or its file name.
+        """
+        if isinstance(key, (int, np.integer)):
+            pos = int(np.searchsorted(self.image_ids, key, sorter=self._id_order))
+            if pos == len(self.image_ids) or self.image_ids[self._id_order[pos]] != key:
+                raise KeyError(f"No image with id {key}.")
+            return int(self._id_order[pos])
+        if self._positions is None:
+            self._positions = {}
+            for i, name in enumerate(self.file_names):
+                self._positions.setdefault(name, i)
+        key = str(key)
+        if self.img_dir is not None and key.startswith(self.img_dir):
+            key = os.path.relpath(key, self.img_dir)
+        if key not in self._positions:
+            raise KeyError(f"No image named {key}.")
+        return self._positions[key]
+
+    def fill(self, dset: Dataset, index: int, check: bool = True):
+        """
+        Replace the content of `dset` with image `index` of the file. An
+        image with invalid boxes raises a ValueError, unless `check` is False.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("COCO image index out of range")
+        start, end = self._index[index : index + 2].tolist()
+        bad = np.flatnonzero(self._invalid[start:end])
+        if check and len(bad):
+            raise ValueError(f"Invalid bounding box in image {self.image_ids[index]}: {self._boxes[start + bad[0]]}")
+        img_wh = self._shapes[index]
+        infos = {row - start: self._infos[row] for row in range(start, end) if row in self._infos}
+
+        dset.clear()
+        dset.boxes = BoxArray.from_columns(
+            self._boxes[start:end],
+            self._classes[start:end],
+            self.names,
+            np.ones(end - start, dtype=bool),
+            np.broadcast_to(img_wh, (end - start, 2)),
+            infos,
+        )
+        if img_wh[0] >= 0:
+            dset["img_shape"] = img_wh.tolist()
+        dset["image_id"] = int(self.image_ids[index])
+        name = self.file_names[index]
+        if name:
+            dset.img_path = name if self.img_dir is None else os.path.join(self.img_dir, name)
+
+    def __getitem__(self, index: int) -> Dataset:
+        dset = Dataset()
+        self.fill(dset, index)
+        return dset
+
+    def __iter__(self) -> Iterator[Dataset]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class CocoWriter:
+    """
+    CocoWriter writes many Datasets to one COCO file without holding them:
+    images go straight to the output, annotations are spooled to a temporary
+    file and appended on close, followed by the categories.
+
+    Args:
+        file (str | Path | BinaryIO): The output path or binary file object.
+        mapping (Dict | None, optional): Maps the labels of the datasets to category names. Defaults to None.
+        img_dir (str | Path | None, optional): File names are written relative to it. Defaults to None.
+
+    Usage:
+        with CocoWriter("instances.json") as writer:
+            for dset in DatasetCollection("labels", "voc"):
+                writer.add(dset)
+    """
+
+    def __init__(self, file: str | Path | BinaryIO, mapping: Dict | None = None, img_dir: str | Path | None = None) -> None:
+        self._own = isinstance(file, (str, Path))
+        self._out = open(file, "wb") if self._own else file
+        self._spool = tempfile.TemporaryFile()
+        self._mapping = mapping
+        self._img_dir = None if img_dir is None else str(img_dir)
+        self._names: list = []
+        self._ids: dict = {}
+        self._num_images = 0
+        self._num_annotations = 0
+        self._out.write(b'{"images": [')
+
+    def _category_id(self, name: str) -> int:
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = self._ids[name] = len(self._names) + 1
+            self._names.append(name)
+        return idx
+
+    def add(self, dset: Dataset, image_id: int | None = None) -> int:
+        """
+        Write one image and its boxes; returns the image id used.
+        """
+        boxes = dset.boxes
+        if image_id is None:
+            image_id = dset["image_id"] if dset["image_id"] is not None else self._num_images + 1
+        try:
+            img_wh = get_img_shape(dset)
+        except (ValueError, OSError):
+            if not boxes.is_pixel.all():
+                raise
+            img_wh = None
+
+        file_name = dset.img_path or ""
+        if file_name and self._img_dir is not None:
+            file_name = os.path.relpath(file_name, self._img_dir)
+        image = {"id": image_id, "file_name": file_name}
+        if img_wh is not None:
+            image["width"], image["height"] = int(img_wh[0]), int(img_wh[1])
+        self._out.write((", " if self._num_images else "").encode("utf-8") + json.dumps(image).encode("utf-8"))
+        self._num_images += 1
+
+        if len(boxes):
+            names = boxes.mapped_names(self._mapping)
+            lut = np.array([0 if name is None else self._category_id(str(name)) for name in names], dtype=np.int64)
+            ltwh = Bbox.convert(boxes.ltrb(True, img_wh), "ltrb", "ltwh").round(2)
+            cats = lut[boxes.class_ids].tolist()
+            parts = []
+            for row, (box, cat) in enumerate(zip(ltwh.tolist(), cats)):
+                self._num_annotations += 1
+                info = boxes._info.get(row) or {}
+                ann = {
+                    "id": self._num_annotations,
+                    "image_id": image_id,
+                    "category_id": cat,
+                    "bbox": box,
+                    "area": round(box[2] * box[3], 2),
+                    "iscrowd": int(info.get("iscrowd", 0)),
+                }
+                parts.append(json.dumps(ann))
+            sep = ", " if self._num_annotations > len(parts) else ""
+            self._spool.write((sep + ", ".join(parts)).encode("utf-8"))
+        return image_id
+
+    def __len__(self) -> int:
+        return self._num_images
+
+    def close(self):
+        try:
+            self._out.write(b'], "annotations": [')
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, self._out)
+            categories = [{"id": i + 1, "name": name} for i, name in enumerate(self._names)]
+            self._out.write(('], "categories": ' + json.dumps(categories) + "}").encode("utf-8"))
+        finally:
+            self._spool.close()
+            if self._own:
+                self._out.close()
+
+    def __enter__(self) -> "CocoWriter":
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self._spool.close()
+            if self._own:
+                self._out.close()
+
+
+@lru_cache(maxsize=4)
+def _open(path: str, size: int, mtime_ns: int, img_dir: str | None) -> CocoReader:
+    return CocoReader(path, img_dir)
+
+
+class Coco:
+    """
+    COCO detection JSON holding the annotations of many images in one file.
+
+    As a registered format it reads or writes one image at a time:
+    `Dataset().load("coco", lb_path=path, index=i)` (or `image_id=...`,
+    `img_path=...`) indexes the file once and reuses the index while the
+    file is unchanged, and `Dataset.dump("coco")` produces a one-image file.
+    Use Coco.open and Coco.write for whole corpora.
+    """
+
+    suffix = ".json"
+
+    @staticmethod
+    def detect(head: bytes) -> bool:
+        # the info and licenses blocks that usually come first can fill the head
+        match = re.match(rb'\s*\{\s*"(\w+)"', head)
+        if match is None:
+            return False
+        return match.group(1) in (b"info", b"licenses") or any(
+            key in head for key in (b'"images"', b'"annotations"', b'"categories"')
+        )
+
+    @staticmethod
+    def _select(reader: CocoReader, dset: Dataset, index: int | None, image_id: int | None, img_path: str | Path | None):
+        if index is None:
+            if image_id is not None:
+                index = reader.index(int(image_id))
+            else:
+                img_path = img_path if img_path is not None else dset.img_path
+                index = 0 if img_path is None else reader.index(img_path)
+        # the boxes are not extended one file at a time, so follow load(check=...) here
+        reader.fill(dset, index, dset._check)
+
+    @staticmethod
+    def import_file(dset: Dataset, lb_path: str | Path, index: int | None = None, image_id: int | None = None, img_path: str | Path | None = None, **kwargs):
+        Coco._select(Coco.open(lb_path), dset, index, image_id, img_path)
+
+    @staticmethod
+    def import_set(dset: Dataset, in_stream, index: int | None = None, image_id: int | None = None, img_path: str | Path | None = None, **kwargs):
+        Coco._select(CocoReader(in_stream), dset, index, image_id, img_path)
+
+    @staticmethod
+    def export_set(dset: Dataset, mapping: Dict | None = None, **kwargs):
+        out = io.BytesIO()
+        with CocoWriter(out, mapping) as writer:
+            writer.add(dset)
+        return out.getvalue()
+
+    @staticmethod
+    def open(path: str | Path, img_dir: str | Path | None = None) -> CocoReader:
+        """
+        Return an indexed reader for a COCO file; readers are reused while
+        the file is unchanged.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        return _open(path, stat.st_size, stat.st_mtime_ns, None if img_dir is None else str(img_dir))
+
+    @staticmethod
+    def write(path: str | Path, datasets: Iterable[Dataset], mapping: Dict | None = None, img_dir: str | Path | None = None) -> int:
+        """
+        Stream datasets into one COCO file and return the number of images written.
+        """
+        with CocoWriter(path, mapping, img_dir) as writer:
+            for dset in datasets:
+                writer.add(dset)
+            return len(writer)
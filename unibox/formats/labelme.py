@@ -1,41 +1,30 @@
 import json
 import numpy as np
-import cv2
 from typing import Dict
 import os
 
-from unibox import Dataset, Bbox
+from unibox import Dataset
+from unibox.utils import get_img_shape
 
 
 class Labelme:
-    SHAPE_TEMPLATE = """\
-    {{ \
-      "label": "{label}", \
-      "points": {point}, \
-      "group_id": null, \
-      "description": "", \
-      "shape_type": "rectangle", \
-      "flags": {{}}, \
-      "mask": null \
-    }}"""
-
-    TABLE_TEMPLATE = """\
-    {{
-    "version": "5.6.0",
-    "flags": {{}}, \
-    "shapes": [{shape}], \
-    "imagePath": "{imagePath}", \
-    "imageData": null, \
-    "imageHeight": {imageHeight}, \
-    "imageWidth": {imageWidth} \
-    }}"""
+    suffix = ".json"
+
+    VERSION = "5.6.0"
+
+    @staticmethod
+    def detect(head: bytes) -> bool:
+        return head.lstrip().startswith(b"{") and (b'"shapes"' in head or b'"imagePath"' in head)
 
     @staticmethod
     def import_set(dset: Dataset, in_stream, base64=False, **kwargs):
         """Returns dataset from JSON stream."""
         dset.clear()
 
-        json_data = json.loads(in_stream.read().decode("utf-8"))
+        text = in_stream.read()
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        json_data = json.loads(text)
 
         shapes = json_data["shapes"]
         imageHeight = json_data["imageHeight"]
@@ -45,62 +34,63 @@ class Labelme:
 
         dset["img_shape"] = [imageWidth, imageHeight]
 
-        for shape in shapes:
-            if shape["shape_type"] == "rectangle":
-                label = shape["label"]
-                points = np.array(shape["points"]).reshape(-1, 2)
+        rects = [shape for shape in shapes if shape["shape_type"] == "rectangle"]
+        labels = [shape["label"] for shape in rects]
+        points = [np.ravel(shape["points"]) for shape in rects]
+        counts = np.fromiter((len(p) // 2 for p in points), dtype=np.intp, count=len(points))
 
-                x1, y1 = points.min(axis=0)
-                x2, y2 = points.max(axis=0)
+        # bounds of every rectangle in one pass over all points
+        ltrb = np.empty((len(rects), 4), dtype=np.float64)
+        if len(rects):
+            flat = np.concatenate(points).astype(np.float64).reshape(-1, 2)
+            starts = np.cumsum(counts) - counts
+            ltrb[:, :2] = np.minimum.reduceat(flat, starts, axis=0)
+            ltrb[:, 2:] = np.maximum.reduceat(flat, starts, axis=0)
 
-                bbox = Bbox(
-                    [x1, y1, x2, y2],
-                    "ltrb",
-                    is_pixel_distance=True,
-                    label=label,
-                    img_shape=[imageWidth, imageHeight],
-                )
-                dset.append(bbox)
+        dset.extend(ltrb, "ltrb", True, labels, [imageWidth, imageHeight])
 
     @staticmethod
-    def export_set(dset: Dataset, mapping: Dict = None, **kwargs):
-        """Writes dataset to JSON stream."""
-        shape = []
-
-        if dset["img_shape"] is None:
-            img_wh = dset.label[0].img_wh()
-            if img_wh is None:
-                if dset.img_path is None:
-                    raise ValueError("Image shape is not defined.")
-                img = cv2.imdecode(np.fromfile(dset.img_path, np.uint8), 1)
-                dset["img_shape"] = [img.shape[1], img.shape[0]]
-                img_wh = dset["img_shape"]
-            else:
-                dset["img_shape"] = img_wh
-
-        img_wh = dset["img_shape"]
-
-        for bbox in dset.anno:
-            x1, y1, x2, y2 = bbox.ltrb(
-                is_pixel_distance=True, img_shape=img_wh
-            ).tolist()
-            l = bbox.label
-            if l is None:
-                l = "0"
-            elif mapping is not None:
-                l = mapping[l]
-            point = [[x1, y1], [x2, y2]]
-
-            shape.append(Labelme.SHAPE_TEMPLATE.format(point=point, label=l))
-
-        img_path = os.path.basename(dset.img_path)
-        if img_path is None:
+    def export_set(dset: Dataset, mapping: Dict = None, compact: bool = False, **kwargs):
+        """
+        Writes dataset to JSON stream.
+
+        Args:
+            dset (Dataset): The dataset to export.
+            mapping (Dict, optional): Maps the labels of the dataset to the exported labels. Defaults to None.
+            compact (bool, optional): Write the JSON without indentation and whitespace. Defaults to False.
+        """
+        if dset.img_path is None:
             raise ValueError("Image path is not defined.")
 
-        result = Labelme.TABLE_TEMPLATE.format(
-            shape=",".join(shape),
-            imageHeight=img_wh[1],
-            imageWidth=img_wh[0],
-            imagePath=img_path,
-        )
-        return json.dumps(json.loads(result), ensure_ascii=False, indent=4)
+        img_wh = get_img_shape(dset)
+
+        boxes = dset.boxes
+        labels = boxes.mapped_labels(mapping).tolist()
+
+        shapes = [
+            {
+                "label": label,
+                "points": [[x1, y1], [x2, y2]],
+                "group_id": None,
+                "description": "",
+                "shape_type": "rectangle",
+                "flags": {},
+                "mask": None,
+            }
+            for label, (x1, y1, x2, y2) in zip(
+                labels, boxes.ltrb(True, img_wh).tolist()
+            )
+        ]
+
+        result = {
+            "version": Labelme.VERSION,
+            "flags": {},
+            "shapes": shapes,
+            "imagePath": os.path.basename(dset.img_path),
+            "imageData": None,
+            "imageHeight": int(img_wh[1]),
+            "imageWidth": int(img_wh[0]),
+        }
+        if compact:
+            return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(result, ensure_ascii=False, indent=4)
@@ -0,0 +1,303 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+import numpy as np
+
+from unibox import Dataset
+from unibox.boxarray import BoxArray
+from unibox.utils import get_img_shape
+
+
+MAGIC = b"UNIBOXS1"
+_ALIGN = 64
+
+# name, dtype, columns; the dtype of "boxes" is chosen when writing
+_SECTIONS = (
+    ("boxes", None, 4),
+    ("class_ids", np.int32, 1),
+    ("is_pixel", np.uint8, 1),
+    ("box_index", np.int64, 1),
+    ("img_shapes", np.int32, 2),
+    ("path_index", np.int64, 1),
+    ("paths", np.uint8, 1),
+    ("info_index", np.int64, 1),
+    ("infos", np.uint8, 1),
+)
+
+
+class ShardWriter:
+    """
+    ShardWriter packs the annotations of many images into one binary shard.
+
+    Each column is spooled to a temporary file while datasets are added, so
+    memory stays flat however large the corpus is; close() assembles the
+    shard. See Shard for the layout.
+
+    Args:
+        file (str | Path | BinaryIO): The output path or binary file object.
+        dtype (np.dtype, optional): The dtype of the box coordinates. Defaults to np.float32.
+
+    Usage:
+        with ShardWriter("corpus.ubs") as writer:
+            for lb_path in label_files:
+                writer.add(Dataset(img_path).load("yolo", lb_path=lb_path))
+    """
+
+    def __init__(self, file: str | Path | BinaryIO, dtype=np.float32) -> None:
+        self._file = file
+        self._dtype = np.dtype(dtype)
+        self._spool = {name: tempfile.TemporaryFile() for name, _, _ in _SECTIONS}
+        self._names: list = []
+        self._ids: dict = {}
+        self._num_images = 0
+        self._num_boxes = 0
+        self._path_bytes = 0
+        self._info_bytes = 0
+        self._write("box_index", np.zeros(1, np.int64))
+        self._write("path_index", np.zeros(1, np.int64))
+        self._write("info_index", np.zeros(1, np.int64))
+
+    def _write(self, name: str, array: np.ndarray):
+        self._spool[name].write(np.ascontiguousarray(array).tobytes())
+
+    def add(self, dset: Dataset):
+        boxes = dset.boxes
+        try:
+            img_wh = get_img_shape(dset)
+        except (ValueError, OSError):
+            img_wh = [-1, -1]  # no shape known and no readable image
+        lut = np.array([self._class_id(name) for name in boxes.names], dtype=np.int32)
+
+        self._write("boxes", boxes.boxes.astype(self._dtype))
+        self._write("class_ids", lut[boxes.class_ids])
+        self._write("is_pixel", boxes.is_pixel.astype(np.uint8))
+        self._write("img_shapes", np.asarray(img_wh, dtype=np.int32))
+        self._num_boxes += len(boxes)
+        self._write("box_index", np.array([self._num_boxes], np.int64))
+
+        path = (dset.img_path or "").encode("utf-8")
+        self._spool["paths"].write(path)
+        self._path_bytes += len(path)
+        self._write("path_index", np.array([self._path_bytes], np.int64))
+
+        info = boxes._info
+        blob = json.dumps(info).encode("utf-8") if info else b""
+        self._spool["infos"].write(blob)
+        self._info_bytes += len(blob)
+        self._write("info_index", np.array([self._info_bytes], np.int64))
+        self._num_images += 1
+
+    def __len__(self) -> int:
+        return self._num_images
+
+    def _class_id(self, name: str) -> int:
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return idx
+
+    def close(self):
+        sections = {}
+        offset = 0
+        for name, dtype, _ in _SECTIONS:
+            spool = self._spool[name]
+            sections[name] = [offset, spool.tell()]
+            offset += -(-spool.tell() // _ALIGN) * _ALIGN
+        meta = json.dumps(
+            {
+                "version": 1,
+                "num_images": self._num_images,
+                "num_boxes": self._num_boxes,
+                "dtype": self._dtype.str,
+                "names": self._names,
+                "sections": sections,
+            }
+        ).encode("utf-8")
+        head = MAGIC + struct.pack("<Q", len(meta)) + meta
+        head += b"\0" * (-len(head) % _ALIGN)
+
+        out = open(self._file, "wb") if isinstance(self._file, (str, Path)) else self._file
+        try:
+            out.write(head)
+            for name, _, _ in _SECTIONS:
+                spool = self._spool[name]
+                size = spool.tell()
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+                out.write(b"\0" * (-size % _ALIGN))
+                spool.close()
+        finally:
+            if out is not self._file:
+                out.close()
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            for spool in self._spool.values():
+                spool.close()
+
+
+class ShardReader:
+    """
+    ShardReader gives random access to the images of a shard. Opened from a
+    path the shard is memory-mapped, and the boxes of every Dataset it
+    returns are slices of that map rather than copies.
+
+    Args:
+        source (str | Path | bytes): The shard path, or its content.
+    """
+
+    def __init__(self, source: str | Path | bytes) -> None:
+        if isinstance(source, (str, Path)):
+            buffer = np.memmap(source, dtype=np.uint8, mode="r")
+        else:
+            buffer = np.frombuffer(source, dtype=np.uint8)
+        if bytes(buffer[:8]) != MAGIC:
+            raise ValueError("Not a unibox shard.")
+        (meta_len,) = struct.unpack("<Q", bytes(buffer[8:16]))
+        meta = json.loads(bytes(buffer[16 : 16 + meta_len]).decode("utf-8"))
+        base = 16 + meta_len + (-(16 + meta_len) % _ALIGN)
+
+        self.names = meta["names"]
+        self._columns = {}
+        for name, dtype, width in _SECTIONS:
+            start, size = meta["sections"][name]
+            dtype = np.dtype(meta["dtype"] if dtype is None else dtype)
+            col = buffer[base + start : base + start + size].view(dtype)
+            self._columns[name] = col.reshape(-1, width) if width > 1 else col
+        self._paths = None
+
+    def __len__(self) -> int:
+        return len(self._columns["img_shapes"])
+
+    @property
+    def paths(self) -> list:
+        if self._paths is None:
+            blob = bytes(self._columns["paths"])
+            index = self._columns["path_index"].tolist()
+            self._paths = [blob[a:b].decode("utf-8") for a, b in zip(index[:-1], index[1:])]
+        return self._paths
+
+    def index(self, img_path: str | Path) -> int:
+        return self.paths.index(str(img_path))
+
+    def fill(self, dset: Dataset, index: int):
+        """
+        Replace the content of `dset` with image `index` of the shard.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("shard index out of range")
+        cols = self._columns
+        start, end = cols["box_index"][index : index + 2].tolist()
+        img_wh = cols["img_shapes"][index]
+        info = None
+        a, b = cols["info_index"][index : index + 2].tolist()
+        if b > a:
+            blob = bytes(cols["infos"][a:b]).decode("utf-8")
+            info = {int(row): value for row, value in json.loads(blob).items()}
+
+        dset.clear()
+        dset.boxes = BoxArray.from_columns(
+            cols["boxes"][start:end],
+            cols["class_ids"][start:end],
+            self.names,
+            cols["is_pixel"][start:end].view(bool),
+            np.broadcast_to(img_wh, (end - start, 2)),
+            info,
+        )
+        if img_wh[0] >= 0:
+            dset["img_shape"] = img_wh.tolist()
+        if self.paths[index]:
+            dset.img_path = self.paths[index]
+
+    def __getitem__(self, index: int) -> Dataset:
+        dset = Dataset()
+        self.fill(dset, index)
+        return dset
+
+    def __iter__(self) -> Iterator[Dataset]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+@lru_cache(maxsize=16)
+def _open(path: str, size: int, mtime_ns: int) -> ShardReader:
+    return ShardReader(path)
+
+
+class Shard:
+    """
+    Binary shard holding the annotations of a whole corpus in one file.
+
+    Layout: the magic bytes, a JSON header (counts, class names, section
+    offsets) and 64-byte aligned sections: an (N, 4) box table, int32 class
+    ids, a pixel flag per box, a per-image box offset index, per-image
+    [w,h], and the image paths and sparse box info with their offsets.
+
+    As a registered format it reads or writes one image at a time:
+    `Dataset().load("shard", lb_path=path, index=i)` or `img_path=...`
+    memory-maps the shard, and `Dataset.dump("shard")` produces a one-image
+    shard. Use Shard.write and Shard.open for whole corpora.
+    """
+
+    suffix = ".ubs"
+
+    @staticmethod
+    def detect(head: bytes) -> bool:
+        return head.startswith(MAGIC)
+
+    @staticmethod
+    def _select(reader: ShardReader, dset: Dataset, index: int | None, img_path: str | Path | None):
+        if index is None:
+            img_path = img_path if img_path is not None else dset.img_path
+            index = 0 if img_path is None else reader.index(img_path)
+        reader.fill(dset, index)
+
+    @staticmethod
+    def import_file(dset: Dataset, lb_path: str | Path, index: int | None = None, img_path: str | Path | None = None, **kwargs):
+        Shard._select(Shard.open(lb_path), dset, index, img_path)
+
+    @staticmethod
+    def import_set(dset: Dataset, in_stream, index: int | None = None, img_path: str | Path | None = None, **kwargs):
+        Shard._select(ShardReader(in_stream.read()), dset, index, img_path)
+
+    @staticmethod
+    def export_set(dset: Dataset, dtype=np.float32, **kwargs):
+        out = BytesIO()
+        with ShardWriter(out, dtype) as writer:
+            writer.add(dset)
+        return out.getvalue()
+
+    @staticmethod
+    def open(path: str | Path) -> ShardReader:
+        """
+        Return a memory-mapped reader for a shard; readers are reused while
+        the file is unchanged.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        return _open(path, stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def write(path: str | Path, datasets: Iterable[Dataset], dtype=np.float32) -> int:
+        """
+        Pack datasets into a shard and return the number of images written.
+        """
+        with ShardWriter(path, dtype) as writer:
+            for dset in datasets:
+                writer.add(dset)
+            return len(writer)
@@ -1,82 +1,106 @@
 import numpy as np
-from unibox import Dataset, Bbox
-from typing import Dict
+from unibox import Dataset
+from typing import Dict, Iterator
 import xml.etree.ElementTree as ET
-import cv2
+from xml.sax.saxutils import escape
 import os
 
+from unibox.utils import get_img_shape
+
 
 class VOC:
-    @staticmethod
-    def import_set(dset: Dataset, in_stream, **kwargs):
-        dset.clear()
-        tree = ET.parse(in_stream)
-        root = tree.getroot()
-        size = root.find("size")
-        w = int(size.find("width").text)
-        h = int(size.find("height").text)
-        key = ["difficult", "pose", "truncated"]
-        for obj in root.iter("object"):
-            label = obj.find("name").text
-            info = {k: obj.find(k).text for k in key}
+    suffix = ".xml"
 
-            xmlbox = obj.find("bndbox")
-            bb = [float(xmlbox.find(x).text) for x in ("xmin", "ymin", "xmax", "ymax")]
-            box = Bbox(bb, "ltrb", True, label, [w, h], info)
-            dset.append(box)
+    INFO_KEYS = ("difficult", "pose", "truncated")
+    BNDBOX_KEYS = ("xmin", "ymin", "xmax", "ymax")
 
     @staticmethod
-    def export_set(dset: Dataset, mapping: Dict = None, **kwargs):
-
-        if dset["img_shape"] is None:
-            img_wh = dset.anno[0].img_wh()
-            if img_wh is None:
-                if dset.img_path is None:
-                    raise ValueError("Image shape is not defined.")
-                img = cv2.imdecode(np.fromfile(dset.img_path, np.uint8), 1)
-                dset["img_shape"] = [img.shape[1], img.shape[0]]
-                img_wh = dset["img_shape"]
-            else:
-                dset["img_shape"] = img_wh
+    def detect(head: bytes) -> bool:
+        return head.lstrip().startswith(b"<") and b"<annotation" in head
 
-        img_wh = dset["img_shape"]
+    @staticmethod
+    def import_set(dset: Dataset, in_stream, **kwargs):
+        """
+        Read a VOC annotation incrementally; every object is dropped from the
+        tree as soon as it has been read, so memory stays flat on huge files.
+        """
+        dset.clear()
+        w = h = None
+        boxes, labels, infos = [], [], {}
+        depth = 0
+        root = None
+        for event, elem in ET.iterparse(in_stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if elem.tag == "size" and w is None:
+                w = int(elem.find("width").text)
+                h = int(elem.find("height").text)
+            elif elem.tag == "object":
+                info = {}
+                label, bb = "0", None
+                for child in elem:
+                    if child.tag == "name":
+                        if child.text is not None:
+                            label = child.text
+                    elif child.tag == "bndbox":
+                        bb = [float(child.find(x).text) for x in VOC.BNDBOX_KEYS]
+                    elif child.tag in VOC.INFO_KEYS:
+                        info[child.tag] = child.text
+                if bb is None:
+                    raise ValueError("VOC object has no bndbox.")
+                boxes.append(bb)
+                labels.append(label)
+                infos[len(boxes) - 1] = info
+            if depth == 1:
+                root.clear()
 
-        xml_str = "<annotation>\n" + "<folder>VOC2007</folder>\n"
-        xml_str += f"<filename>{os.path.basename(dset.img_path)}</filename>\n"
-        xml_str += "<size>\n"
-        xml_str += f"<width>{img_wh[0]}</width>\n"
-        xml_str += f"<height>{img_wh[1]}</height>\n"
-        xml_str += "<depth>3</depth>\n"
-        xml_str += "</size>\n"
+        if w is None:
+            raise ValueError("VOC annotation has no size.")
+        dset.extend(np.array(boxes, dtype=np.float64).reshape(-1, 4), "ltrb", True, labels, [w, h], infos)
 
-        for bbox in dset.anno:
+    @staticmethod
+    def iter_export(dset: Dataset, mapping: Dict = None) -> Iterator[str]:
+        """Yields the VOC document of the dataset fragment by fragment."""
+        img_wh = get_img_shape(dset)
 
-            x1, y1, x2, y2 = bbox.ltrb(
-                is_pixel_distance=True, img_shape=img_wh
-            ).tolist()
-            xml_str += "<object>\n"
+        yield (
+            "<annotation>\n"
+            "<folder>VOC2007</folder>\n"
+            f"<filename>{escape(os.path.basename(dset.img_path))}</filename>\n"
+            "<size>\n"
+            f"<width>{img_wh[0]}</width>\n"
+            f"<height>{img_wh[1]}</height>\n"
+            "<depth>3</depth>\n"
+            "</size>\n"
+        )
 
-            label = bbox.label
-            if label is None:
-                label = "0"
-            if mapping is not None:
-                label = mapping[label]
+        boxes = dset.boxes
+        coords = np.rint(boxes.ltrb(True, img_wh)).astype(np.int64).tolist()
+        labels = boxes.mapped_labels(mapping).tolist()
 
-            truncated = bbox.info.get("truncated", 0)
-            difficult = bbox.info.get("difficult", 0)
-            pose = bbox.info.get("pose", "Unspecified")
-            xml_str += f"<name>{label}</name>\n"
-            xml_str += f"<pose>{pose}</pose>\n"
-            xml_str += f"<truncated>{truncated}</truncated>\n"
-            xml_str += f"<difficult>{difficult}</difficult>\n"
-            xml_str += "<bndbox>\n"
-            xml_str += f"<xmin>{int(round(x1))}</xmin>\n"
-            xml_str += f"<ymin>{int(round(y1))}</ymin>\n"
-            xml_str += f"<xmax>{int(round(x2))}</xmax>\n"
-            xml_str += f"<ymax>{int(round(y2))}</ymax>\n"
-            xml_str += "</bndbox>\n"
-            xml_str += "</object>\n"
+        for i, (x1, y1, x2, y2) in enumerate(coords):
+            info = boxes.info(i) or {}
+            yield (
+                "<object>\n"
+                f"<name>{escape(str(labels[i]))}</name>\n"
+                f"<pose>{escape(str(info.get('pose', 'Unspecified')))}</pose>\n"
+                f"<truncated>{escape(str(info.get('truncated', 0)))}</truncated>\n"
+                f"<difficult>{escape(str(info.get('difficult', 0)))}</difficult>\n"
+                "<bndbox>\n"
+                f"<xmin>{x1}</xmin>\n"
+                f"<ymin>{y1}</ymin>\n"
+                f"<xmax>{x2}</xmax>\n"
+                f"<ymax>{y2}</ymax>\n"
+                "</bndbox>\n"
+                "</object>\n"
+            )
 
-        xml_str += "</annotation>"
+        yield "</annotation>"
 
-        return xml_str
+    @staticmethod
+    def export_set(dset: Dataset, mapping: Dict = None, **kwargs):
+        return "".join(VOC.iter_export(dset, mapping))
@@ -1,62 +1,94 @@
-import cv2
 import numpy as np
-from unibox import Dataset, Bbox
+from unibox import Dataset
+from unibox.imagesize import get_image_size
+from unibox.utils import get_img_shape
 
 
 class Yolo:
+    suffix = ".txt"
+
+    @staticmethod
+    def detect(head: bytes) -> bool:
+        """
+        Whether `head` looks like the start of a YOLO file: numbers only, and
+        at least one line with 5 columns or more. Shorter lines are accepted
+        since import_set skips them; an empty file is YOLO. The last line may
+        be cut short, so it is left out when it does not parse.
+        """
+        *lines, last = head.split(b"\n")
+        try:
+            rows = [[float(x) for x in line.split()] for line in lines]
+        except ValueError:
+            return False
+        try:
+            rows.append([float(x) for x in last.split()])
+        except ValueError:
+            if not lines:
+                return False
+        rows = [row for row in rows if row]
+        return not rows or any(len(row) >= 5 for row in rows)
+
     @staticmethod
     def import_set(dset: Dataset, in_stream, norm2pixel=False, **kwargs):
         # Read the YOLO format dataset from the text file
         dset.clear()
-        for line in in_stream:
-            line = line.strip().split()
-            if len(line) < 5:
-                continue
-            line = list(map(float, line))
-            label = str(int(line[0]))
-            x, y, w, h = line[1:5]
-            info = {}
-            if len(line) > 5:
-                info["extra"] = line[5:]
-
-            img_shape = None
-            if norm2pixel:
-                img_shape = dset["img_shape"]  # w,h
-                if img_shape is None:
-                    img_path = dset["img_path"]
-                    img = cv2.imdecode(np.fromfile(img_path, np.uint8), 1)
-                    img_shape = [img.shape[1], img.shape[0]]
-
-            bbox = Bbox([x, y, w, h], "xywh", False, label, img_shape, info)
-            dset.append(bbox)
+        img_shape = None
+        if norm2pixel:
+            if dset.img_path is None:
+                raise ValueError("Image shape is not defined.")
+            img_shape = get_image_size(dset.img_path)  # w,h
+            dset["img_shape"] = img_shape
 
-    @staticmethod
-    def export_set(dset: Dataset, mapping: dict = None):
+        flat, widths = Yolo._parse(in_stream.read())
+        offsets = np.cumsum(widths) - widths
+        values = flat[offsets[:, None] + np.arange(5)]
+        labels = values[:, 0]
+        if not np.isfinite(labels).all():
+            int(labels[~np.isfinite(labels)][0])  # raises like int() does per line
 
-        shape = []
+        # every box gets its own info dict; the optional columns after x,y,w,h go to info["extra"]
+        infos = {i: {} for i in range(len(widths))}
+        for i in np.flatnonzero(widths > 5).tolist():
+            infos[i]["extra"] = flat[offsets[i] + 5 : offsets[i] + widths[i]].tolist()
 
-        if dset["img_shape"] is not None:
-            img_wh = dset.anno[0].img_wh()
-            if img_wh is None:
-                if dset.img_path is None:
-                    raise ValueError("Image shape is not defined.")
-                img = cv2.imdecode(np.fromfile(dset.img_path, np.uint8), 1)
-                dset["img_shape"] = [img.shape[1], img.shape[0]]
-                img_wh = dset["img_shape"]
-            else:
-                dset["img_shape"] = img_wh
+        dset.extend(
+            values[:, 1:5],
+            "xywh",
+            False,
+            labels.astype(np.int64),
+            img_shape,
+            infos,
+        )
+
+    @staticmethod
+    def _parse(text: str | bytes):
+        """
+        Split a YOLO label file into the values of all lines with at least
+        five columns, flattened, and the number of columns of each line.
+        """
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        rows = [row for row in map(str.split, text.splitlines()) if len(row) >= 5]
+        widths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+        flat = np.array([x for row in rows for x in row], dtype=np.float64)
+        return flat, widths
+
+    @staticmethod
+    def export_set(dset: Dataset, mapping: dict = None):
 
         img_wh = dset["img_shape"]
+        if dset.boxes.is_pixel.any():
+            # only pixel boxes need the image shape
+            img_wh = get_img_shape(dset)
 
-        for bbox in dset.anno:
-            x, y, w, h = bbox.xywh(is_pixel_distance=False, img_shape=img_wh).tolist()
-            l = bbox.label
-            if l is None:
-                l = "0"
-            elif mapping is not None:
-                l = mapping[l]
-            if not l.isdigit():
+        boxes = dset.boxes
+        # labels are checked and mapped once per class, then gathered per box
+        names = [None if name is None else str(name) for name in boxes.mapped_names(mapping)]
+        for name in names:
+            if name is not None and not name.isdigit():
                 raise ValueError("Label must be a number.")
-            shape.append(f"{l} {x} {y} {w} {h}")
+        lut = np.array(names, dtype=object)
+        labels = lut[boxes.class_ids].tolist() if len(names) else []
 
-        return "\n".join(shape)
+        coords = boxes.xywh(False, img_wh).tolist()
+        return "\n".join([f"{l} {x} {y} {w} {h}" for l, (x, y, w, h) in zip(labels, coords)])
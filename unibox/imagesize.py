@@ -0,0 +1,292 @@
+import atexit
+import os
+import sqlite3
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from unibox import profiling
+
+
+# JPEG start-of-frame markers: every SOFn except DHT (C4), JPG (C8) and DAC (CC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_HEAD_SIZE = 4096
+
+
+def _exif_orientation(data: bytes) -> int:
+    # data is the payload of an APP1 segment
+    if data[:6] != b"Exif\x00\x00":
+        return 1
+    tiff = data[6:]
+    if tiff[:2] == b"II":
+        order = "<"
+    elif tiff[:2] == b"MM":
+        order = ">"
+    else:
+        return 1
+    (ifd,) = struct.unpack_from(order + "I", tiff, 4)
+    (count,) = struct.unpack_from(order + "H", tiff, ifd)
+    for i in range(count):
+        entry = ifd + 2 + 12 * i
+        tag, _, _, value = struct.unpack_from(order + "HHIH", tiff, entry)
+        if tag == 0x0112:
+            return value
+    return 1
+
+
+def _jpeg_size(file) -> list | None:
+    orientation = 1
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) != 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:  # fill bytes
+            code = file.read(1)[0]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue
+        (length,) = struct.unpack(">H", file.read(2))
+        if code in _JPEG_SOF:
+            h, w = struct.unpack(">xHH", file.read(5))
+            # cv2.imdecode applies the EXIF orientation, so follow it
+            return [h, w] if orientation >= 5 else [w, h]
+        if code == 0xE1 and orientation == 1:
+            try:
+                orientation = _exif_orientation(file.read(length - 2))
+            except struct.error:
+                orientation = 1
+            continue
+        if code == 0xDA:  # start of scan without a frame header
+            return None
+        file.seek(length - 2, 1)
+
+
+def _read_size(file) -> list | None:
+    head = file.read(_HEAD_SIZE)
+    if head[:3] == b"\xff\xd8\xff":
+        return _jpeg_size(file)
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return list(struct.unpack(">II", head[16:24]))
+    if head[:2] == b"BM":
+        (header_size,) = struct.unpack_from("<I", head, 14)
+        if header_size == 12:
+            w, h = struct.unpack_from("<HH", head, 18)
+        else:
+            w, h = struct.unpack_from("<ii", head, 18)
+        return [w, abs(h)]
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        chunk = head[12:16]
+        if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+            w, h = struct.unpack_from("<HH", head, 26)
+            return [w & 0x3FFF, h & 0x3FFF]
+        if chunk == b"VP8L" and head[20] == 0x2F:
+            (bits,) = struct.unpack_from("<I", head, 21)
+            return [(bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1]
+        if chunk == b"VP8X":
+            w = int.from_bytes(head[24:27], "little") + 1
+            h = int.from_bytes(head[27:30], "little") + 1
+            return [w, h]
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return list(struct.unpack_from("<HH", head, 6))
+    return None
+
+
+def imread_shape(img_path: str | Path) -> list:
+    """
+    Decode the image with cv2 and return its [w,h].
+    """
+    import cv2  # only needed here, and slow to import
+
+    img = cv2.imdecode(np.fromfile(img_path, np.uint8), 1)
+    if img is None:
+        raise ValueError(f"Cannot decode image {img_path}.")
+    return [img.shape[1], img.shape[0]]
+
+
+class ShapeCache:
+    """
+    ShapeCache remembers image shapes on disk so that repeated conversions of
+    the same corpus do not need to open the images again.
+
+    Shapes are stored in a SQLite file keyed by absolute path, together with
+    the size and mtime of the image; an entry is only used while both still
+    match. An in-process LRU sits in front of the database.
+
+    Args:
+        path (str | Path): The SQLite file, created if it does not exist.
+        maxsize (int, optional): The number of entries kept in memory. Defaults to 65536.
+        commit_every (int, optional): The number of new entries buffered before a commit. Defaults to 1024.
+
+    Usage:
+        set_shape_cache("~/.cache/unibox/shapes.sqlite")
+        get_image_size("bus.jpg")  # probes the header once, then hits the cache
+    """
+
+    def __init__(self, path: str | Path, maxsize: int = 65536, commit_every: int = 1024) -> None:
+        self.path = os.path.abspath(os.path.expanduser(str(path)))
+        self.maxsize = maxsize
+        self.commit_every = commit_every
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._pending = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # a connection must not cross a fork, reopen it in child processes
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS shapes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, w INTEGER, h INTEGER)"
+            )
+            self._pid = os.getpid()
+            self._pending = 0
+        return self._conn
+
+    def _remember(self, key: str, entry: tuple):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, img_path: str | Path, stat: os.stat_result | None = None) -> list | None:
+        """
+        Return the cached [w,h] of an image, or None if it is unknown or the
+        image changed since it was cached.
+        """
+        key = os.path.abspath(img_path)
+        stat = os.stat(key) if stat is None else stat
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                entry = self._connect().execute(
+                    "SELECT size, mtime, w, h FROM shapes WHERE path = ?", (key,)
+                ).fetchone()
+                if entry is None:
+                    return None
+            if entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+                self._lru.pop(key, None)
+                return None
+            self._remember(key, entry)
+            return [entry[2], entry[3]]
+
+    def put(self, img_path: str | Path, img_wh: list, stat: os.stat_result | None = None):
+        key = os.path.abspath(img_path)
+        stat = os.stat(key) if stat is None else stat
+        entry = (stat.st_size, stat.st_mtime_ns, int(img_wh[0]), int(img_wh[1]))
+        with self._lock:
+            self._remember(key, entry)
+            self._connect().execute(
+                "INSERT OR REPLACE INTO shapes VALUES (?, ?, ?, ?, ?)", (key,) + entry
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def lookup(self, img_path: str | Path) -> list:
+        """
+        Return the [w,h] of an image from the cache, probing and caching it
+        on a miss.
+        """
+        stat = os.stat(img_path)
+        img_wh = self.get(img_path, stat)
+        if img_wh is None:
+            img_wh = _probe_image_size(img_path)
+            self.put(img_path, img_wh, stat)
+        return img_wh
+
+    def flush(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_shape_cache: ShapeCache | None = None
+
+
+def set_shape_cache(path: str | Path | None, **kwargs) -> ShapeCache | None:
+    """
+    Enable the persistent shape cache used by get_image_size, or disable it
+    with None. The UNIBOX_SHAPE_CACHE environment variable enables it too,
+    which also reaches worker processes.
+    """
+    global _shape_cache
+    if _shape_cache is not None:
+        _shape_cache.close()
+    _shape_cache = None if path is None else ShapeCache(path, **kwargs)
+    return _shape_cache
+
+
+def get_shape_cache() -> ShapeCache | None:
+    return _shape_cache
+
+
+def flush_shape_cache():
+    """
+    Commit the shapes cached so far. Worker processes call this at the end
+    of every chunk, since they exit without running atexit handlers.
+    """
+    if _shape_cache is not None:
+        _shape_cache.flush()
+
+
+@atexit.register
+def _close_shape_cache():
+    if _shape_cache is not None:
+        _shape_cache.close()
+
+
+if os.environ.get("UNIBOX_SHAPE_CACHE"):
+    set_shape_cache(os.environ["UNIBOX_SHAPE_CACHE"])
+
+
+def get_image_size(img_path: str | Path) -> list:
+    """
+    Return the [w,h] of an image by reading only its header.
+
+    JPEG, PNG, BMP, WebP and GIF headers are parsed directly, which needs a
+    few small reads instead of decoding the whole image. Any other file, or a
+    header that cannot be parsed, falls back to decoding the image with cv2.
+    When a shape cache is enabled (see set_shape_cache) it is consulted first.
+
+    Args:
+        img_path (str | Path): The path to the image.
+
+    Returns:
+        list: The [w,h] of the image.
+    """
+    started = profiling.start()
+    if _shape_cache is not None:
+        size = _shape_cache.lookup(img_path)
+    else:
+        size = _probe_image_size(img_path)
+    profiling.stop(started, "image_size")
+    return size
+
+
+def _probe_image_size(img_path: str | Path) -> list:
+    with open(img_path, "rb") as file:
+        try:
+            size = _read_size(file)
+        except (struct.error, IndexError):
+            size = None
+    if size is None:
+        size = imread_shape(img_path)
+    return size
@@ -0,0 +1,221 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from unibox.collection import DatasetCollection
+from unibox.dataset import Dataset
+from unibox.imagesize import flush_shape_cache
+
+
+def _scan_chunk(paths: List[str], format: str, load_kwargs: dict) -> list:
+    rows = []
+    for lb_path in paths:
+        try:
+            stat = os.stat(lb_path)
+            boxes = Dataset().load(format, lb_path=lb_path, **load_kwargs).boxes
+            counts = np.bincount(boxes.class_ids, minlength=len(boxes.names))
+            row = {name: int(n) for name, n in zip(boxes.names, counts.tolist()) if n}
+            rows.append((lb_path, stat.st_size, stat.st_mtime_ns, row, None))
+        except Exception as err:
+            rows.append((lb_path, -1, -1, {}, f"{type(err).__name__}: {err}"))
+    flush_shape_cache()
+    return rows
+
+
+def _scan(paths: List[str], format: str, load_kwargs: dict, jobs: int, chunksize: int = 256) -> list:
+    chunks = [paths[i : i + chunksize] for i in range(0, len(paths), chunksize)]
+    if jobs == 1 or len(chunks) <= 1:
+        return [row for chunk in chunks for row in _scan_chunk(chunk, format, load_kwargs)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_scan_chunk, chunk, format, load_kwargs) for chunk in chunks]
+        return [row for future in futures for row in future.result()]
+
+
+class ClassIndex:
+    """
+    ClassIndex answers class and box-count queries over a corpus without
+    parsing label files again.
+
+    It keeps, per label file, its size and mtime, the number of boxes and
+    the number of boxes of every class (as CSR arrays), plus a posting list
+    from every class to the images containing it. update() only rescans the
+    files that changed.
+
+    Usage:
+        index = ClassIndex.build("labels", "yolo", jobs=8)
+        index.save("labels.idx.npz")
+        ids = index.images_with("7")
+        crowded = index.paths_of(index.images_with_more_than(50))
+    """
+
+    def __init__(self, source, format: str, **load_kwargs) -> None:
+        self.source = source
+        self.format = format
+        self.load_kwargs = load_kwargs
+        self.names: list = []
+        self.paths: list = []
+        self.errors: List[Tuple[str, str]] = []
+        self._sizes = np.zeros(0, np.int64)
+        self._mtimes = np.zeros(0, np.int64)
+        self.box_counts = np.zeros(0, np.int64)
+        self._img_ptr = np.zeros(1, np.int64)
+        self._img_cls = np.zeros(0, np.int32)
+        self._img_num = np.zeros(0, np.int64)
+        self._post_ptr = np.zeros(1, np.int64)
+        self._post_img = np.zeros(0, np.int64)
+        self._post_num = np.zeros(0, np.int64)
+
+    @classmethod
+    def build(cls, source: str | Path | Iterable, format: str, jobs: int = 1, **load_kwargs) -> "ClassIndex":
+        """
+        Scan a corpus once, see DatasetCollection for the accepted sources.
+        """
+        index = cls(source, format, **load_kwargs)
+        index.update(jobs)
+        return index
+
+    def _label_paths(self) -> List[str]:
+        return [lb_path for lb_path, _ in DatasetCollection(self.source, self.format).pairs()]
+
+    def update(self, jobs: int = 1) -> int:
+        """
+        Bring the index up to date with the corpus: rescan new and modified
+        label files and drop deleted ones. Returns the number of rescanned files.
+        """
+        known = {path: i for i, path in enumerate(self.paths)}
+        rows, todo = [], []
+        for lb_path in self._label_paths():
+            i = known.get(lb_path)
+            if i is not None:
+                try:
+                    stat = os.stat(lb_path)
+                except OSError:
+                    continue
+                if stat.st_size == self._sizes[i] and stat.st_mtime_ns == self._mtimes[i]:
+                    rows.append((lb_path, int(self._sizes[i]), int(self._mtimes[i]), self._row(i), None))
+                    continue
+            rows.append(None)
+            todo.append(lb_path)
+
+        scanned = iter(_scan(todo, self.format, self.load_kwargs, jobs or os.cpu_count() or 1))
+        rows = [row if row is not None else next(scanned) for row in rows]
+        self.errors = [(row[0], row[4]) for row in rows if row[4] is not None]
+        self._set_rows([row for row in rows if row[4] is None])
+        return len(todo)
+
+    def _row(self, i: int) -> dict:
+        a, b = self._img_ptr[i], self._img_ptr[i + 1]
+        names = self.names
+        return {names[c]: n for c, n in zip(self._img_cls[a:b].tolist(), self._img_num[a:b].tolist())}
+
+    def _set_rows(self, rows: list):
+        names = sorted({name for row in rows for name in row[3]})
+        ids = {name: i for i, name in enumerate(names)}
+        self.names = names
+        self.paths = [row[0] for row in rows]
+        self._sizes = np.array([row[1] for row in rows], dtype=np.int64)
+        self._mtimes = np.array([row[2] for row in rows], dtype=np.int64)
+
+        lengths = np.array([len(row[3]) for row in rows], dtype=np.int64)
+        self._img_ptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._img_cls = np.array([ids[name] for row in rows for name in row[3]], dtype=np.int32)
+        self._img_num = np.array([n for row in rows for n in row[3].values()], dtype=np.int64)
+        self._build_postings()
+
+    def _build_postings(self):
+        img_ids = np.repeat(np.arange(len(self.paths), dtype=np.int64), np.diff(self._img_ptr))
+        self.box_counts = np.bincount(img_ids, weights=self._img_num, minlength=len(self.paths)).astype(np.int64)
+        order = np.argsort(self._img_cls, kind="stable")
+        self._post_img = img_ids[order]
+        self._post_num = self._img_num[order]
+        per_class = np.bincount(self._img_cls, minlength=len(self.names))
+        self._post_ptr = np.concatenate([[0], np.cumsum(per_class)]).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def images_with(self, label: str | int, min_count: int = 1) -> np.ndarray:
+        """
+        Return the ids of the images with at least `min_count` boxes of a class.
+        """
+        label = str(label)
+        if label not in self.names:
+            return np.zeros(0, np.int64)
+        c = self.names.index(label)
+        a, b = self._post_ptr[c], self._post_ptr[c + 1]
+        ids, num = self._post_img[a:b], self._post_num[a:b]
+        return ids if min_count <= 1 else ids[num >= min_count]
+
+    def images_with_more_than(self, n: int) -> np.ndarray:
+        """
+        Return the ids of the images with more than `n` boxes.
+        """
+        return np.flatnonzero(self.box_counts > n)
+
+    def class_counts(self) -> dict:
+        """
+        Return the number of boxes of every class over the whole corpus.
+        """
+        totals = np.bincount(self._img_cls, weights=self._img_num, minlength=len(self.names))
+        return dict(zip(self.names, totals.astype(np.int64).tolist()))
+
+    def sample(self, k: int, label: str | int | None = None, seed: int | None = None) -> np.ndarray:
+        """
+        Draw `k` distinct image ids, among the images containing `label` if given.
+        """
+        ids = np.arange(len(self)) if label is None else self.images_with(label)
+        rng = np.random.default_rng(seed)
+        return rng.choice(ids, size=min(k, len(ids)), replace=False)
+
+    def paths_of(self, ids: Iterable[int]) -> List[str]:
+        return [self.paths[i] for i in ids]
+
+    def save(self, path: str | Path):
+        """
+        Write the index to `path`, as is: np.savez would append ".npz" to a path without it.
+        """
+        paths = [p.encode("utf-8") for p in self.paths]
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                format=np.array(self.format),
+                source=np.array(str(self.source) if isinstance(self.source, (str, Path)) else ""),
+                names=np.array(self.names, dtype=str),
+                path_blob=np.frombuffer(b"".join(paths), dtype=np.uint8),
+                path_len=np.array([len(p) for p in paths], dtype=np.int64),
+                sizes=self._sizes,
+                mtimes=self._mtimes,
+                img_ptr=self._img_ptr,
+                img_cls=self._img_cls,
+                img_num=self._img_num,
+                box_counts=self.box_counts,
+                post_ptr=self._post_ptr,
+                post_img=self._post_img,
+                post_num=self._post_num,
+            )
+
+    @classmethod
+    def load(cls, path: str | Path, source: str | Path | Iterable | None = None, **load_kwargs) -> "ClassIndex":
+        """
+        Load a saved index. `source` defaults to the directory or pattern the
+        index was built from and is only needed by update().
+        """
+        with np.load(path) as data:
+            index = cls(source or str(data["source"]) or None, str(data["format"]), **load_kwargs)
+            index.names = data["names"].tolist()
+            blob = data["path_blob"].tobytes()
+            ends = np.cumsum(data["path_len"]).tolist()
+            index.paths = [blob[a:b].decode("utf-8") for a, b in zip([0] + ends[:-1], ends)]
+            index._sizes = data["sizes"]
+            index._mtimes = data["mtimes"]
+            index._img_ptr = data["img_ptr"]
+            index._img_cls = data["img_cls"]
+            index._img_num = data["img_num"]
+            index.box_counts = data["box_counts"]
+            index._post_ptr = data["post_ptr"]
+            index._post_img = data["post_img"]
+            index._post_num = data["post_num"]
+        return index
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Tuple
+
+
+def file_signature(path: str | Path) -> Tuple[int, int, str]:
+    """
+    Return the (size, mtime_ns, content hash) of a file.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as file:
+        digest = hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+    return stat.st_size, stat.st_mtime_ns, digest
+
+
+def image_stamp(img_path: str | Path | None) -> list | None:
+    """
+    Return the [absolute path, size, mtime_ns] of an image, or None if there
+    is no image file.
+    """
+    if img_path is None:
+        return None
+    try:
+        stat = os.stat(img_path)
+    except OSError:
+        return None
+    return [os.path.abspath(img_path), stat.st_size, stat.st_mtime_ns]
+
+
+def settings_key(*settings) -> str:
+    """
+    Fingerprint the settings of a conversion run, e.g. formats and mapping.
+    """
+    blob = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Manifest:
+    """
+    Manifest remembers which source file every output was converted from,
+    with the size, mtime and content hash of the source at that time, so
+    that a later run only converts what changed.
+
+    A source is unchanged if its size and mtime are, or otherwise if its
+    content hash is (e.g. after a checkout that only touched it). The image
+    of a conversion, whose size e.g. VOC needs, is recorded by its path,
+    size and mtime, and the output is stale once the image changes. Entries
+    are discarded when the settings fingerprint of the run differs from the
+    one the manifest was written with.
+
+    Args:
+        path (str | Path): The manifest file, JSON; it need not exist yet.
+        settings (str | None, optional): The fingerprint of the run, see settings_key. Defaults to None.
+
+    Usage:
+        with Manifest("labels.manifest.json") as manifest:
+            for lb_path, img_path, outfile in todo:
+                if manifest.is_current(lb_path, outfile, img_path):
+                    continue
+                Dataset(img_path).load("yolo", lb_path=lb_path).save(outfile, "voc", manifest=manifest)
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str | Path, settings: str | None = None) -> None:
+        self.path = str(path)
+        self.settings = settings
+        self.entries: dict = {}
+        if os.path.isfile(self.path):
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == self.VERSION and data.get("settings") == settings:
+                self.entries = data["entries"]
+        self._dirty = False
+
+    @staticmethod
+    def _key(outfile: str | Path) -> str:
+        return os.path.abspath(outfile)
+
+    def is_current(self, src: str | Path, outfile: str | Path, img_path: str | Path | None = None) -> bool:
+        """
+        Whether `outfile` exists and was converted from `src` as it is now,
+        and from `img_path` if given, as it is now.
+        """
+        entry = self.entries.get(self._key(outfile))
+        if entry is None or entry["src"] != os.path.abspath(src) or not os.path.isfile(outfile):
+            return False
+        image = entry.get("image")
+        if img_path is not None and (image is None or image[0] != os.path.abspath(img_path)):
+            return False
+        if image is not None and image_stamp(image[0]) != image:
+            return False
+        try:
+            stat = os.stat(src)
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        size, mtime_ns, digest = file_signature(src)
+        if digest != entry["hash"]:
+            return False
+        entry["mtime_ns"] = mtime_ns  # touched, not modified
+        self._dirty = True
+        return True
+
+    def record(self, src: str | Path, outfile: str | Path, signature: Tuple[int, int, str] | None = None, image: list | None = None):
+        """
+        Record that `outfile` was converted from `src`. `signature` is the
+        file_signature of `src` if already known, taken before it was read,
+        and `image` the image_stamp of the image read along with it.
+        """
+        size, mtime_ns, digest = signature or file_signature(src)
+        self.entries[self._key(outfile)] = {
+            "src": os.path.abspath(src),
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "hash": digest,
+            "image": image,
+        }
+        self._dirty = True
+
+    def discard(self, outfile: str | Path):
+        """
+        Forget `outfile`, so that it is converted again next time.
+        """
+        if self.entries.pop(self._key(outfile), None) is not None:
+            self._dirty = True
+
+    def prune(self, outfiles: Iterable[str | Path]):
+        """
+        Forget every output that is not in `outfiles`.
+        """
+        keep = {self._key(outfile) for outfile in outfiles}
+        for key in [key for key in self.entries if key not in keep]:
+            del self.entries[key]
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty and os.path.isfile(self.path):
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump({"version": self.VERSION, "settings": self.settings, "entries": self.entries}, file)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "Manifest":
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
@@ -0,0 +1,291 @@
+import numpy as np
+
+from unibox.bbox import Bbox
+
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    boxes = np.asarray(boxes, dtype=np.float64)
+    return (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
+
+
+def _inter_union(a: np.ndarray, b: np.ndarray):
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = np.clip(rb - lt, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    union = box_area(a)[:, None] + box_area(b)[None, :] - inter
+    return inter, union
+
+
+def _divide(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.divide(x, y, out=np.zeros_like(x), where=y > 0)
+
+
+def box_iou(a: np.ndarray, b: np.ndarray, block_size: int = 4096) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of "ltrb" boxes.
+
+    Args:
+        a (np.ndarray): (N, 4) boxes.
+        b (np.ndarray): (M, 4) boxes.
+        block_size (int, optional): Rows of `a` processed at once, which bounds the temporaries to block_size x M. Defaults to 4096.
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix.
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    out = np.empty((len(a), len(b)), dtype=np.float64)
+    for start in range(0, len(a), block_size):
+        inter, union = _inter_union(a[start : start + block_size], b)
+        out[start : start + block_size] = _divide(inter, union)
+    return out
+
+
+def box_giou(a: np.ndarray, b: np.ndarray, block_size: int = 4096) -> np.ndarray:
+    """
+    Pairwise generalized IoU between two sets of "ltrb" boxes, in [-1, 1].
+    See box_iou for the arguments.
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    out = np.empty((len(a), len(b)), dtype=np.float64)
+    for start in range(0, len(a), block_size):
+        block = a[start : start + block_size]
+        inter, union = _inter_union(block, b)
+        lt = np.minimum(block[:, None, :2], b[None, :, :2])
+        rb = np.maximum(block[:, None, 2:], b[None, :, 2:])
+        hull = np.prod(rb - lt, axis=-1)
+        out[start : start + block_size] = _divide(inter, union) - _divide(hull - union, hull)
+    return out
+
+
+def _hits(a: np.ndarray, b: np.ndarray, iou_threshold: float, ca=None, cb=None) -> np.ndarray:
+    inter, union = _inter_union(a, b)
+    hit = _divide(inter, union) > iou_threshold
+    if ca is not None:
+        hit &= ca[:, None] == cb[None, :]
+    return hit
+
+
+def _window(lefts: np.ndarray, block: np.ndarray, max_width: float, iou_threshold: float):
+    # the range of boxes, sorted by left edge, that can intersect the block
+    if iou_threshold < 0:
+        return 0, len(lefts)
+    lo = int(np.searchsorted(lefts, block[:, 0].min() - max_width, "left"))
+    hi = int(np.searchsorted(lefts, block[:, 2].max(), "right"))
+    return lo, hi
+
+
+def overlapping_pairs(
+    boxes: np.ndarray,
+    iou_threshold: float,
+    classes: np.ndarray | None = None,
+    block_size: int = 512,
+) -> np.ndarray:
+    """
+    Find all pairs (i, j), i < j, of boxes whose IoU exceeds a threshold,
+    optionally only between boxes of the same class.
+
+    Boxes are swept in order of their left edge, block by block, and every
+    block is only compared with the boxes that start before its right-most
+    edge, in slices of `block_size`, so the temporaries stay within
+    block_size x block_size and sparse scenes cost far less than N x N.
+    The result itself holds every pair; nms and duplicates do not build it.
+
+    Returns:
+        np.ndarray: (K, 2) pairs sorted by i, then j.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    n = len(boxes)
+    perm = np.argsort(boxes[:, 0], kind="stable")
+    swept = boxes[perm]
+    lefts = swept[:, 0]
+    if classes is not None:
+        classes = np.asarray(classes)[perm]
+
+    pairs = []
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = swept[start:stop]
+        # a box starting at or after the right edge cannot intersect the block
+        end = max(_window(lefts, block, 0, iou_threshold)[1], stop)
+        for a in range(start, end, block_size):
+            b = min(a + block_size, end)
+            cls = None if classes is None else classes[start:stop]
+            hit = _hits(block, swept[a:b], iou_threshold, cls, None if classes is None else classes[a:b])
+            hit &= np.arange(a, b)[None, :] > np.arange(start, stop)[:, None]
+            i, j = np.nonzero(hit)
+            pairs.append(np.sort(np.stack([perm[i + start], perm[j + a]], axis=1), axis=1))
+
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.concatenate(pairs).astype(np.int64)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+_GROUP = 32
+
+
+def _greedy(boxes: np.ndarray, iou_threshold: float, classes: np.ndarray | None, block_size: int) -> np.ndarray:
+    """
+    Keep box i unless an earlier kept box overlaps it by more than the
+    threshold. Boxes are decided block by block in order: a block is first
+    compared with the kept boxes of earlier blocks that can reach it, then
+    resolved within itself, so no list of pairs is ever built and memory
+    stays within block_size x block_size temporaries plus O(N).
+    """
+    n = len(boxes)
+    keep = np.zeros(n, dtype=bool)
+    kept = np.zeros(0, dtype=np.int64)  # kept so far, by left edge
+    max_width = 0.0
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = boxes[start:stop]
+        cls = None if classes is None else classes[start:stop]
+        suppressed = np.zeros(stop - start, dtype=bool)
+
+        # a block in priority order is spread over the image: compare it in
+        # narrow groups along x, so that each only meets the kept boxes nearby
+        lefts = boxes[kept, 0]
+        rows = np.argsort(block[:, 0], kind="stable")
+        for g in range(0, len(rows) if len(kept) else 0, _GROUP):
+            group = rows[g : g + _GROUP]
+            lo, hi = _window(lefts, block[group], max_width, iou_threshold)
+            for a in range(lo, hi, block_size):
+                other = kept[a : min(a + block_size, hi)]
+                hit = _hits(
+                    block[group],
+                    boxes[other],
+                    iou_threshold,
+                    None if cls is None else cls[group],
+                    None if classes is None else classes[other],
+                )
+                suppressed[group] |= hit.any(axis=1)
+
+        hit = np.triu(_hits(block, block, iou_threshold, cls, cls), 1)  # only later boxes
+        for r in np.flatnonzero(hit.any(axis=1)).tolist():
+            if not suppressed[r]:
+                suppressed |= hit[r]
+
+        new = np.flatnonzero(~suppressed) + start
+        keep[new] = True
+        if len(new):
+            max_width = max(max_width, float((boxes[new, 2] - boxes[new, 0]).max()))
+            kept = np.concatenate([kept, new])
+            kept = kept[np.argsort(boxes[kept, 0], kind="stable")]
+    return keep
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float = 0.5,
+    classes: np.ndarray | None = None,
+    block_size: int = 512,
+) -> np.ndarray:
+    """
+    Non-maximum suppression over "ltrb" boxes.
+
+    Args:
+        boxes (np.ndarray): (N, 4) boxes.
+        scores (np.ndarray): (N,) scores, higher is better.
+        iou_threshold (float, optional): Boxes overlapping a better box by more than this are dropped. Defaults to 0.5.
+        classes (np.ndarray | None, optional): (N,) class ids; if given boxes only suppress boxes of the same class. Defaults to None.
+        block_size (int, optional): Boxes decided at once, which bounds the temporaries to block_size x block_size. Defaults to 512.
+
+    Returns:
+        np.ndarray: The indices of the kept boxes, by decreasing score.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    if classes is not None:
+        classes = np.asarray(classes)[order]
+    return order[_greedy(boxes[order], iou_threshold, classes, block_size)]
+
+
+def duplicates(
+    boxes: np.ndarray,
+    iou_threshold: float,
+    classes: np.ndarray | None = None,
+    block_size: int = 512,
+) -> np.ndarray:
+    """
+    Return a mask of the boxes that overlap an earlier, kept box by more than
+    `iou_threshold`, i.e. NMS with the box order as priority.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if classes is not None:
+        classes = np.asarray(classes)
+    return ~_greedy(boxes, iou_threshold, classes, block_size)
+
+
+def _origins(size: int, tile: int, stride: int) -> np.ndarray:
+    # tile starts along one axis; the last tile ends at the image border
+    if size <= tile:
+        return np.zeros(1, dtype=np.int64)
+    starts = np.arange(0, size - tile, stride, dtype=np.int64)
+    return np.append(starts, size - tile)
+
+
+def tile_boxes(
+    boxes: np.ndarray,
+    img_shape: list | np.ndarray,
+    tile_wh: list | np.ndarray,
+    overlap: int | float = 0,
+    min_visible_ratio: float = 0.5,
+) -> tuple:
+    """
+    Cut an image into overlapping tiles and clip pixel "ltrb" boxes to every
+    tile they overlap.
+
+    Tiles are laid out row by row; the last row and column are moved back to
+    end at the image border, and tiles are cut to the image if it is smaller.
+    A box is kept in a tile if the visible part is at least
+    `min_visible_ratio` of its area; boxes without area are dropped.
+
+    Args:
+        boxes (np.ndarray): (N, 4) pixel boxes.
+        img_shape (list | np.ndarray): The [w,h] of the image.
+        tile_wh (list | np.ndarray): The [w,h] of a tile, or one int for square tiles.
+        overlap (int | float, optional): The overlap of neighbouring tiles in pixels, or as a fraction of the tile if below 1. Defaults to 0.
+        min_visible_ratio (float, optional): Defaults to 0.5.
+
+    Returns:
+        tuple: The (T, 4) tile windows, and for every kept (tile, box) pair
+        the tile index, the box index and the clipped box in pixels of the tile.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    img_wh = np.asarray(img_shape, dtype=np.int64).reshape(2)
+    tile = np.broadcast_to(np.asarray(tile_wh, dtype=np.int64), (2,))
+    tile = np.minimum(tile, img_wh)
+    overlap = np.broadcast_to(np.asarray(overlap), (2,))
+    overlap = np.where(overlap < 1, np.round(overlap * tile), overlap).astype(np.int64)
+    stride = tile - overlap
+    if (stride <= 0).any():
+        raise ValueError("overlap must be smaller than the tile.")
+
+    xs = _origins(img_wh[0], tile[0], stride[0])
+    ys = _origins(img_wh[1], tile[1], stride[1])
+    gx, gy = np.meshgrid(xs, ys)
+    windows = np.stack([gx.ravel(), gy.ravel(), gx.ravel() + tile[0], gy.ravel() + tile[1]], axis=1)
+
+    # the range of tile columns and rows every box overlaps, then all pairs
+    x0 = np.searchsorted(xs + tile[0], boxes[:, 0], "right")
+    x1 = np.searchsorted(xs, boxes[:, 2], "left") - 1
+    y0 = np.searchsorted(ys + tile[1], boxes[:, 1], "right")
+    y1 = np.searchsorted(ys, boxes[:, 3], "left") - 1
+    nx = np.maximum(x1 - x0 + 1, 0)
+    counts = nx * np.maximum(y1 - y0 + 1, 0)
+    box_ids = np.repeat(np.arange(len(boxes)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    width = np.repeat(nx, counts)
+    tile_ids = (np.repeat(y0, counts) + k // np.maximum(width, 1)) * len(xs) + np.repeat(x0, counts) + k % np.maximum(width, 1)
+
+    origin = np.tile(windows[tile_ids, :2], 2)
+    clipped = Bbox.clip(boxes[box_ids] - origin, tile)
+    area = box_area(boxes)[box_ids]
+    visible = box_area(clipped)
+    keep = (visible > 0) & (visible >= min_visible_ratio * area)
+    order = np.argsort(tile_ids[keep], kind="stable")
+    return windows, tile_ids[keep][order], box_ids[keep][order], clipped[keep][order]
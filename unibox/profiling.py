@@ -0,0 +1,136 @@
+"""
+Opt-in timing and counters for the load/dump pipeline.
+
+Stages record their wall time, number of calls, bytes read or written and
+boxes processed into a global Stats object. When profiling is disabled,
+which is the default, every hook is a single check of a module global.
+
+Stages:
+    read, write: label file I/O in Dataset.load and Dataset.save.
+    import.<format>, export.<format>: the format's import_set/import_file and export_set.
+    validate: box validation in Dataset.extend.
+    image_size: image shape probes (headers, cv2 or the shape cache).
+
+Usage:
+    from unibox import profiling
+
+    with profiling.profile() as stats:
+        convert_tree("labels", "yolo", "annotations", "voc", jobs=1)
+    print(stats.report())
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+_enabled = False
+_callback = None
+
+
+class Stats:
+    """
+    Per-stage totals: calls, seconds, bytes and boxes.
+    """
+
+    FIELDS = ("calls", "seconds", "bytes", "boxes")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stages: Dict[str, list] = {}
+
+    def add(self, stage: str, seconds: float, nbytes: int = 0, boxes: int = 0):
+        with self._lock:
+            row = self.stages.get(stage)
+            if row is None:
+                row = self.stages[stage] = [0, 0.0, 0, 0]
+            row[0] += 1
+            row[1] += seconds
+            row[2] += nbytes
+            row[3] += boxes
+
+    def merge(self, other: "Stats | dict"):
+        """
+        Add the totals of another Stats or of its as_dict(), e.g. from a worker process.
+        """
+        stages = other.as_dict() if isinstance(other, Stats) else other
+        with self._lock:
+            for stage, values in stages.items():
+                row = self.stages.setdefault(stage, [0, 0.0, 0, 0])
+                for i, field in enumerate(self.FIELDS):
+                    row[i] += values[field]
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+
+    def as_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {stage: dict(zip(self.FIELDS, row)) for stage, row in self.stages.items()}
+
+    def report(self) -> str:
+        lines = [f"{'stage':20s} {'calls':>8s} {'seconds':>10s} {'MiB':>10s} {'boxes':>10s}"]
+        for stage, row in sorted(self.as_dict().items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(
+                f"{stage:20s} {row['calls']:8d} {row['seconds']:10.4f} {row['bytes'] / 2**20:10.2f} {row['boxes']:10d}"
+            )
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"Stats({self.as_dict()})"
+
+
+stats = Stats()
+
+
+def enable(callback: Callable[[str, float, int, int], None] | None = None):
+    """
+    Start recording into `stats`. `callback(stage, seconds, nbytes, boxes)`
+    is also called after every stage if given.
+    """
+    global _enabled, _callback
+    _enabled = True
+    _callback = callback
+
+
+def disable():
+    global _enabled, _callback
+    _enabled = False
+    _callback = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def profile(callback: Callable[[str, float, int, int], None] | None = None, reset: bool = True) -> Iterator[Stats]:
+    """
+    Record within a with block, then restore the previous state.
+    """
+    previous = _enabled, _callback
+    if reset:
+        stats.reset()
+    enable(callback)
+    try:
+        yield stats
+    finally:
+        if previous[0]:
+            enable(previous[1])
+        else:
+            disable()
+
+
+def start() -> float | None:
+    """
+    Return a start time to pass to stop(), or None when disabled.
+    """
+    return time.perf_counter() if _enabled else None
+
+
+def stop(started: float | None, stage: str, nbytes: int = 0, boxes: int = 0):
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    stats.add(stage, seconds, nbytes, boxes)
+    if _callback is not None:
+        _callback(stage, seconds, nbytes, boxes)
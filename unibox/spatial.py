@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class GridIndex:
+    """
+    GridIndex is a uniform grid over a set of "ltrb" boxes for window and
+    point queries.
+
+    Every box is registered in the grid cells it overlaps, stored as a CSR
+    table (cell -> box ids) so that the cells of one grid row are contiguous.
+    A query only looks at the boxes of the cells under the window, plus the
+    few boxes too large to register cell by cell, and then tests those
+    exactly. Intersection is inclusive: boxes touching the window match.
+
+    Args:
+        boxes (np.ndarray): (N, 4) "ltrb" coordinates.
+        cell_size (float | None, optional): The cell width and height, chosen from the box sizes if None. Defaults to None.
+        max_cells (int, optional): Boxes covering more cells than this are always tested instead. Defaults to 64.
+
+    Usage:
+        index = GridIndex(dset.boxes.boxes)
+        hits = index.query([0, 0, 512, 512])
+    """
+
+    def __init__(self, boxes: np.ndarray, cell_size: float | None = None, max_cells: int = 64) -> None:
+        boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        n = len(boxes)
+        self._origin = boxes[:, :2].min(axis=0) if n else np.zeros(2)
+        extent = (boxes[:, 2:].max(axis=0) - self._origin) if n else np.zeros(2)
+
+        if cell_size is None:
+            sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]) if n else np.zeros(1)
+            cell_size = float(np.median(sizes)) if n else 1.0
+        # no more cells than about four per box, also when the boxes lie on a line
+        cap = max(4 * n, 1)
+        cell_size = max(cell_size, float(np.sqrt(extent[0] * extent[1] / cap)), float(extent.max()) / cap)
+        if cell_size <= 0:
+            cell_size = 1.0  # all boxes are the same point
+        self.cell_size = cell_size
+        self._dims = (np.floor(extent / cell_size).astype(np.int64) + 1) if n else np.ones(2, np.int64)
+
+        lo, hi = self._cells(boxes)
+        spans = hi - lo + 1
+        counts = spans[:, 0] * spans[:, 1]
+        small = counts <= max_cells
+        self._large = np.flatnonzero(~small)
+
+        # expand every small box into the cells it covers
+        ids = np.flatnonzero(small)
+        counts, lo, spans = counts[ids], lo[ids], spans[ids]
+        starts = np.cumsum(counts) - counts
+        k = np.arange(counts.sum()) - np.repeat(starts, counts)
+        width = np.repeat(spans[:, 0], counts)
+        cx = np.repeat(lo[:, 0], counts) + k % width
+        cy = np.repeat(lo[:, 1], counts) + k // width
+        cells = cy * self._dims[0] + cx
+        order = np.argsort(cells, kind="stable")
+        self._ids = np.repeat(ids, counts)[order]
+        self._ptr = np.searchsorted(cells[order], np.arange(self._dims[0] * self._dims[1] + 1))
+
+    def _cells(self, boxes: np.ndarray):
+        lo = np.floor((boxes[:, :2] - self._origin) / self.cell_size).astype(np.int64)
+        hi = np.floor((boxes[:, 2:] - self._origin) / self.cell_size).astype(np.int64)
+        top = self._dims - 1
+        return np.clip(lo, 0, top), np.clip(hi, 0, top)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def query(self, window: list | np.ndarray) -> np.ndarray:
+        """
+        Return the sorted indices of the boxes intersecting an "ltrb" window.
+        """
+        window = np.asarray(window, dtype=np.float64).reshape(4)
+        if not len(self.boxes):
+            return np.zeros(0, np.int64)
+        lo, hi = self._cells(window[None])
+        (x0, y0), (x1, y1) = lo[0], hi[0]
+        ptr, gx = self._ptr, self._dims[0]
+        parts = [self._large]
+        far = window[2] < self._origin[0] or window[3] < self._origin[1]
+        if not far:
+            parts += [self._ids[ptr[y * gx + x0] : ptr[y * gx + x1 + 1]] for y in range(y0, y1 + 1)]
+        candidates = np.unique(np.concatenate(parts))
+        boxes = self.boxes[candidates]
+        hit = (
+            (boxes[:, 0] <= window[2])
+            & (boxes[:, 2] >= window[0])
+            & (boxes[:, 1] <= window[3])
+            & (boxes[:, 3] >= window[1])
+        )
+        return candidates[hit]
+
+    def query_point(self, x: float, y: float) -> np.ndarray:
+        """
+        Return the sorted indices of the boxes containing a point.
+        """
+        return self.query([x, y, x, y])
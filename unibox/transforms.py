@@ -0,0 +1,223 @@
+"""
+Geometric transforms applied to every box of a dataset at once.
+
+Every transform is an affine map from the pixels of its input image to the
+pixels of its output image, expressed as a 3x3 matrix. A chain of
+transforms is fused into one matrix first, so the boxes are moved in a
+single (N, 4) pass whatever the length of the chain, then clipped to the
+part of the output that shows the image and the boxes left without area
+are dropped.
+
+Usage:
+    from unibox import transforms as T
+
+    dset.transform(T.Crop([100, 0, 1380, 1080]), T.HFlip(), T.Letterbox(640))
+    matrix, out_wh = T.fuse([T.Letterbox(640)], dset["img_shape"])
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from unibox.bbox import Bbox
+
+
+def _size(size: int | Sequence[int]) -> Tuple[int, int]:
+    if isinstance(size, (int, np.integer)):
+        return int(size), int(size)
+    w, h = size
+    return int(w), int(h)
+
+
+def _affine(a: float, b: float, c: float, d: float, e: float, f: float) -> np.ndarray:
+    return np.array([[a, b, c], [d, e, f], [0, 0, 1]], dtype=np.float64)
+
+
+class Transform:
+    """
+    Base class of the transforms: matrix() returns the 3x3 matrix for an
+    input image of size `img_wh`, and the [w,h] of the output.
+    """
+
+    def matrix(self, img_wh: Sequence[int]) -> Tuple[np.ndarray, Tuple[int, int]]:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({args})"
+
+
+class Affine(Transform):
+    """
+    A fixed matrix, (2, 3) or (3, 3), with an output of size `size`.
+    """
+
+    def __init__(self, matrix: np.ndarray, size: int | Sequence[int]) -> None:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        self.m = np.vstack([matrix[:2], [0, 0, 1]])
+        self.size = _size(size)
+
+    def matrix(self, img_wh):
+        return self.m, self.size
+
+
+class Resize(Transform):
+    """
+    Stretch the image to `size`, [w,h] or one int.
+    """
+
+    def __init__(self, size: int | Sequence[int]) -> None:
+        self.size = _size(size)
+
+    def matrix(self, img_wh):
+        w, h = self.size
+        return _affine(w / img_wh[0], 0, 0, 0, h / img_wh[1], 0), self.size
+
+
+class Letterbox(Transform):
+    """
+    Scale the image to fit `size` keeping its aspect ratio, then pad it
+    evenly on both sides.
+
+    Args:
+        size (int | Sequence[int]): The [w,h] of the output, or one int.
+        scale_up (bool, optional): Whether images smaller than `size` are enlarged. Defaults to True.
+    """
+
+    def __init__(self, size: int | Sequence[int], scale_up: bool = True) -> None:
+        self.size = _size(size)
+        self.scale_up = scale_up
+
+    def matrix(self, img_wh):
+        w, h = self.size
+        scale = min(w / img_wh[0], h / img_wh[1])
+        if not self.scale_up:
+            scale = min(scale, 1.0)
+        pad_x = (w - round(img_wh[0] * scale)) / 2
+        pad_y = (h - round(img_wh[1] * scale)) / 2
+        return _affine(scale, 0, pad_x, 0, scale, pad_y), self.size
+
+
+class HFlip(Transform):
+    """
+    Mirror the image left to right.
+    """
+
+    def matrix(self, img_wh):
+        return _affine(-1, 0, img_wh[0], 0, 1, 0), _size(img_wh)
+
+
+class VFlip(Transform):
+    """
+    Mirror the image top to bottom.
+    """
+
+    def matrix(self, img_wh):
+        return _affine(1, 0, 0, 0, -1, img_wh[1]), _size(img_wh)
+
+
+class Crop(Transform):
+    """
+    Keep the "ltrb" pixel window `window` of the image.
+    """
+
+    def __init__(self, window: Sequence[int]) -> None:
+        self.window = [int(v) for v in window]
+
+    def matrix(self, img_wh):
+        l, t, r, b = self.window
+        return _affine(1, 0, -l, 0, 1, -t), (r - l, b - t)
+
+
+class Rot90(Transform):
+    """
+    Rotate the image by `k` quarter turns counter-clockwise, like np.rot90
+    on an (h, w) image array.
+    """
+
+    def __init__(self, k: int = 1) -> None:
+        self.k = k % 4
+
+    def matrix(self, img_wh):
+        w, h = img_wh
+        if self.k == 0:
+            return np.eye(3), _size(img_wh)
+        if self.k == 1:
+            return _affine(0, 1, 0, -1, 0, w), (int(h), int(w))
+        if self.k == 2:
+            return _affine(-1, 0, w, 0, -1, h), _size(img_wh)
+        return _affine(0, -1, h, 1, 0, 0), (int(h), int(w))
+
+
+def _chain(transforms: Sequence[Transform], img_wh: Sequence[int]):
+    # the fused matrix, the output size and the "ltrb" part of the output
+    # that shows the input image, i.e. without the padding of a letterbox
+    matrix = np.eye(3)
+    size = _size(img_wh)
+    window = np.array([[0, 0, size[0], size[1]]], dtype=np.float64)
+    for transform in transforms:
+        step, size = transform.matrix(size)
+        matrix = step @ matrix
+        window = apply_matrix(window, step)
+        window[:, :2] = np.maximum(window[:, :2], 0)
+        window[:, 2:] = np.minimum(window[:, 2:], size)
+    return matrix, list(size), window[0]
+
+
+def fuse(transforms: Sequence[Transform], img_wh: Sequence[int]) -> Tuple[np.ndarray, list]:
+    """
+    Compose a chain of transforms into one matrix.
+
+    Args:
+        transforms (Sequence[Transform]): The transforms, applied in order.
+        img_wh (Sequence[int]): The [w,h] of the input image.
+
+    Returns:
+        Tuple[np.ndarray, list]: The 3x3 matrix and the [w,h] of the output image.
+    """
+    matrix, size, _ = _chain(transforms, img_wh)
+    return matrix, size
+
+
+def apply_matrix(boxes: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Map (N, 4) "ltrb" boxes through an affine matrix and return the "ltrb"
+    boxes enclosing the results.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    linear, offset = matrix[:2, :2], matrix[:2, 2]
+    if linear[0, 1] == 0 and linear[1, 0] == 0 or linear[0, 0] == 0 and linear[1, 1] == 0:
+        # flips, scales and quarter turns keep boxes axis-aligned: two corners suffice
+        corners = boxes.reshape(-1, 2, 2)
+    else:
+        corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+    points = corners @ linear.T + offset
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+
+
+def transform_boxes(
+    boxes: np.ndarray,
+    img_wh: Sequence[int],
+    transforms: Sequence[Transform],
+    min_size: float = 0,
+) -> Tuple[np.ndarray, np.ndarray, list]:
+    """
+    Apply a chain of transforms to pixel "ltrb" boxes in one fused pass.
+
+    Args:
+        boxes (np.ndarray): (N, 4) "ltrb" boxes in pixels.
+        img_wh (Sequence[int]): The [w,h] of the input image.
+        transforms (Sequence[Transform]): The transforms, applied in order.
+        min_size (float, optional): Boxes whose width or height is not above this after clipping are dropped. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, list]: The kept boxes clipped to the transformed image, a boolean mask of the kept input boxes, and the [w,h] of the output.
+    """
+    matrix, out_wh, window = _chain(transforms, img_wh)
+    moved = apply_matrix(boxes, matrix)
+    if window[0] == 0 and window[1] == 0 and (window[2:] == out_wh).all():
+        moved = Bbox.clip(moved, out_wh)
+    else:
+        # clipped to what is left of the image, as if after every step
+        moved = np.clip(moved, np.tile(window[:2], 2), np.tile(window[2:], 2))
+    keep = (moved[:, 2] - moved[:, 0] > min_size) & (moved[:, 3] - moved[:, 1] > min_size)
+    return moved[keep], keep, out_wh
@@ -1,5 +1,7 @@
 from io import BytesIO, StringIO
 
+from unibox.imagesize import get_image_size
+
 
 def normalize_input(stream):
     """
@@ -10,4 +12,28 @@ def normalize_input(stream):
         return StringIO(stream, newline='')
     elif isinstance(stream, bytes):
         return BytesIO(stream)
-    return stream
\ No newline at end of file
+    return stream
+
+def get_img_shape(dset):
+    """
+    Return the [w,h] of the image behind a dataset and remember it in
+    dset["img_shape"].
+
+    The shape is taken from dset["img_shape"], then from the boxes, and only
+    then read from the header of dset.img_path.
+    """
+    img_wh = dset["img_shape"]
+    if img_wh is not None:
+        return img_wh
+
+    shapes = dset.boxes.img_shapes
+    known = shapes[shapes[:, 0] >= 0]
+    if len(known):
+        img_wh = known[0].tolist()
+    elif dset.img_path is not None:
+        img_wh = get_image_size(dset.img_path)
+    else:
+        raise ValueError("Image shape is not defined.")
+
+    dset["img_shape"] = img_wh
+    return img_wh
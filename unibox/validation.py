@@ -0,0 +1,270 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from unibox.collection import DatasetCollection
+from unibox.dataset import Dataset
+from unibox.formats import registry
+from unibox.imagesize import flush_shape_cache, get_image_size
+
+RULES = {
+    "parse_error": "the label file could not be read",
+    "missing_image": "no image was found for the label file",
+    "unreadable_image": "the size of the image could not be read",
+    "shape_mismatch": "the image size in the label file differs from the image",
+    "inverted": "right < left or bottom < top",
+    "degenerate": "zero width or height",
+    "out_of_image": "pixel coordinates outside the image",
+    "normalized_range": "normalized coordinates outside [0, 1]",
+    "not_pixel": "pixel coordinates all below 1, probably normalized",
+}
+
+
+def _box_issues(boxes, img_wh) -> List[Tuple[str, np.ndarray]]:
+    # (rule, mask over the boxes) for every box rule, evaluated on all boxes at once
+    coords, pixel = boxes.boxes, boxes.is_pixel
+    inverted = (coords[:, 2] < coords[:, 0]) | (coords[:, 3] < coords[:, 1])
+    degenerate = ~inverted & ((coords[:, 2] == coords[:, 0]) | (coords[:, 3] == coords[:, 1]))
+    outside = (coords < 0).any(axis=1)
+    if img_wh is not None:
+        outside |= (coords[:, [0, 2]] > img_wh[0]).any(axis=1) | (coords[:, [1, 3]] > img_wh[1]).any(axis=1)
+    return [
+        ("inverted", inverted),
+        ("degenerate", degenerate),
+        ("out_of_image", pixel & outside),
+        ("normalized_range", ~pixel & ((coords < 0) | (coords > 1)).any(axis=1)),
+        ("not_pixel", pixel & (coords < 1).all(axis=1)),
+    ]
+
+
+def _check_dataset(lb_path: str, format: str, img_path: str | None, require_images: bool, load_kwargs: dict, img_dir: str | None = None) -> Tuple[list, int]:
+    # one image; img_dir is set for the images of a multi-image file, whose paths come from the file
+    dset = Dataset(img_path)
+    try:
+        dset.load(format, lb_path=lb_path, check=False, **load_kwargs)
+        error = None
+    except Exception as err:
+        error = f"{type(err).__name__}: {err}"
+    if img_dir is not None and dset.img_path is not None:
+        img_path = os.path.join(img_dir, dset.img_path)
+
+    issues = []
+    img_wh = None
+    if img_path is not None and os.path.isfile(img_path):
+        try:
+            img_wh = list(get_image_size(img_path))
+        except Exception as err:
+            issues.append((lb_path, img_path, -1, "unreadable_image", f"{type(err).__name__}: {err}"))
+    elif require_images:
+        issues.append((lb_path, img_path, -1, "missing_image", "no image" if img_path is None else "not found"))
+    if error is not None:
+        issues.append((lb_path, img_path, -1, "parse_error", error))
+        return issues, 0
+
+    boxes = dset.boxes
+    label_wh = dset["img_shape"]
+    if label_wh is None:
+        shapes = boxes.img_shapes
+        known = shapes[shapes[:, 0] >= 0]
+        label_wh = known[0].tolist() if len(known) else None
+    if label_wh is not None and img_wh is not None and list(label_wh) != img_wh:
+        issues.append((lb_path, img_path, -1, "shape_mismatch", f"label {list(label_wh)}, image {img_wh}"))
+
+    coords = boxes.boxes
+    found = []
+    for rule, mask in _box_issues(boxes, img_wh or label_wh):
+        for i in np.flatnonzero(mask).tolist():
+            found.append((lb_path, img_path, i, rule, str(coords[i].tolist())))
+    # box by box, in the order of RULES within a box
+    found.sort(key=lambda issue: issue[2])
+    return issues + found, len(boxes)
+
+
+def _num_images(lb_path: str, format: str) -> int | None:
+    # the number of images of a multi-image file (COCO, shard), None for a one-image file
+    if format == "auto":
+        format = registry.detect(Path(lb_path))
+    fmt = registry.get_format(format)
+    return len(fmt.open(lb_path)) if hasattr(fmt, "open") else None
+
+
+def check_file(
+    lb_path: str | Path,
+    format: str,
+    img_path: str | Path | None = None,
+    require_images: bool = True,
+    img_dir: str | Path | None = None,
+    **load_kwargs,
+) -> Tuple[list, int]:
+    """
+    Check one label file against every rule in RULES.
+
+    The boxes are loaded without validation, so that a bad box does not
+    hide the others, and the box rules are evaluated as whole-array masks.
+    Every image of a multi-image file (COCO, shard) is checked, against
+    the image the file names for it, unless `img_path` or one of the
+    `index`, `image_id` and `img_path` load arguments picks a single one.
+
+    Args:
+        lb_path (str | Path): The label file.
+        format (str): The format of the label file.
+        img_path (str | Path | None, optional): Its image. Defaults to None.
+        require_images (bool, optional): Report label files without an image. Defaults to True.
+        img_dir (str | Path | None, optional): The directory the image paths of a multi-image file are relative to. Defaults to the directory of the label file.
+        **load_kwargs: Additional keyword arguments passed to Dataset.load.
+
+    Returns:
+        Tuple[list, int]: The issues as (label path, image path, box index or -1, rule, message) tuples, image by image, file-level issues (-1) first, then by box index; and the number of boxes.
+    """
+    lb_path = str(lb_path)
+    if img_path is not None:
+        return _check_dataset(lb_path, format, str(img_path), require_images, load_kwargs)
+    try:
+        num_images = _num_images(lb_path, format)
+    except Exception:
+        num_images = None  # reported as a parse_error by the load below
+    if num_images is None:
+        return _check_dataset(lb_path, format, None, require_images, load_kwargs)
+
+    img_dir = os.path.dirname(lb_path) if img_dir is None else str(img_dir)
+    if any(key in load_kwargs for key in ("index", "image_id", "img_path")):
+        return _check_dataset(lb_path, format, None, require_images, load_kwargs, img_dir)
+    issues, num_boxes = [], 0
+    for index in range(num_images):
+        found, n = _check_dataset(lb_path, format, None, require_images, dict(load_kwargs, index=index), img_dir)
+        issues.extend(found)
+        num_boxes += n
+    return issues, num_boxes
+
+
+def _check_chunk(pairs: list, format: str, require_images: bool, img_dir: str | None, load_kwargs: dict) -> Tuple[list, int]:
+    issues, num_boxes = [], 0
+    for lb_path, img_path in pairs:
+        found, n = check_file(lb_path, format, img_path, require_images, img_dir, **load_kwargs)
+        issues.extend(found)
+        num_boxes += n
+    flush_shape_cache()
+    return issues, num_boxes
+
+
+class ValidationReport:
+    """
+    The issues found in a corpus, with counts per rule, exportable as JSON
+    or CSV.
+
+    Attributes:
+        issues (list): (label path, image path, box index or -1, rule, message) tuples, in corpus order: file by file and image by image, file-level issues first, then by box index.
+        files (int): The number of label files checked.
+        boxes (int): The number of boxes checked.
+    """
+
+    FIELDS = ("label_path", "img_path", "index", "rule", "message")
+
+    def __init__(self, issues: list | None = None, files: int = 0, boxes: int = 0) -> None:
+        self.issues = issues or []
+        self.files = files
+        self.boxes = boxes
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Return the number of issues of every rule, zero included.
+        """
+        counts = dict.fromkeys(RULES, 0)
+        for issue in self.issues:
+            counts[issue[3]] += 1
+        return counts
+
+    def by_file(self) -> Dict[str, list]:
+        grouped: Dict[str, list] = {}
+        for issue in self.issues:
+            grouped.setdefault(issue[0], []).append(issue)
+        return grouped
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "boxes": self.boxes,
+            "files_with_issues": len(self.by_file()),
+            "counts": self.counts(),
+            "issues": [dict(zip(self.FIELDS, issue)) for issue in self.issues],
+        }
+
+    def to_json(self, path: str | Path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.as_dict(), file, ensure_ascii=False, indent=2)
+
+    def to_csv(self, path: str | Path):
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.FIELDS)
+            writer.writerows(self.issues)
+
+    def summary(self) -> str:
+        lines = [f"{self.files} files, {self.boxes} boxes, {len(self.by_file())} files with issues"]
+        for rule, n in self.counts().items():
+            if n:
+                lines.append(f"{rule:18s} {n:8d}  {RULES[rule]}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"ValidationReport(files={self.files}, boxes={self.boxes}, issues={len(self.issues)})"
+
+
+def validate(
+    source: str | Path | Iterable,
+    format: str,
+    img_dir: str | Path | None = None,
+    jobs: int | None = None,
+    chunksize: int = 64,
+    require_images: bool = True,
+    **load_kwargs,
+) -> ValidationReport:
+    """
+    Check every label file of a corpus and collect all issues instead of
+    stopping at the first bad box.
+
+    Files are checked in chunks of `chunksize` by a pool of `jobs` worker
+    processes, see check_file for what is checked.
+
+    Args:
+        source (str | Path | Iterable): The corpus, see DatasetCollection for the accepted sources.
+        format (str): The format of the label files.
+        img_dir (str | Path | None, optional): The directory containing the images, and the one the image paths of multi-image files are relative to. Defaults to the source directory.
+        jobs (int | None, optional): The number of worker processes, all cores if None, in-process if 1. Defaults to None.
+        chunksize (int, optional): The number of files handed to a worker at once. Defaults to 64.
+        require_images (bool, optional): Report label files without an image. Defaults to True.
+        **load_kwargs: Additional keyword arguments passed to Dataset.load.
+
+    Returns:
+        ValidationReport: The issues, file by file, image by image and by box index within an image.
+
+    Usage:
+        report = validate("labels", "yolo", img_dir="images", jobs=8)
+        print(report.summary())
+        report.to_csv("issues.csv")
+    """
+    pairs = list(DatasetCollection(source, format, img_dir).pairs())
+    chunks = [pairs[i : i + chunksize] for i in range(0, len(pairs), chunksize)]
+    args = (format, require_images, None if img_dir is None else str(img_dir), load_kwargs)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(chunks) <= 1:
+        results = [_check_chunk(chunk, *args) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_check_chunk, chunk, *args) for chunk in chunks]
+            results = [future.result() for future in futures]
+
+    report = ValidationReport(files=len(pairs))
+    for issues, num_boxes in results:
+        report.issues.extend(issues)
+        report.boxes += num_boxes
+    return report